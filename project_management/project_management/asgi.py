@@ -2,6 +2,8 @@
 ASGI config for project_management project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Project and comment reads are served by native async views here unless
+PROJECTS_ASYNC_READS is explicitly set to false.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -12,5 +14,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project_management.settings")
+os.environ.setdefault("PROJECTS_ASYNC_READS", "true")
 
 application = get_asgi_application()
@@ -0,0 +1,60 @@
+from django.db.models import F, FilteredRelation, Q
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from .cache import get_role_cache
+from .models import Project
+from .routing import current_replica
+
+EDITOR_ROLES = ("owner", "editor")
+READER_ROLES = ("owner", "editor", "reader")
+
+
+def with_caller_role(user):
+    """Projects annotated with ``caller_role``, the user's role via a LEFT JOIN."""
+    return Project.objects.annotate(
+        caller_membership=FilteredRelation("members", condition=Q(members__user=user))
+    ).annotate(caller_role=F("caller_membership__role"))
+
+
+def get_project_access(request, project_id):
+    """Fetch a project together with the caller's role in a single query.
+
+    The caller's membership is LEFT JOINed onto the project and exposed as
+    ``project.caller_role`` (``None`` for non-members). The result is memoized
+    on the request, so views and permission classes share one lookup.
+    Raises ``Http404`` if the project does not exist.
+    """
+    http_request = getattr(request, "_request", request)
+    memo = http_request.__dict__.setdefault("_project_access", {})
+    project_id = int(project_id)
+    if project_id not in memo:
+        project = get_object_or_404(with_caller_role(request.user), id=project_id)
+        # A lagging replica could put back a role that was just revoked.
+        if project.caller_role is not None and current_replica() is None:
+            get_role_cache().set(request.user.id, project_id, project.caller_role)
+        memo[project_id] = project
+    return memo[project_id]
+
+
+def get_project_role(request, project_id):
+    """Return the caller's role in a project, or ``None`` for non-members.
+
+    Served from the role cache when warm; otherwise falls back to
+    ``get_project_access`` (which also raises ``Http404`` for unknown projects
+    and warms the cache).
+    """
+    role = get_role_cache().get(request.user.id, int(project_id))
+    if role is None:
+        role = get_project_access(request, project_id).caller_role
+    return role
+
+
+async def aget_project_access(user, project_id):
+    """Async counterpart of ``get_project_access`` for native async views."""
+    try:
+        project = await with_caller_role(user).aget(id=project_id)
+    except Project.DoesNotExist:
+        raise Http404("No Project matches the given query.")
+    if project.caller_role is not None and current_replica() is None:
+        get_role_cache().set(user.id, int(project_id), project.caller_role)
+    return project
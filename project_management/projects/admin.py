@@ -1,14 +1,42 @@
 from django.contrib import admin
 from .models import Project, ProjectMember, Comment
+from .search import matching_ids
+from .signals import forget_comments, soft_delete_projects, touch_project
 
-class ProjectAdmin(admin.ModelAdmin):
+
+class IndexedSearchMixin:
+    """Answers admin searches from the full-text index instead of icontains scans.
+
+    ``search_fields`` still apply (for exact username matches); index hits are
+    added on top of them.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        ids = matching_ids(self.model, search_term)
+        if ids is not None:
+            results |= queryset.filter(id__in=ids)
+        return results, may_have_duplicates
+
+
+class ProjectAdmin(IndexedSearchMixin, admin.ModelAdmin):
     """Admin panel for projects."""
     
     list_display = ("id", "name", "owner", "created_at")  
-    search_fields = ("name", "owner__username")  
+    list_select_related = ("owner",)
+    search_fields = ("=owner__username",)  
     list_filter = ("created_at",)  
     ordering = ("-created_at",)
 
+    # Deletes only hide projects; the purge_deleted worker removes them.
+    def delete_model(self, request, obj):
+        soft_delete_projects(Project.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        soft_delete_projects(queryset)
+
 admin.site.register(Project, ProjectAdmin)
 
 
@@ -16,17 +44,27 @@ class ProjectMemberAdmin(admin.ModelAdmin):
     """Admin panel for managing project members."""
     
     list_display = ("id", "user", "project", "role")  
+    list_select_related = ("user", "project")
     search_fields = ("user__username", "project__name")  
     list_filter = ("role",)  
 
 admin.site.register(ProjectMember, ProjectMemberAdmin)
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(IndexedSearchMixin, admin.ModelAdmin):
     """Admin panel for comments."""
     
     list_display = ("id", "user", "project", "text", "created_at")  
-    search_fields = ("user__username", "project__name", "text")  
+    list_select_related = ("user", "project")
+    search_fields = ("=user__username",)  
     list_filter = ("created_at",)  
 
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        touch_project(obj.project_id, comment_count=-1)
+
+    def delete_queryset(self, request, queryset):
+        forget_comments(queryset)
+        super().delete_queryset(request, queryset)
+
 admin.site.register(Comment, CommentAdmin)
@@ -0,0 +1,11 @@
+"""
+URL configuration that serves the project read endpoints with native async
+views regardless of ``PROJECTS_ASYNC_READS``. Used by tests and ``bench_async``.
+"""
+from django.urls import path, include
+from .urls import build_urlpatterns
+
+urlpatterns = [
+    path("api/users/", include("users.urls")),
+    path("api/", include(build_urlpatterns(async_reads=True))),
+]
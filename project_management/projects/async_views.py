@@ -0,0 +1,129 @@
+"""
+Native async implementations of the read endpoints for the ASGI stack.
+
+GET/HEAD requests are served with Django's async ORM; every other method is
+handed to the synchronous DRF view, so writes keep their existing behaviour.
+"""
+
+import logging
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from users.tokens import get_bearer_token, user_for_token
+from .access import aget_project_access
+from .conditional import aconditional_response
+from .models import Project, Comment
+from .routing import routed
+from .rows import RowSerializer
+from .pagination import KeysetPagination, TimelinePagination
+from .serializers import ProjectSerializer, CommentSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    """Renders ``data`` exactly as DRF's JSON renderer would."""
+    return HttpResponse(
+        JSONRenderer().render(data), status=status, content_type="application/json"
+    )
+
+
+def with_async_reads(view_class, async_get):
+    """Serves GET/HEAD with ``async_get`` and everything else with ``view_class``."""
+    sync_view = sync_to_async(view_class.as_view())
+
+    @csrf_exempt  # DRF enforces CSRF itself for session-authenticated writes.
+    async def view(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return await sync_view(request, *args, **kwargs)
+        user = await request.auser()
+        try:
+            token = None if user.is_authenticated else get_bearer_token(request)
+            if token is not None:
+                user = await sync_to_async(user_for_token)(token)
+        except APIException as exc:
+            # 403 rather than 401, as the sync views answer with sessions first.
+            return json_response({"detail": exc.detail}, status=status.HTTP_403_FORBIDDEN)
+        if not user.is_authenticated:
+            return json_response(
+                {"detail": "Authentication credentials were not provided."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        try:
+            with routed(request.method, user):
+                return await async_get(request, user, *args, **kwargs)
+        except Http404 as exc:
+            return json_response(
+                {"detail": str(exc) or "Not found."}, status=status.HTTP_404_NOT_FOUND
+            )
+        except APIException as exc:
+            # As DRF's exception handler: field errors come back unwrapped.
+            if isinstance(exc.detail, (list, dict)):
+                return json_response(exc.detail, status=exc.status_code)
+            return json_response({"detail": exc.detail}, status=exc.status_code)
+
+    return view
+
+
+async def project_list(request, user):
+    """List projects where the user is a member, one keyset page at a time."""
+    logger.info("User %s requested their project list.", user.email)
+    drf_request = Request(request)
+    fields = ProjectSerializer.get_requested_fields(
+        drf_request, default=ProjectSerializer.list_fields
+    )
+    rows = RowSerializer(ProjectSerializer, fields)
+    projects = rows.rows(Project.objects.filter(members__user=user))
+    paginator = KeysetPagination()
+    page = await paginator.apaginate_queryset(projects, drf_request)
+    return json_response(paginator.get_paginated_data(rows.serialize(page)))
+
+
+async def project_detail(request, user, project_id):
+    """Retrieve a specific project."""
+    project = await aget_project_access(user, project_id)
+    if project.caller_role is None:
+        logger.warning(
+            "Unauthorized access attempt by %s on project ID %s.", user.email, project_id
+        )
+        return json_response(
+            {"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN
+        )
+
+    logger.info("User %s retrieved project ID %s.", user.email, project_id)
+    fields = ProjectSerializer.get_requested_fields(Request(request))
+
+    async def build_response():
+        return json_response(ProjectSerializer(project, fields=fields).data)
+
+    return await aconditional_response(request, project, build_response)
+
+
+async def comment_list(request, user, project_id):
+    """List a project's comments newest first, windowed by before/after cursors."""
+    project = await aget_project_access(user, project_id)
+    if project.caller_role is None:
+        logger.warning(
+            "Unauthorized comment list attempt by %s on project ID %s.",
+            user.email,
+            project_id,
+        )
+        return json_response(
+            {"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN
+        )
+
+    drf_request = Request(request)
+    fields = CommentSerializer.get_requested_fields(drf_request)
+
+    async def build_response():
+        rows = RowSerializer(CommentSerializer, fields)
+        comments = rows.rows(Comment.objects.filter(project_id=project.id))
+        paginator = TimelinePagination()
+        page = await paginator.apaginate_queryset(comments, drf_request)
+        return json_response(paginator.get_paginated_data(rows.serialize(page)))
+
+    return await aconditional_response(request, project, build_response)
@@ -0,0 +1,64 @@
+import statistics
+import time
+from contextlib import contextmanager
+from django.db import connection, connections
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def isolated_database(verbosity=0, mirrors=()):
+    """Runs a benchmark against a throwaway test database.
+
+    Seeded rows never touch the configured database; the test database is
+    created on entry and destroyed on exit, just like ``manage.py test``.
+    Aliases in ``mirrors`` (e.g. read replicas) are pointed at the same test
+    database, as ``TEST["MIRROR"]`` does.
+    """
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True)
+    mirrored = {alias: connections[alias].settings_dict["NAME"] for alias in mirrors}
+    for alias in mirrored:
+        connections[alias].close()
+        connections[alias].creation.set_as_test_mirror(connection.settings_dict)
+    try:
+        yield
+    finally:
+        for alias, name in mirrored.items():
+            connections[alias].close()
+            connections[alias].settings_dict["NAME"] = name
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        teardown_test_environment()
+
+
+def measure(fn, repeat=20, warmup=2):
+    """Calls ``fn`` repeatedly and returns latency percentiles in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentiles(samples)
+
+
+class QueryCounter:
+    """Database execute wrapper that counts the statements run through it."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentiles(samples):
+    """p50/p95/max of ``samples`` (milliseconds)."""
+    samples = sorted(samples)
+    return {
+        "p50": statistics.median(samples),
+        "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "max": samples[-1],
+    }
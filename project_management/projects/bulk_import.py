@@ -0,0 +1,325 @@
+"""
+Batched, resumable import of projects, members and comments.
+
+Reads the NDJSON that ``export_project`` writes (optionally gzipped), or a CSV
+with the same field names as columns. Every record has a ``type``; members
+and comments belong to the project record before them. Users are matched by
+``username``; a ``user``/``owner`` holding a source user id is resolved
+through the project's member records.
+
+Usernames are resolved in bulk into in-memory maps, and rows are inserted
+with ``bulk_create`` (or PostgreSQL ``COPY``) in one transaction per batch,
+together with the run's ``ImportRun`` checkpoint.
+"""
+
+import csv
+import gzip
+import io
+import json
+import time
+from collections import Counter
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import Project, ProjectMember, Comment
+from .signals import touch_project
+
+User = get_user_model()
+
+FORMATS = ("ndjson", "csv")
+ROLES = {role for role, _ in ProjectMember.ROLE_CHOICES}
+COMMENT_COLUMNS = ("project_id", "user_id", "text", "created_at", "updated_at")
+
+
+class RecordError(ValueError):
+    """A record that cannot be imported; it is reported and skipped."""
+
+
+def guess_format(path):
+    return "csv" if path.removesuffix(".gz").endswith(".csv") else "ndjson"
+
+
+def read_records(path, format=None):
+    """Yields ``(position, record)`` for every record in ``path``, streaming."""
+    format = format or guess_format(path)
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        if format == "csv":
+            for position, row in enumerate(csv.DictReader(f), start=1):
+                yield position, {key: value for key, value in row.items() if value}
+            return
+        position = 0
+        for line in f:
+            if not line.strip():
+                continue
+            position += 1
+            try:
+                yield position, json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"Record {position} is not valid JSON: {exc}") from exc
+
+
+def parse_timestamp(value):
+    """An aware datetime from an ISO 8601 string, or now if ``value`` is empty."""
+    if not value:
+        return timezone.now()
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise RecordError(f"Invalid timestamp {value!r}.")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def bulk_create_keeping_timestamps(model, objs):
+    """``bulk_create`` for rows that keep the ``auto_now``/``auto_now_add``
+    values they already carry, instead of the current time.
+
+    The insert stamps the current time, so the carried values are written
+    back with ``bulk_update``, which leaves those fields alone. Switching the
+    flags off on the fields instead would affect every thread saving ``model``.
+    """
+    fields = [
+        field.name
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    carried = [[getattr(obj, name) for name in fields] for obj in objs]
+    model.objects.bulk_create(objs)
+    for obj, values in zip(objs, carried):
+        for name, value in zip(fields, values):
+            setattr(obj, name, value)
+    model.objects.bulk_update(objs, fields)
+
+
+def copy_comments(comments):
+    """Inserts ``comments`` with PostgreSQL ``COPY`` through psycopg2."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for comment in comments:
+        writer.writerow([getattr(comment, column) for column in COMMENT_COLUMNS])
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.cursor.copy_expert(
+            f"COPY comments ({', '.join(COMMENT_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+class Importer:
+    """Imports records into the database, checkpointing into ``run``.
+
+    ``progress(position, counts, rate)`` is called after every committed
+    batch, with ``rate`` in imported rows per second; ``report(position,
+    message)`` for every skipped record.
+    """
+
+    def __init__(self, run, batch_size=1_000, use_copy=False, progress=None, report=None):
+        self.run = run
+        self.batch_size = batch_size
+        self.use_copy = use_copy
+        self.progress = progress or (lambda position, counts, rate: None)
+        self.report = report or (lambda position, message: None)
+        self.counts = Counter()
+        self.user_ids = {}  # username -> user id
+        self.projects = {}  # source project id -> project id
+        # The project the next rows belong to, restored when resuming.
+        self.project_id = run.state.get("project_id")
+        self.source_users = {int(key): value for key, value in run.state.get("users", {}).items()}
+        self.header = None  # (position, project record, member records) not yet created
+        self.members, self.comments = [], []
+
+    def import_records(self, records):
+        self.start = time.perf_counter()
+        position = self.run.position
+        for position, record in records:
+            if position <= self.run.position:
+                continue
+            self.handle(position, record)
+            if len(self.members) + len(self.comments) >= self.batch_size:
+                self.flush(position)
+        self.open_project()
+        self.flush(position, finished=True)
+        return self.counts
+
+    def handle(self, position, record):
+        kind = record.get("type")
+        if kind == "project":
+            self.open_project()
+            self.flush(position - 1)
+            self.header = (position, record, [])
+        elif kind == "member" and self.header is not None:
+            self.header[2].append((position, record))
+        elif kind in ("member", "comment"):
+            self.open_project()
+            if self.target_project(record) is None:
+                self.skip(position, "No imported project to attach to.")
+            else:
+                (self.members if kind == "member" else self.comments).append((position, record))
+        else:
+            self.skip(position, f"Unknown record type {kind!r}.")
+
+    def skip(self, position, message):
+        self.counts["skipped"] += 1
+        self.report(position, message)
+
+    def resolve(self, records):
+        """Loads the ids of usernames in ``records`` not yet in the user map."""
+        names = {record["username"] for _, record in records if record.get("username")}
+        names -= self.user_ids.keys()
+        if names:
+            self.user_ids.update(
+                User.objects.filter(username__in=names).values_list("username", "id")
+            )
+
+    def user_id(self, record, key="user"):
+        if record.get("username"):
+            user_id = self.user_ids.get(record["username"])
+        else:
+            user_id = self.source_users.get(self.source_id(record.get(key)))
+        if user_id is None:
+            raise RecordError(f"Unknown user {record.get('username') or record.get(key)!r}.")
+        return user_id
+
+    @staticmethod
+    def source_id(value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+    def target_project(self, record):
+        """The imported project a member or comment row belongs to."""
+        return self.projects.get(self.source_id(record.get("project")), self.project_id)
+
+    def build_member(self, record, project_id):
+        role = record.get("role")
+        if role not in ROLES:
+            raise RecordError(f"Invalid role {role!r}.")
+        return ProjectMember(project_id=project_id, user_id=self.user_id(record), role=role)
+
+    def build_comment(self, record):
+        if not record.get("text"):
+            raise RecordError("Comment text is required.")
+        created_at = parse_timestamp(record.get("created_at"))
+        return Comment(
+            project_id=self.target_project(record),
+            user_id=self.user_id(record),
+            text=record["text"],
+            created_at=created_at,
+            updated_at=parse_timestamp(record.get("updated_at")) if record.get("updated_at") else created_at,
+        )
+
+    def build(self, rows, builder):
+        built = []
+        for position, record in rows:
+            try:
+                built.append(builder(record))
+            except RecordError as exc:
+                self.skip(position, str(exc))
+        return built
+
+    def open_project(self):
+        """Creates the buffered project record with its members, if any."""
+        if self.header is None:
+            return
+        position, record, member_rows = self.header
+        self.header = None
+        last = member_rows[-1][0] if member_rows else position
+
+        self.resolve(member_rows + [(position, {"username": record.get("owner_username")})])
+        self.source_users = {}
+        for _, member in member_rows:
+            if member.get("username") in self.user_ids and self.source_id(member.get("user")) is not None:
+                self.source_users[int(member["user"])] = self.user_ids[member["username"]]
+
+        self.project_id = None
+        try:
+            if not record.get("name"):
+                raise RecordError("Project name is required.")
+            owner_id = self.user_id({"username": record.get("owner_username"), "owner": record.get("owner")}, "owner")
+            created_at = parse_timestamp(record.get("created_at"))
+            project = Project(
+                name=record["name"],
+                description=record.get("description", ""),
+                owner_id=owner_id,
+                created_at=created_at,
+                updated_at=created_at,
+            )
+        except RecordError as exc:
+            self.skip(position, f"Project skipped with its rows: {exc}")
+            self.checkpoint(last)
+            return
+
+        memberships = {owner_id: ProjectMember(user_id=owner_id, role="owner")}
+        for member_position, member in member_rows:
+            try:
+                membership = self.build_member(member, None)
+            except RecordError as exc:
+                self.skip(member_position, str(exc))
+                continue
+            memberships[membership.user_id] = membership
+        project.member_count = len(memberships)
+
+        with transaction.atomic():
+            bulk_create_keeping_timestamps(Project, [project])
+            for membership in memberships.values():
+                membership.project = project
+            ProjectMember.objects.bulk_create(list(memberships.values()))
+            self.project_id = project.pk
+            self.checkpoint(last)
+        if self.source_id(record.get("id")) is not None:
+            self.projects[int(record["id"])] = project.pk
+        self.counts["projects"] += 1
+        self.counts["members"] += len(memberships)
+
+    def flush(self, position, finished=False):
+        """Commits the pending members and comments with the checkpoint."""
+        member_rows, comment_rows = self.members, self.comments
+        self.members, self.comments = [], []
+        if not (member_rows or comment_rows or finished) and position <= self.run.position:
+            return
+
+        self.resolve(member_rows + comment_rows)
+        members = self.build(member_rows, lambda record: self.build_member(record, self.target_project(record)))
+        comments = self.build(comment_rows, self.build_comment)
+
+        deltas = {}
+        for member in members:
+            deltas.setdefault(member.project_id, Counter())["member_count"] += 1
+        for comment in comments:
+            deltas.setdefault(comment.project_id, Counter())["comment_count"] += 1
+
+        with transaction.atomic():
+            # Existing memberships are kept; the counters may over-count them
+            # until repair_project_counters runs.
+            ProjectMember.objects.bulk_create(members, ignore_conflicts=True)
+            if self.use_copy:
+                copy_comments(comments)
+            else:
+                bulk_create_keeping_timestamps(Comment, comments)
+            for project_id, delta in deltas.items():
+                latest = max(
+                    (comment.updated_at for comment in comments if comment.project_id == project_id),
+                    default=None,
+                )
+                touch_project(project_id, last_activity_at=latest, **delta)
+            self.checkpoint(position, finished)
+
+        self.counts["members"] += len(members)
+        self.counts["comments"] += len(comments)
+        if not (member_rows or comment_rows):
+            return
+        imported = self.counts["projects"] + self.counts["members"] + self.counts["comments"]
+        self.progress(position, self.counts, imported / (time.perf_counter() - self.start))
+
+    def checkpoint(self, position, finished=False):
+        self.run.position = max(position, self.run.position)
+        self.run.state = {
+            "project_id": self.project_id,
+            "users": {str(key): value for key, value in self.source_users.items()},
+        }
+        if finished:
+            self.run.finished_at = timezone.now()
+        self.run.save()
@@ -0,0 +1,100 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+class LocalRoleCache:
+    """Per-process LRU of (user_id, project_id) -> role with TTL expiry."""
+
+    def __init__(self, max_entries=10000, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, project_id):
+        key = (user_id, project_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            role, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return role
+
+    def set(self, user_id, project_id, role):
+        key = (user_id, project_id)
+        with self._lock:
+            self._entries[key] = (role, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoRoleCache:
+    """Role cache stored in one of the configured Django cache backends.
+
+    Size bounds come from the backend itself (e.g. ``MAX_ENTRIES``), and
+    entries expire after ``ttl`` seconds. There is no ``clear``: the backend
+    may be shared, and flushing it would drop everything else it holds.
+    """
+
+    key_prefix = "projects:role"
+
+    def __init__(self, alias="default", ttl=60):
+        self.alias = alias
+        self.ttl = ttl
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def make_key(self, user_id, project_id):
+        return f"{self.key_prefix}:{user_id}:{project_id}"
+
+    def get(self, user_id, project_id):
+        return self.cache.get(self.make_key(user_id, project_id))
+
+    def set(self, user_id, project_id, role):
+        self.cache.set(self.make_key(user_id, project_id), role, self.ttl)
+
+    def delete_many(self, keys):
+        self.cache.delete_many([self.make_key(*key) for key in keys])
+
+
+def build_role_cache():
+    """Builds the role cache described by ``settings.PROJECT_ROLE_CACHE``."""
+    options = settings.PROJECT_ROLE_CACHE
+    if options["BACKEND"] == "django":
+        return DjangoRoleCache(alias=options["CACHE_ALIAS"], ttl=options["TTL"])
+    return LocalRoleCache(max_entries=options["MAX_ENTRIES"], ttl=options["TTL"])
+
+
+role_cache = build_role_cache()
+
+
+@receiver(setting_changed)
+def reset_role_cache(*, setting, **kwargs):
+    global role_cache
+    if setting == "PROJECT_ROLE_CACHE":
+        role_cache = build_role_cache()
+
+
+def get_role_cache():
+    return role_cache
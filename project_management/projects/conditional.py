@@ -0,0 +1,56 @@
+import hashlib
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def project_validators(request, project):
+    """ETag and Last-Modified for a representation derived from ``project``.
+
+    ``project.updated_at`` moves whenever the project, its members or its
+    comments change. The path (including cursors) and the negotiated format
+    are folded into the ETag because they change the body too.
+    """
+    renderer = getattr(request, "accepted_renderer", None)
+    key = "|".join(
+        [
+            renderer.format if renderer else "json",
+            request.get_full_path(),
+            project.updated_at.isoformat(),
+        ]
+    )
+    etag = quote_etag(hashlib.md5(key.encode(), usedforsecurity=False).hexdigest())
+    return etag, int(project.updated_at.timestamp())
+
+
+def not_modified_response(request, etag, last_modified):
+    return get_conditional_response(
+        getattr(request, "_request", request), etag=etag, last_modified=last_modified
+    )
+
+
+def set_validators(response, etag, last_modified):
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def conditional_response(request, project, build_response):
+    """Answers with 304 when the client's copy is current.
+
+    ``build_response`` is only called (and the body only serialized) when the
+    client's ``If-None-Match``/``If-Modified-Since`` validators are stale.
+    """
+    etag, last_modified = project_validators(request, project)
+    response = not_modified_response(request, etag, last_modified)
+    if response is None:
+        response = build_response()
+    return set_validators(response, etag, last_modified)
+
+
+async def aconditional_response(request, project, build_response):
+    """Async counterpart of ``conditional_response``; awaits ``build_response``."""
+    etag, last_modified = project_validators(request, project)
+    response = not_modified_response(request, etag, last_modified)
+    if response is None:
+        response = await build_response()
+    return set_validators(response, etag, last_modified)
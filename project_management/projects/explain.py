@@ -0,0 +1,101 @@
+"""
+Query plan checks for the hot paths.
+
+``capture_queries`` records the statements a block runs; ``sequential_scans``
+runs ``EXPLAIN`` on one of them (``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN
+(FORMAT JSON)`` on PostgreSQL) and returns the large tables it reads in full.
+Test datasets are small, so PostgreSQL would rightly prefer sequential scans
+of them; plans are taken with ``enable_seqscan`` off, which leaves a
+sequential scan only where no index can serve the query.
+"""
+
+import json
+import re
+from contextlib import ExitStack, contextmanager
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.db import connections
+from .models import Activity, Comment, Project, ProjectMember
+
+# Database vendors whose plans can be checked.
+VENDORS = ("sqlite", "postgresql")
+
+# Tables that grow with usage; reading one of them in full is a regression.
+LARGE_TABLES = frozenset(
+    model._meta.db_table
+    for model in (Project, ProjectMember, Comment, Activity, get_user_model(), Session)
+)
+
+EXPLAINABLE = re.compile(r"\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b", re.I)
+# "SCAN comments" or "SCAN comments AS c" reads the table in full; "SCAN ...
+# USING [COVERING] INDEX" walks an index in order and stops at the LIMIT.
+SQLITE_FULL_SCAN = re.compile(r"^SCAN (\S+)(?: AS \S+)?$")
+# SQLite plans name tables by their alias in the query, if any.
+TABLE_ALIAS = re.compile(r'\b(?:FROM|JOIN)\s+"?(\w+)"?(?:\s+(?:AS\s+)?"?(\w+)"?)?', re.I)
+
+
+class CapturedQuery:
+    def __init__(self, alias, sql, params):
+        self.alias = alias
+        self.sql = sql
+        self.params = params
+
+    def __str__(self):
+        return self.sql
+
+
+@contextmanager
+def capture_queries():
+    """Collects the explainable statements run on any alias inside the block."""
+    queries = []
+
+    def record(execute, sql, params, many, context):
+        if not many and EXPLAINABLE.match(sql):
+            queries.append(CapturedQuery(context["connection"].alias, sql, params))
+        return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(record))
+        yield queries
+
+
+def explain(query):
+    """The plan of ``query``: SQLite detail lines, or the PostgreSQL JSON plan."""
+    connection = connections[query.alias]
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {query.sql}", query.params)
+            return [row[-1] for row in cursor.fetchall()]
+        if connection.vendor == "postgresql":
+            # Not SET LOCAL: inside a test's transaction that would last until
+            # the test ends, not just for this statement.
+            cursor.execute("SET enable_seqscan = off")
+            try:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {query.sql}", query.params)
+                plan = cursor.fetchone()[0]
+            finally:
+                cursor.execute("RESET enable_seqscan")
+            return json.loads(plan) if isinstance(plan, str) else plan
+    raise NotImplementedError(f"No plan check for {connection.vendor}.")
+
+
+def sequential_scans(query, tables=LARGE_TABLES):
+    """Names of the ``tables`` that ``query`` reads in full."""
+    plan = explain(query)
+    if connections[query.alias].vendor == "sqlite":
+        aliases = {alias: table for table, alias in TABLE_ALIAS.findall(query.sql) if alias}
+        scanned = (SQLITE_FULL_SCAN.match(line) for line in plan)
+        names = {aliases.get(match[1], match[1]) for match in scanned if match}
+        return sorted(names & tables)
+    return sorted({
+        node["Relation Name"]
+        for node in plan_nodes(plan[0]["Plan"])
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in tables
+    })
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
@@ -0,0 +1,94 @@
+"""
+Streaming project export as gzip-compressed NDJSON.
+
+One JSON object per line: the project first, then its members, then its
+comments oldest first, each tagged with a ``"type"``. Rows are read with
+``.iterator(chunk_size=...)`` and compressed as they are produced, so memory
+use does not grow with the project. Under ASGI the stream is handed over as an
+async iterator (``aiterate``), since Django reads a sync one to the end before
+sending any of it.
+"""
+
+import json
+import zlib
+from itertools import islice
+from asgiref.sync import sync_to_async
+from .models import ProjectMember, Comment
+from .rows import RowSerializer
+from .serializers import ProjectSerializer, CommentSerializer
+
+CONTENT_TYPE = "application/gzip"
+
+# gzip container (not a bare zlib stream), so the output is a valid .gz file.
+GZIP_WBITS = zlib.MAX_WBITS | 16
+
+
+def export_records(project, chunk_size=2_000, using=None):
+    """Yields the export's records as dicts, reading ``chunk_size`` rows at a time
+    from the ``using`` database alias (the routed one by default)."""
+    yield {"type": "project", **ProjectSerializer(project).data}
+
+    members = (
+        ProjectMember.objects.using(using)
+        .filter(project=project)
+        .order_by("pk")
+        .values_list("user_id", "user__username", "role")
+    )
+    for user_id, username, role in members.iterator(chunk_size=chunk_size):
+        yield {"type": "member", "user": user_id, "username": username, "role": role}
+
+    rows = RowSerializer(CommentSerializer)
+    comments = rows.rows(Comment.objects.using(using).filter(project=project).order_by("created_at", "id"))
+    iterator = comments.iterator(chunk_size=chunk_size)
+    while chunk := list(islice(iterator, chunk_size)):
+        for comment in rows.serialize(chunk):
+            yield {"type": "comment", **comment}
+
+
+def gzip_ndjson(records, counter=None, flush_size=64 * 1024):
+    """Encodes ``records`` as NDJSON and yields gzip-compressed chunks.
+
+    Compressed output is handed on once ``flush_size`` bytes have built up.
+    ``counter``, if given, has its ``rows`` and ``bytes`` attributes updated
+    as records go by.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, GZIP_WBITS)
+    encode = json.JSONEncoder(separators=(",", ":"), default=str).encode
+    pending, size = [], 0
+    for record in records:
+        pending.append(compressor.compress(encode(record).encode() + b"\n"))
+        size += len(pending[-1])
+        if counter is not None:
+            counter.rows += 1
+        if size >= flush_size:
+            chunk = b"".join(pending)
+            pending, size = [], 0
+            if counter is not None:
+                counter.bytes += len(chunk)
+            yield chunk
+    pending.append(compressor.flush())
+    chunk = b"".join(pending)
+    if counter is not None:
+        counter.bytes += len(chunk)
+    yield chunk
+
+
+async def aiterate(iterator):
+    """Yields the items of the sync ``iterator``, advancing it in the sync
+    thread one item at a time."""
+    done = object()
+    advance = sync_to_async(next)
+    while (item := await advance(iterator, done)) is not done:
+        yield item
+
+
+class ExportCounter:
+    """Running totals for an export in progress."""
+
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+
+
+def export_filename(project):
+    return f"project-{project.pk}.ndjson.gz"
@@ -0,0 +1,136 @@
+"""
+Non-blocking logging pipeline.
+
+``BoundedQueueHandler`` puts records on a bounded in-memory queue and hands
+them to the real handlers (file, console) on a background listener thread, so
+formatting and disk writes stay off the request thread. ``JsonFormatter``
+writes one JSON object per line, including any ``extra`` fields.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else was passed via ``extra``.
+RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+POLICIES = ("drop", "block")
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(
+            (key, value) for key, value in vars(record).items() if key not in RECORD_ATTRS
+        )
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+def get_handler(name):
+    """The configured handler called ``name``."""
+    # logging.getHandlerByName() is Python 3.12+.
+    handler = logging._handlers.get(name)
+    if handler is None:
+        raise ValueError(
+            f"Handler {name!r} is not configured yet. dictConfig() builds handlers "
+            f"in name order, so it must sort before the queue handler feeding it."
+        )
+    return handler
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Queues records for ``handlers``, which run on a listener thread.
+
+    The queue holds at most ``maxsize`` records. When it is full, ``policy``
+    decides: ``"drop"`` discards the record at once, ``"block"`` makes the
+    logging thread wait up to ``timeout`` seconds for room (backpressure)
+    before discarding it. Discarded records are counted and reported with a
+    warning as soon as the queue accepts records again.
+
+    Used from ``LOGGING`` with ``"()": "projects.logs.BoundedQueueHandler"``
+    and ``"handlers": [names]``.
+    """
+
+    def __init__(self, handlers, maxsize=10_000, policy="drop", timeout=0.1):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, not {policy!r}.")
+        super().__init__(queue.Queue(maxsize))
+        self.policy = policy
+        self.timeout = timeout
+        self.dropped = 0
+        targets = [get_handler(name) if isinstance(name, str) else name for name in handlers]
+        self.listener = QueueListener(self.queue, *targets, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.close)
+
+    def prepare(self, record):
+        """Merges the message arguments on the logging thread.
+
+        %-style arguments are only formatted here, once the record is known to
+        be emitted, but not deferred past that: they may be model instances
+        that must not be touched from another thread. Full formatting (JSON,
+        timestamps) is left to the listener. The record is copied first, as
+        other handlers of the logger still see the original.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self.dropped:
+            self.report_dropped()
+        if not self.put(record):
+            self.dropped += 1
+
+    def report_dropped(self):
+        """Queues a warning about discarded records, if there is room for it."""
+        notice = logging.makeLogRecord(
+            {
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"Dropped {self.dropped} log records: the log queue was full.",
+                "log_records_dropped": self.dropped,
+            }
+        )
+        if self.put(notice):
+            self.dropped = 0
+
+    def put(self, record):
+        try:
+            if self.policy == "block":
+                self.queue.put(record, timeout=self.timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            return False
+        return True
+
+    def close(self):
+        """Drains the queue into the target handlers and stops the listener."""
+        if self.listener._thread is not None:
+            self.listener.queue.put(self.listener._sentinel)
+            self.listener._thread.join()
+            self.listener._thread = None
+        super().close()
@@ -0,0 +1,125 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from projects.benchmark import isolated_database
+from projects.models import Project, ProjectMember, Comment
+
+User = get_user_model()
+
+
+def check(response):
+    if response.status_code != 200:
+        raise CommandError(f"{response.request['PATH_INFO']} returned {response.status_code}.")
+
+
+def summarize(samples, elapsed):
+    samples.sort()
+    return {
+        "rps": len(samples) / elapsed,
+        "p50": statistics.median(samples),
+        "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the WSGI (sync DRF views) and ASGI (native async views) read "
+        "paths under concurrent load, in-process. Runs against a throwaway test "
+        "database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument("--projects", type=int, default=200)
+        parser.add_argument("--comments", type=int, default=1_000)
+
+    def handle(self, *args, **options):
+        with isolated_database():
+            user, project = self.seed(options)
+            client = Client()
+            client.force_login(user)
+            self.cookies = client.cookies
+
+            urls = {
+                "project list": "/api/projects/",
+                "project detail": f"/api/projects/{project.id}/",
+                "comment list": f"/api/projects/{project.id}/comments/",
+            }
+            self.stdout.write(
+                f"{'endpoint':<16} {'stack':<5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}"
+            )
+            for label, url in urls.items():
+                with override_settings(ROOT_URLCONF="project_management.urls"):
+                    wsgi = self.run_wsgi(url, options)
+                with override_settings(ROOT_URLCONF="projects.async_urls"):
+                    asgi = asyncio.run(self.run_asgi(url, options))
+                for stack, stats in (("wsgi", wsgi), ("asgi", asgi)):
+                    self.stdout.write(
+                        f"{label:<16} {stack:<5} {stats['rps']:>8.1f} "
+                        f"{stats['p50']:>8.2f} {stats['p95']:>8.2f}"
+                    )
+
+    def seed(self, options):
+        user = User.objects.create_user(
+            username="bench", email="bench@example.com", password="bench"
+        )
+        projects = Project.objects.bulk_create(
+            Project(name=f"Project {i}", owner=user) for i in range(options["projects"])
+        )
+        ProjectMember.objects.bulk_create(
+            ProjectMember(user=user, project=project, role="owner") for project in projects
+        )
+        project = projects[-1]
+        Comment.objects.bulk_create(
+            Comment(project=project, user=user, text=f"comment {i}")
+            for i in range(options["comments"])
+        )
+        return user, project
+
+    def run_wsgi(self, url, options):
+        per_worker = options["requests"] // options["concurrency"]
+
+        def worker():
+            client = Client()
+            client.cookies = self.cookies
+            samples = []
+            try:
+                for _ in range(per_worker):
+                    start = time.perf_counter()
+                    response = client.get(url)
+                    samples.append((time.perf_counter() - start) * 1000)
+                    check(response)
+            finally:
+                connections.close_all()
+            return samples
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options["concurrency"]) as pool:
+            futures = [pool.submit(worker) for _ in range(options["concurrency"])]
+            samples = [s for future in futures for s in future.result()]
+        return summarize(samples, time.perf_counter() - start)
+
+    async def run_asgi(self, url, options):
+        per_worker = options["requests"] // options["concurrency"]
+
+        async def worker():
+            client = AsyncClient()
+            client.cookies = self.cookies
+            samples = []
+            for _ in range(per_worker):
+                start = time.perf_counter()
+                response = await client.get(url)
+                samples.append((time.perf_counter() - start) * 1000)
+                check(response)
+            return samples
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(worker() for _ in range(options["concurrency"])))
+        samples = [s for worker_samples in results for s in worker_samples]
+        return summarize(samples, time.perf_counter() - start)
@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from rest_framework.test import APIClient
+from projects.benchmark import isolated_database, measure
+from projects.models import Project, ProjectMember, Comment
+from projects.pagination import encode_cursor
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures comment timeline latency as a project's comment count grows. "
+        "Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[1_000, 10_000, 100_000],
+            help="Comment counts to benchmark at.",
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        with isolated_database():
+            self.run(options)
+
+    def run(self, options):
+        user = User.objects.create_user(
+            username="bench", email="bench@example.com", password="bench"
+        )
+        project = Project.objects.create(name="Benchmark", owner=user)
+        ProjectMember.objects.create(user=user, project=project, role="owner")
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = f"/api/projects/{project.id}/comments/?page_size={options['page_size']}"
+
+        self.stdout.write(
+            f"{'comments':>10} {'page':>8} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}"
+        )
+        seeded = 0
+        for size in sorted(options["sizes"]):
+            while seeded < size:
+                batch = min(options["batch_size"], size - seeded)
+                Comment.objects.bulk_create(
+                    Comment(project=project, user=user, text=f"comment {seeded + i}")
+                    for i in range(batch)
+                )
+                seeded += batch
+
+            middle = (
+                Comment.objects.filter(project=project)
+                .order_by("-created_at", "-id")
+                .values_list("created_at", "id")[size // 2]
+            )
+            cursor = encode_cursor(*middle)
+            windows = {
+                "first": url,
+                "before": f"{url}&before={cursor}",
+                "after": f"{url}&after={cursor}",
+            }
+            for label, window_url in windows.items():
+                stats = measure(lambda: client.get(window_url), repeat=options["repeat"])
+                self.stdout.write(
+                    f"{size:>10} {label:>8} {stats['p50']:>8.2f} "
+                    f"{stats['p95']:>8.2f} {stats['max']:>8.2f}"
+                )
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from projects.benchmark import measure
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the database connection cost per request: a new connection "
+        "for every request, persistent connections with and without health "
+        "checks, or the configured pool. Runs against the configured database "
+        "(point DATABASE_URL at a local PostgreSQL) and only runs SELECT 1."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        settings_dict = connection.settings_dict
+        saved = settings_dict["CONN_MAX_AGE"], settings_dict["CONN_HEALTH_CHECKS"]
+        if settings_dict["OPTIONS"].get("pool"):
+            # A pool cannot be combined with persistent connections.
+            modes = [("pool", 0, False)]
+        else:
+            modes = [
+                ("new connection per request", 0, False),
+                ("persistent", None, False),
+                ("persistent + health checks", None, True),
+            ]
+
+        self.stdout.write(f"{connection.vendor} {settings_dict['NAME']}")
+        self.stdout.write(f"{'mode':<30} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'connects':>9}")
+        try:
+            for label, max_age, health_checks in modes:
+                settings_dict["CONN_MAX_AGE"] = max_age
+                settings_dict["CONN_HEALTH_CHECKS"] = health_checks
+                connection.close()
+                connects = []
+
+                def count(sender, connection, **kwargs):
+                    connects.append(connection.alias)
+
+                connection_created.connect(count)
+                try:
+                    stats = measure(lambda: self.request(connection), repeat=options["requests"], warmup=0)
+                finally:
+                    connection_created.disconnect(count)
+                self.stdout.write(
+                    f"{label:<30} {stats['p50']:>8.3f} {stats['p95']:>8.3f} "
+                    f"{stats['max']:>8.3f} {connects.count(connection.alias):>9}"
+                )
+        finally:
+            settings_dict["CONN_MAX_AGE"], settings_dict["CONN_HEALTH_CHECKS"] = saved
+            connection.close()
+
+    def request(self, connection):
+        """One request's worth of database work, with the request signals that
+        open and close connections around it."""
+        request_started.send(sender=self.__class__)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        finally:
+            request_finished.send(sender=self.__class__)
@@ -0,0 +1,375 @@
+import json
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import URLPattern, get_resolver
+from projects.benchmark import QueryCounter, isolated_database, percentiles
+from projects.explain import VENDORS, capture_queries, sequential_scans
+from projects.models import Project, ProjectMember, Comment
+from projects.pagination import encode_cursor
+
+User = get_user_model()
+
+# Dataset presets: projects the bench user belongs to, comments on (and
+# members of) one hot project.
+SCALES = {
+    "small": {"projects": 100, "comments": 1_000, "members": 20},
+    "medium": {"projects": 1_000, "comments": 100_000, "members": 200},
+    "large": {"projects": 10_000, "comments": 1_000_000, "members": 1_000},
+}
+
+# (route name, method, label, max queries per request, expected status).
+# Budgets must not depend on the dataset size; a route whose query count
+# grows with the data is an N+1.
+SCENARIOS = [
+    ("project-list-create", "GET", "project list", 2, 200),
+    ("project-list-create", "GET", "project list next page", 2, 200),
+    ("project-list-create", "POST", "project create", 5, 201),
+    ("project-detail", "GET", "project detail", 2, 200),
+    ("project-detail", "PUT", "project update", 3, 200),
+    ("project-detail", "DELETE", "project delete", 4, 204),
+    ("csrf_token", "GET", "csrf token", 0, 200),
+    ("project-member-add", "POST", "member add", 8, 201),
+    ("project-member-bulk-add", "POST", "member bulk add", 8, 201),
+    ("comment-list-create", "GET", "comment list", 3, 200),
+    ("comment-list-create", "GET", "comment list older", 3, 200),
+    ("comment-list-create", "POST", "comment create", 4, 201),
+    ("project-export", "GET", "project export", 4, 200),
+    ("activity-feed", "GET", "activity feed", 2, 200),
+    ("search", "GET", "search", 3, 200),
+    ("register", "POST", "register", 5, 201),
+    ("verify_email", "POST", "verify email", 2, 200),
+    ("login", "POST", "login", 7, 200),
+    ("logout", "POST", "logout", 3, 200),
+    ("profile", "GET", "profile", 1, 200),
+]
+
+BENCHED_URLCONFS = ("projects.urls", "users.urls")
+
+# Latencies depend on the machine, so they are only compared against a
+# baseline saved on the same machine; query counts hold anywhere.
+LATENCY_FIELDS = ("p50", "p95")
+
+
+def route_names():
+    """Names of every route declared in the benchmarked URLconfs."""
+    names = set()
+    for urlconf in BENCHED_URLCONFS:
+        for pattern in get_resolver(urlconf).url_patterns:
+            if isinstance(pattern, URLPattern) and pattern.name:
+                names.add(pattern.name)
+    return names
+
+
+class Command(BaseCommand):
+    help = (
+        "Drives every project and user route through the test client against a "
+        "seeded dataset, reporting p50/p95 latency and SQL queries per request. "
+        "Fails on query budget overruns, on more queries than the committed "
+        "baseline, and on slowdowns against a latency baseline saved on this "
+        "machine. Runs against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=SCALES, default="small")
+        parser.add_argument("--projects", type=int, help="Override the preset.")
+        parser.add_argument("--comments", type=int, help="Override the preset.")
+        parser.add_argument("--members", type=int, help="Override the preset.")
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument(
+            "--baseline",
+            default=str(settings.BASE_DIR / "benchmarks" / "endpoints.json"),
+            help="JSON file of stored query counts, keyed by scale (committed).",
+        )
+        parser.add_argument(
+            "--latency-baseline",
+            default=str(settings.BASE_DIR / "benchmarks" / "endpoints.local.json"),
+            help="JSON file of latencies saved on this machine, keyed by scale (not committed).",
+        )
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Store this run as both baselines for its scale instead of comparing.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.5,
+            help="Allowed p50 slowdown over the baseline, as a fraction.",
+        )
+        parser.add_argument(
+            "--noise-floor",
+            type=float,
+            default=2.0,
+            help="p50 differences below this many ms never count as regressions.",
+        )
+        parser.add_argument(
+            "--explain",
+            action="store_true",
+            help="Also EXPLAIN the queries of one request per scenario and fail "
+            "on sequential scans of large tables.",
+        )
+
+    def handle(self, *args, **options):
+        missing = route_names() - {route for route, *_ in SCENARIOS}
+        if missing:
+            raise CommandError(f"No benchmark scenario for: {', '.join(sorted(missing))}.")
+        if options["explain"] and connection.vendor not in VENDORS:
+            raise CommandError(f"--explain has no plan check for {connection.vendor}.")
+
+        sizes = {
+            key: options[key] if options[key] is not None else value
+            for key, value in SCALES[options["scale"]].items()
+        }
+        with isolated_database():
+            self.seed(sizes, options["batch_size"])
+            results = self.run(options)
+            plan_failures = self.check_plans() if options["explain"] else []
+
+        failures = self.check_budgets(results) + plan_failures
+        if options["save_baseline"]:
+            self.save_baseline(options, sizes, results)
+        else:
+            failures += self.check_baseline(options, results)
+        if failures:
+            raise CommandError("\n".join(failures))
+
+    def seed(self, sizes, batch_size):
+        self.stdout.write(
+            f"Seeding {sizes['projects']} projects, {sizes['comments']} comments, "
+            f"{sizes['members']} members..."
+        )
+        self.user = User.objects.create_user(
+            username="bench", email="bench@example.com", password="bench", is_verified=True
+        )
+        projects = Project.objects.bulk_create(
+            (
+                Project(name=f"Project {i}", description=f"Benchmark project {i}", owner=self.user)
+                for i in range(sizes["projects"])
+            ),
+            batch_size=batch_size,
+        )
+        ProjectMember.objects.bulk_create(
+            (ProjectMember(user=self.user, project=project, role="owner") for project in projects),
+            batch_size=batch_size,
+        )
+        self.project = projects[-1]
+
+        members = User.objects.bulk_create(
+            User(username=f"member{i}", email=f"member{i}@example.com")
+            for i in range(sizes["members"])
+        )
+        ProjectMember.objects.bulk_create(
+            (ProjectMember(user=member, project=self.project, role="editor") for member in members),
+            batch_size=batch_size,
+        )
+        for start in range(0, sizes["comments"], batch_size):
+            Comment.objects.bulk_create(
+                Comment(project=self.project, user=self.user, text=f"comment {i}")
+                for i in range(start, min(start + batch_size, sizes["comments"]))
+            )
+
+        projects_page = Project.objects.order_by("-created_at", "-id")[len(projects) // 2]
+        self.project_cursor = encode_cursor(projects_page.created_at, projects_page.id)
+        comments = Comment.objects.filter(project=self.project).order_by("-created_at", "-id")
+        middle = comments.values_list("created_at", "id")[sizes["comments"] // 2]
+        self.comment_cursor = encode_cursor(*middle)
+
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.anonymous = Client()
+        self.serial = 0
+
+    def next_serial(self):
+        self.serial += 1
+        return self.serial
+
+    def prepare(self, label):
+        """Untimed setup for one request: returns ``(client, path, data)``."""
+        project_url = f"/api/projects/{self.project.id}/"
+        n = self.next_serial()
+        if label == "project list":
+            return self.client, "/api/projects/", None
+        if label == "project list next page":
+            return self.client, f"/api/projects/?cursor={self.project_cursor}", None
+        if label == "project create":
+            return self.client, "/api/projects/", {"name": f"New {n}", "description": "x"}
+        if label == "project detail":
+            return self.client, project_url, None
+        if label == "project update":
+            return self.client, project_url, {"description": f"Updated {n}"}
+        if label == "project delete":
+            doomed = Project.objects.create(name=f"Doomed {n}", owner=self.user)
+            ProjectMember.objects.create(user=self.user, project=doomed, role="owner")
+            Comment.objects.create(project=doomed, user=self.user, text="bye")
+            return self.client, f"/api/projects/{doomed.id}/", None
+        if label == "csrf token":
+            return self.client, "/api/csrf/", None
+        if label == "member add":
+            user = User.objects.create_user(username=f"add{n}", email=f"add{n}@example.com")
+            return self.client, f"{project_url}members/", {"user": user.id, "project": self.project.id, "role": "reader"}
+        if label == "member bulk add":
+            users = User.objects.bulk_create(
+                User(username=f"bulk{n}-{i}", email=f"bulk{n}-{i}@example.com") for i in range(20)
+            )
+            members = [{"user": user.id, "role": "reader"} for user in users]
+            return self.client, f"{project_url}members/bulk/", {"members": members}
+        if label == "comment list":
+            return self.client, f"{project_url}comments/", None
+        if label == "comment list older":
+            return self.client, f"{project_url}comments/?before={self.comment_cursor}", None
+        if label == "comment create":
+            return self.client, f"{project_url}comments/", {"text": f"Benchmark comment {n}"}
+        if label == "project export":
+            return self.client, f"{project_url}export/", None
+        if label == "activity feed":
+            return self.client, "/api/feed/", None
+        if label == "search":
+            return self.client, "/api/search/?q=comment", None
+        if label == "register":
+            data = {"username": f"reg{n}", "email": f"reg{n}@example.com", "password": "bench-pass-123"}
+            return self.anonymous, "/api/users/register/", data
+        if label == "verify email":
+            user = User.objects.create_user(
+                username=f"verify{n}", email=f"verify{n}@example.com", is_active=False
+            )
+            data = {"email": user.email, "verification_code": str(user.verification_code)}
+            return self.anonymous, "/api/users/verify/", data
+        if label == "login":
+            return Client(), "/api/users/login/", {"username": "bench", "password": "bench"}
+        if label == "logout":
+            client = Client()
+            client.force_login(self.user)
+            return client, "/api/users/logout/", None
+        if label == "profile":
+            return self.client, "/api/users/profile/", None
+        raise CommandError(f"No setup for scenario '{label}'.")
+
+    def request(self, method, label, expected, captured=None):
+        """Sends one request; its queries are appended to ``captured``, if given."""
+        client, path, data = self.prepare(label)
+        send = getattr(client, method.lower())
+        kwargs = {"content_type": "application/json"} if data is not None else {}
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            stack.enter_context(connection.execute_wrapper(counter))
+            if captured is not None:
+                captured.append(stack.enter_context(capture_queries()))
+            start = time.perf_counter()
+            response = send(path, data, **kwargs) if data is not None else send(path)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code != expected:
+            raise CommandError(
+                f"{label}: {method} {path} returned {response.status_code}, expected {expected}."
+            )
+        return elapsed, counter.count
+
+    def run(self, options):
+        self.stdout.write(
+            f"{'scenario':<24} {'method':<7} {'p50 ms':>8} {'p95 ms':>8} {'queries':>8} {'budget':>7}"
+        )
+        results = {}
+        for route, method, label, budget, expected in SCENARIOS:
+            for _ in range(options["warmup"]):
+                self.request(method, label, expected)
+            samples, queries = [], 0
+            for _ in range(options["repeat"]):
+                elapsed, count = self.request(method, label, expected)
+                samples.append(elapsed)
+                queries = max(queries, count)
+            stats = percentiles(samples)
+            results[label] = {
+                "route": route,
+                "method": method,
+                "p50": round(stats["p50"], 3),
+                "p95": round(stats["p95"], 3),
+                "queries": queries,
+                "budget": budget,
+            }
+            self.stdout.write(
+                f"{label:<24} {method:<7} {stats['p50']:>8.2f} {stats['p95']:>8.2f} "
+                f"{queries:>8} {budget:>7}"
+            )
+        return results
+
+    def check_plans(self):
+        """Sequential scans of large tables in any scenario's queries."""
+        failures = []
+        for route, method, label, budget, expected in SCENARIOS:
+            captured = []
+            self.request(method, label, expected, captured)
+            for query in captured[0]:
+                for table in sequential_scans(query):
+                    failures.append(f"{label}: sequential scan of {table} in {query.sql}")
+        self.stdout.write(f"Checked query plans: {len(failures)} sequential scans of large tables.")
+        return failures
+
+    def check_budgets(self, results):
+        return [
+            f"{label}: {result['queries']} queries, budget is {result['budget']}."
+            for label, result in results.items()
+            if result["queries"] > result["budget"]
+        ]
+
+    def load_baseline(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def save_baseline(self, options, sizes, results):
+        queries = {
+            label: {key: value for key, value in result.items() if key not in LATENCY_FIELDS}
+            for label, result in results.items()
+        }
+        self.write_baseline(options["baseline"], options["scale"], sizes, queries)
+        self.write_baseline(options["latency_baseline"], options["scale"], sizes, results)
+
+    def write_baseline(self, path, scale, sizes, results):
+        baseline = self.load_baseline(path)
+        baseline[scale] = {"sizes": sizes, "results": results}
+        with open(path, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        self.stdout.write(f"Saved {scale} baseline to {path}.")
+
+    def check_baseline(self, options, results):
+        scale = options["scale"]
+        failures = []
+        stored = self.load_baseline(options["baseline"]).get(scale)
+        if stored is None:
+            self.stdout.write(f"No {scale} baseline stored; skipping the query comparison.")
+        else:
+            for label, result in results.items():
+                previous = stored["results"].get(label)
+                if previous is not None and result["queries"] > previous["queries"]:
+                    failures.append(
+                        f"{label}: {result['queries']} queries, baseline was {previous['queries']}."
+                    )
+        local = self.load_baseline(options["latency_baseline"]).get(scale)
+        if local is None:
+            self.stdout.write(
+                f"No {scale} latency baseline saved on this machine; skipping the latency "
+                "comparison (save one with --save-baseline)."
+            )
+            return failures
+        for label, result in results.items():
+            previous = local["results"].get(label)
+            if previous is None:
+                continue
+            # Compared on p50: p95 over a few dozen samples is too noisy to gate on.
+            limit = previous["p50"] * (1 + options["tolerance"])
+            if result["p50"] > limit and result["p50"] - previous["p50"] > options["noise_floor"]:
+                failures.append(
+                    f"{label}: p50 {result['p50']:.2f} ms, baseline was {previous['p50']:.2f} ms."
+                )
+        return failures
@@ -0,0 +1,123 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIClient
+from projects.benchmark import QueryCounter, isolated_database, measure
+from projects.models import Activity, Project, ProjectMember
+from projects.pagination import FeedPagination
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures activity feed latency as the number of projects a user "
+        "belongs to grows, with unrelated projects' activity interleaved. Runs "
+        "against a throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=[100, 1_000, 5_000],
+            help="Numbers of followed projects to benchmark at.",
+        )
+        parser.add_argument(
+            "--activities",
+            type=int,
+            default=20,
+            help="Activity rows per project.",
+        )
+        parser.add_argument(
+            "--unfollowed",
+            type=int,
+            default=1_000,
+            help="Projects the user is not in, whose activity the feed must skip.",
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument(
+            "--explain",
+            action="store_true",
+            help="Print the feed query plan at each size.",
+        )
+
+    def handle(self, *args, **options):
+        with isolated_database():
+            self.run(options)
+
+    def run(self, options):
+        user = User.objects.create_user(
+            username="bench", email="bench@example.com", password="bench"
+        )
+        other = User.objects.create_user(username="other", email="other@example.com")
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = f"/api/feed/?page_size={options['page_size']}"
+        self.batch_size = options["batch_size"]
+
+        self.seed(other, options["unfollowed"], options["activities"])
+        self.stdout.write(
+            f"{'projects':>9} {'activities':>11} {'page':>6} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'queries':>8}"
+        )
+        followed = 0
+        for size in sorted(options["sizes"]):
+            projects = self.seed(other, size - followed, options["activities"])
+            ProjectMember.objects.bulk_create(
+                (ProjectMember(user=user, project=project, role="reader") for project in projects),
+                batch_size=self.batch_size,
+            )
+            followed = size
+
+            ids = Activity.objects.filter(project__members__user=user).order_by("-id")
+            middle = ids.values_list("id", flat=True)[ids.count() // 2]
+            windows = {
+                "first": url,
+                "deep": f"{url}&cursor={FeedPagination.encode_id(middle)}",
+            }
+            for label, window_url in windows.items():
+                counter = QueryCounter()
+                with connection.execute_wrapper(counter):
+                    response = client.get(window_url)
+                if response.status_code != 200:
+                    raise CommandError(f"{window_url} returned {response.status_code}.")
+                stats = measure(lambda: client.get(window_url), repeat=options["repeat"])
+                self.stdout.write(
+                    f"{size:>9} {size * options['activities']:>11} {label:>6} "
+                    f"{stats['p50']:>8.2f} {stats['p95']:>8.2f} {counter.count:>8}"
+                )
+            if options["explain"]:
+                self.explain(user, options["page_size"])
+
+    def seed(self, owner, count, activities):
+        """Creates ``count`` projects with ``activities`` rows each, interleaved
+        across projects the way concurrent writes would be."""
+        projects = Project.objects.bulk_create(
+            (Project(name=f"Project {i}", owner=owner) for i in range(count)),
+            batch_size=self.batch_size,
+        )
+        Activity.objects.bulk_create(
+            (
+                Activity(
+                    project=project,
+                    user=owner,
+                    verb=Activity.COMMENT_CREATED,
+                    target_id=0,
+                    detail=f"comment {n}",
+                )
+                for n in range(activities)
+                for project in projects
+            ),
+            batch_size=self.batch_size,
+        )
+        return projects
+
+    def explain(self, user, page_size):
+        project_ids = ProjectMember.objects.filter(user=user).values("project_id")
+        queryset = Activity.objects.filter(project_id__in=project_ids).order_by("-id")
+        for line in queryset[: page_size + 1].explain().splitlines():
+            self.stdout.write(f"    {line}")
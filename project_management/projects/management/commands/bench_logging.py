@@ -0,0 +1,109 @@
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from projects.benchmark import isolated_database, measure
+from projects.logs import BoundedQueueHandler, JsonFormatter
+from projects.models import Project, ProjectMember
+
+User = get_user_model()
+
+# Loggers a request to the project list writes to.
+LOGGERS = ("projects", "users", "django", "django.profiler")
+
+
+class StallingFileHandler(logging.FileHandler):
+    """File handler that sleeps before each write, standing in for a slow disk."""
+
+    def __init__(self, filename, stall):
+        super().__init__(filename)
+        self.stall = stall
+
+    def emit(self, record):
+        if self.stall:
+            time.sleep(self.stall)
+        super().emit(record)
+
+
+@contextmanager
+def routed_to(handler):
+    """Temporarily sends the benchmarked loggers to ``handler`` only."""
+    saved = {}
+    for name in LOGGERS:
+        logger = logging.getLogger(name)
+        saved[name] = (logger.handlers[:], logger.propagate)
+        logger.handlers = [handler] if handler else []
+        logger.propagate = False
+    try:
+        yield
+    finally:
+        for name, (handlers, propagate) in saved.items():
+            logger = logging.getLogger(name)
+            logger.handlers = handlers
+            logger.propagate = propagate
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures per-request logging overhead on the project list: no handlers, "
+        "a synchronous FileHandler, and the queue pipeline (projects.logs), with "
+        "and without a simulated disk stall. Runs against a throwaway test "
+        "database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=300)
+        parser.add_argument(
+            "--stall-ms",
+            type=float,
+            default=2.0,
+            help="Simulated time per log write for the slow-disk runs.",
+        )
+
+    def handle(self, *args, **options):
+        with isolated_database(), tempfile.TemporaryDirectory() as tmp:
+            user = User.objects.create_user(
+                username="bench", email="bench@example.com", password="bench"
+            )
+            for i in range(20):
+                project = Project.objects.create(name=f"Project {i}", owner=user)
+                ProjectMember.objects.create(user=user, project=project, role="owner")
+            client = Client()
+            client.force_login(user)
+
+            def request():
+                if client.get("/api/projects/").status_code != 200:
+                    raise CommandError("/api/projects/ did not return 200.")
+
+            self.stdout.write(
+                f"{'pipeline':<10} {'disk':<6} {'p50 ms':>8} {'p95 ms':>8} {'+p50 ms':>8}"
+            )
+            with routed_to(None):
+                for _ in range(200):  # warm caches before anything is measured
+                    request()
+                baseline = measure(request, repeat=options["repeat"], warmup=10)
+            self.row("none", "-", baseline, baseline)
+
+            for disk, stall in (("fast", 0), ("slow", options["stall_ms"] / 1000)):
+                path = os.path.join(tmp, f"{disk}.log")
+                for pipeline in ("sync", "queue"):
+                    target = StallingFileHandler(path, stall)
+                    target.setFormatter(JsonFormatter())
+                    handler = target
+                    if pipeline == "queue":
+                        handler = BoundedQueueHandler([target], maxsize=100_000)
+                    with routed_to(handler):
+                        stats = measure(request, repeat=options["repeat"], warmup=10)
+                    handler.close()
+                    target.close()
+                    self.row(pipeline, disk, stats, baseline)
+
+    def row(self, pipeline, disk, stats, baseline):
+        self.stdout.write(
+            f"{pipeline:<10} {disk:<6} {stats['p50']:>8.3f} {stats['p95']:>8.3f} "
+            f"{stats['p50'] - baseline['p50']:>+8.3f}"
+        )
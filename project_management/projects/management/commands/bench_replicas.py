@@ -0,0 +1,87 @@
+from collections import Counter
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.test import APIClient
+from projects.benchmark import isolated_database
+from projects.middleware import QueryProfile
+from projects.models import Comment, Project, ProjectMember
+from projects.routing import pin_key
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Shows the read/write split of the projects API with read replicas: "
+        "the queries each request runs on the primary and on the replicas. "
+        "Uses the replicas in DATABASE_REPLICA_URLS, mirrored onto a "
+        "throwaway test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument("--comments", type=int, default=100)
+
+    def handle(self, *args, **options):
+        replicas = settings.REPLICA_ROUTING["REPLICAS"]
+        if not replicas:
+            raise CommandError(
+                "No read replicas are configured. Set DATABASE_REPLICA_URLS; for "
+                "measuring the split, a second URL for the primary will do."
+            )
+        with isolated_database(mirrors=replicas):
+            self.run(replicas, options)
+
+    def run(self, replicas, options):
+        user = User.objects.create_user(
+            username="bench", email="bench@example.com", password="bench"
+        )
+        project = Project.objects.create(name="Replicated", owner=user)
+        ProjectMember.objects.create(user=user, project=project, role="owner")
+        Comment.objects.bulk_create(
+            Comment(project=project, user=user, text=f"comment {i}")
+            for i in range(options["comments"])
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        comments_url = f"/api/projects/{project.id}/comments/"
+        cache = caches[settings.REPLICA_ROUTING["CACHE_ALIAS"]]
+
+        def unpin():
+            cache.delete(pin_key(user.id))
+
+        def write():
+            client.post(comments_url, {"text": "bench"}, format="json")
+
+        scenarios = [
+            ("GET /api/projects/", unpin, lambda: client.get("/api/projects/")),
+            ("GET /api/projects/{id}/", unpin, lambda: client.get(f"/api/projects/{project.id}/")),
+            ("GET /api/projects/{id}/comments/", unpin, lambda: client.get(comments_url)),
+            ("POST /api/projects/{id}/comments/", unpin, write),
+            ("GET comments after a write", write, lambda: client.get(comments_url)),
+        ]
+
+        self.stdout.write(f"{'request':<36} {'primary':>8} {'replicas':>9}  (queries per request)")
+        totals = Counter()
+        for label, before, request in scenarios:
+            per_alias = Counter()
+            for _ in range(options["requests"]):
+                before()
+                with QueryProfile().capture() as profile:
+                    request()
+                per_alias.update(profile.aliases)
+            primary = per_alias[DEFAULT_DB_ALIAS]
+            replica = sum(per_alias[alias] for alias in replicas)
+            totals.update(primary=primary, replica=replica)
+            self.stdout.write(
+                f"{label:<36} {primary / options['requests']:>8.1f} "
+                f"{replica / options['requests']:>9.1f}"
+            )
+        total = totals["primary"] + totals["replica"]
+        self.stdout.write(
+            f"{totals['replica']} of {total} queries ({totals['replica'] / total:.0%}) "
+            f"ran on the replicas ({', '.join(replicas)})."
+        )
@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from projects.benchmark import isolated_database, measure
+from projects.models import Project, Comment
+from projects.rows import RowSerializer
+from projects.serializers import ProjectSerializer, CommentSerializer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares ModelSerializer(many=True) with the values_list() row path "
+        "used by the list endpoints, fetch plus render. Runs against a throwaway "
+        "test database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--batch-size", type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        with isolated_database():
+            self.run(options)
+
+    def run(self, options):
+        user = User.objects.create_user(
+            username="bench", email="bench@example.com", password="bench"
+        )
+        project = Project.objects.create(name="Benchmark", owner=user)
+        Project.objects.bulk_create(
+            (
+                Project(name=f"Project {i}", description=f"Description {i}", owner=user)
+                for i in range(options["rows"])
+            ),
+            batch_size=options["batch_size"],
+        )
+        Comment.objects.bulk_create(
+            (
+                Comment(project=project, user=user, text=f"comment {i}")
+                for i in range(options["rows"])
+            ),
+            batch_size=options["batch_size"],
+        )
+
+        self.stdout.write(
+            f"{'serializer':<20} {'path':<10} {'p50 ms':>8} {'p95 ms':>8} {'speedup':>8}"
+        )
+        cases = (
+            (ProjectSerializer, Project.objects.exclude(pk=project.pk)),
+            (CommentSerializer, Comment.objects.all()),
+        )
+        renderer = JSONRenderer()
+        for serializer_class, queryset in cases:
+            queryset = queryset.order_by("id")
+            rows = RowSerializer(serializer_class)
+
+            def model_path():
+                return renderer.render(serializer_class(queryset, many=True).data)
+
+            def row_path():
+                return renderer.render(rows.serialize(rows.rows(queryset)))
+
+            if model_path() != row_path():
+                raise CommandError(f"{serializer_class.__name__} output differs.")
+            slow = measure(model_path, repeat=options["repeat"])
+            fast = measure(row_path, repeat=options["repeat"])
+            for label, stats in (("model", slow), ("values", fast)):
+                self.stdout.write(
+                    f"{serializer_class.__name__:<20} {label:<10} "
+                    f"{stats['p50']:>8.1f} {stats['p95']:>8.1f} "
+                    f"{slow['p50'] / stats['p50']:>7.1f}x"
+                )
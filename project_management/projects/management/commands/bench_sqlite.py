@@ -0,0 +1,139 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from projects.benchmark import percentiles
+from projects.models import Comment, Project, ProjectMember
+
+User = get_user_model()
+
+PROFILES = {
+    "default": {},
+    "production": settings.SQLITE_PRODUCTION_OPTIONS,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs concurrent comment writers and comment-list readers in separate "
+        "processes against a SQLite file, with Django's default SQLite options "
+        "and with the production profile (WAL, synchronous=NORMAL, mmap, "
+        "busy_timeout, cache size, BEGIN IMMEDIATE), and reports throughput "
+        "and 'database is locked' errors. Uses throwaway files in a temporary "
+        "directory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=4)
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--duration", type=float, default=5.0, help="Seconds per profile.")
+        parser.add_argument("--comments", type=int, default=10_000, help="Comments seeded up front.")
+        parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("bench_sqlite needs the default database to be SQLite.")
+        saved = connection.settings_dict["NAME"], connection.settings_dict["OPTIONS"]
+        directory = tempfile.mkdtemp(prefix="bench_sqlite_")
+        try:
+            template = os.path.join(directory, "template.sqlite3")
+            self.use(template, {})
+            call_command("migrate", verbosity=0, interactive=False)
+            self.seed(options["comments"])
+            connection.close()
+
+            self.stdout.write(
+                f"{options['writers']} writers, {options['readers']} readers, "
+                f"{options['duration']:.0f}s per profile"
+            )
+            self.stdout.write(
+                f"{'profile':<12} {'writes/s':>9} {'reads/s':>9} {'locked':>7} "
+                f"{'write p95 ms':>13} {'read p95 ms':>12}"
+            )
+            for name in options["profiles"]:
+                path = os.path.join(directory, f"{name}.sqlite3")
+                shutil.copyfile(template, path)
+                self.use(path, PROFILES[name])
+                self.row(name, self.run(options))
+        finally:
+            connection.close()
+            connection.settings_dict["NAME"], connection.settings_dict["OPTIONS"] = saved
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def use(self, path, options):
+        connection.close()
+        connection.settings_dict["NAME"] = path
+        connection.settings_dict["OPTIONS"] = dict(options)
+
+    def seed(self, count):
+        user = User.objects.create_user(username="bench", email="bench@example.com")
+        project = Project.objects.create(name="Concurrent", owner=user)
+        ProjectMember.objects.create(user=user, project=project, role="owner")
+        Comment.objects.bulk_create(
+            Comment(project=project, user=user, text=f"seeded comment {i}") for i in range(count)
+        )
+
+    def run(self, options):
+        # Workers are forked, so no connection may be open when they start.
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        start = context.Event()
+        results = context.Queue()
+        workers = [
+            context.Process(target=worker, args=(role, start, options["duration"], results))
+            for role in ["write"] * options["writers"] + ["read"] * options["readers"]
+        ]
+        for process in workers:
+            process.start()
+        start.set()
+        collected = [results.get() for _ in workers]
+        for process in workers:
+            process.join()
+        return collected, options["duration"]
+
+    def row(self, name, run):
+        collected, duration = run
+        writes = [sample for role, samples, _ in collected if role == "write" for sample in samples]
+        reads = [sample for role, samples, _ in collected if role == "read" for sample in samples]
+        locked = sum(errors for _, _, errors in collected)
+        write_p95 = percentiles(writes)["p95"] if writes else float("nan")
+        read_p95 = percentiles(reads)["p95"] if reads else float("nan")
+        self.stdout.write(
+            f"{name:<12} {len(writes) / duration:>9.0f} {len(reads) / duration:>9.0f} "
+            f"{locked:>7} {write_p95:>13.2f} {read_p95:>12.2f}"
+        )
+
+
+def worker(role, start, duration, results):
+    """Writes comments or reads the comment list until ``duration`` is up.
+
+    Writers run a read-then-write transaction, like the API's permission
+    check followed by an insert; readers fetch the newest page of comments.
+    Sends ``(role, latencies in ms, "database is locked" errors)``.
+    """
+    project = Project.objects.get()
+    samples, locked = [], 0
+    start.wait()
+    deadline = time.perf_counter() + duration
+    while (began := time.perf_counter()) < deadline:
+        try:
+            if role == "write":
+                with transaction.atomic():
+                    ProjectMember.objects.filter(project=project).exists()
+                    Comment.objects.create(project=project, user_id=project.owner_id, text="benchmark")
+            else:
+                list(Comment.objects.filter(project=project).order_by("-id")[:50])
+        except OperationalError as exc:
+            if "locked" not in str(exc):
+                raise
+            locked += 1
+            continue
+        samples.append((time.perf_counter() - began) * 1000)
+    connection.close()
+    results.put((role, samples, locked))
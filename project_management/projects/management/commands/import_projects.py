@@ -0,0 +1,84 @@
+import logging
+import os
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from projects.bulk_import import FORMATS, Importer, read_records
+from projects.models import ImportRun
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports projects, members and comments from NDJSON (as written by "
+        "export_project) or CSV in batched transactions, resuming after the "
+        "last committed record, and reports throughput in rows/s."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="NDJSON or CSV file, optionally gzipped (.gz).")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=1_000)
+        parser.add_argument(
+            "--name",
+            help="Name the run is checkpointed under; defaults to the file's absolute path.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Start from the first record instead of resuming a previous run.",
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Load comments with COPY (PostgreSQL with psycopg2 only).",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"{path} does not exist.")
+        if options["copy"] and connection.vendor != "postgresql":
+            raise CommandError("--copy needs a PostgreSQL database.")
+        if options["copy"]:
+            try:
+                import psycopg2  # noqa: F401
+            except ImportError:
+                raise CommandError("--copy needs psycopg2.")
+
+        run, _ = ImportRun.objects.get_or_create(source=options["name"] or os.path.abspath(path))
+        if options["restart"]:
+            run.position, run.state, run.finished_at = 0, {}, None
+            run.save()
+        elif run.finished_at is not None:
+            self.stdout.write(f"{run.source} was already imported; use --restart to import it again.")
+            return
+        elif run.position:
+            self.stdout.write(f"Resuming {run.source} after record {run.position}.")
+
+        importer = Importer(
+            run,
+            batch_size=options["batch_size"],
+            use_copy=options["copy"],
+            progress=self.progress,
+            report=self.skipped,
+        )
+        try:
+            counts = importer.import_records(read_records(path, options["format"]))
+        except ValueError as exc:
+            raise CommandError(f"{exc} Fix the file and rerun to resume after record {run.position}.")
+        logger.info("Imported %s.", run.source)
+        self.stdout.write(
+            f"Imported {counts['projects']} projects, {counts['members']} members and "
+            f"{counts['comments']} comments; {counts['skipped']} records skipped.",
+            style_func=self.style.SUCCESS,
+        )
+
+    def progress(self, position, counts, rate):
+        self.stdout.write(
+            f"record {position}: {counts['projects']} projects, {counts['members']} members, "
+            f"{counts['comments']} comments ({rate:.0f} rows/s)"
+        )
+
+    def skipped(self, position, message):
+        self.stderr.write(f"record {position} skipped: {message}")
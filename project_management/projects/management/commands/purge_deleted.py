@@ -0,0 +1,59 @@
+import logging
+import time
+from django.core.management.base import BaseCommand
+from projects.purge import Purger
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Removes soft-deleted projects and users with their comments, members "
+        "and activity, in batches of bounded size."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1_000)
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between batches, to throttle the purge.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Purge what is currently deleted and exit instead of polling.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to sleep between polls when nothing is pending.",
+        )
+
+    def handle(self, *args, **options):
+        purger = Purger(
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+            progress=self.report,
+        )
+        while True:
+            project_ids, user_ids = purger.pending()
+            for project_id in project_ids:
+                purger.purge_project(project_id)
+                logger.info("Purged deleted project %s.", project_id)
+            for user_id in user_ids:
+                purger.purge_user(user_id)
+                logger.info("Purged deleted user %s.", user_id)
+            if project_ids or user_ids:
+                self.stdout.write(
+                    f"{len(project_ids)} projects, {len(user_ids)} users purged"
+                )
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
+
+    def report(self, label, done, total, rate):
+        self.stdout.write(f"{label}: {done}/{total} rows deleted ({rate:.0f} rows/s)")
@@ -0,0 +1,94 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from projects.models import Project, ProjectMember, Comment
+
+
+def per_project(model, aggregate):
+    """Correlated subquery computing ``aggregate`` over a project's ``model`` rows."""
+    return Subquery(
+        model.objects.filter(project=OuterRef("pk"))
+        .values("project")
+        .annotate(value=aggregate)
+        .values("value")
+    )
+
+
+def true_counters():
+    return {
+        "true_member_count": Coalesce(per_project(ProjectMember, Count("id")), 0),
+        "true_comment_count": Coalesce(per_project(Comment, Count("id")), 0),
+        "true_last_activity_at": per_project(Comment, Max("updated_at")),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes Project.member_count, comment_count and last_activity_at from "
+        "project_members and comments, one chunk of projects per transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1_000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted projects without fixing them.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        total = Project.objects.count()
+        checked = fixed = 0
+        last_id = 0
+        start = time.perf_counter()
+        while True:
+            ids = list(
+                Project.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                drifted_ids = self.drifted(ids)
+                if drifted_ids and not options["dry_run"]:
+                    counters = true_counters()
+                    Project.objects.filter(pk__in=drifted_ids).update(
+                        member_count=counters["true_member_count"],
+                        comment_count=counters["true_comment_count"],
+                        last_activity_at=counters["true_last_activity_at"],
+                    )
+            checked += len(ids)
+            fixed += len(drifted_ids)
+            last_id = ids[-1]
+            self.stdout.write(
+                f"{checked}/{total} projects checked, {fixed} drifted "
+                f"({checked / (time.perf_counter() - start):.0f} projects/s)"
+            )
+
+        verb = "found" if options["dry_run"] else "repaired"
+        self.stdout.write(self.style.SUCCESS(f"Done: {fixed} drifted projects {verb}."))
+
+    def drifted(self, ids):
+        """Ids among ``ids`` whose stored counters differ from the real ones.
+
+        The rows stay locked until the surrounding transaction ends.
+        """
+        rows = (
+            Project.objects.filter(pk__in=ids)
+            .select_for_update()
+            .annotate(**true_counters())
+            .values_list(
+                "pk",
+                "member_count",
+                "comment_count",
+                "last_activity_at",
+                "true_member_count",
+                "true_comment_count",
+                "true_last_activity_at",
+            )
+        )
+        return [row[0] for row in rows if row[1:4] != row[4:7]]
@@ -0,0 +1,194 @@
+"""
+Per-request SQL profiling.
+
+Counts the queries each request runs and the time spent in the database,
+reports them in a ``Server-Timing`` header and on the ``django.profiler``
+logger, and flags statements repeated often enough to look like an N+1.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache, partial
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger("django.profiler")
+n_plus_one_logger = logging.getLogger("django.profiler.n_plus_one")
+
+# Transaction bookkeeping repeats legitimately inside loops of atomic blocks.
+IGNORED_SQL = re.compile(r"\s*(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\b", re.I)
+PLACEHOLDER_LIST = re.compile(r"\(\s*%s(\s*,\s*%s)*\s*\)")
+LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+WHITESPACE = re.compile(r"\s+")
+
+# The profiles capturing in the current context. A context variable rather
+# than wrappers on this thread's connections: under ASGI the ORM runs in
+# asgiref's worker threads, which inherit the context but not the connections.
+_profiles = ContextVar("query_profiles", default=())
+
+
+class NPlusOneError(Exception):
+    """Raised in strict mode when a request repeats a statement too often."""
+
+
+# The ORM emits the same few SQL strings over and over; cache their normalized
+# form rather than running the regexes on every query.
+@lru_cache(maxsize=4096)
+def fingerprint(sql):
+    """Normalizes ``sql`` so that executions differing only in values match."""
+    sql = PLACEHOLDER_LIST.sub("(...)", sql)
+    sql = LITERAL.sub("?", sql)
+    return WHITESPACE.sub(" ", sql).strip()
+
+
+class QueryProfile:
+    """Execute wrapper collecting query count, time, fingerprints and the
+    number of queries run on each database alias."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.aliases = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.aliases[context["connection"].alias] += 1
+            if not IGNORED_SQL.match(sql):
+                self.fingerprints[fingerprint(sql)] += 1
+
+    @contextmanager
+    def capture(self):
+        """Profiles every query run on any database alias inside the block,
+        including queries run by ``sync_to_async`` code it awaits."""
+        for connection in connections.all():
+            install_profiling(connection)
+        token = _profiles.set((*_profiles.get(), self))
+        try:
+            yield self
+        finally:
+            _profiles.reset(token)
+
+    def repeated(self, threshold):
+        """``(fingerprint, count)`` pairs run at least ``threshold`` times."""
+        return [
+            (sql, count)
+            for sql, count in self.fingerprints.most_common()
+            if count >= threshold
+        ]
+
+
+def profile_query(execute, sql, params, many, context):
+    """Execute wrapper handing the query to the profiles capturing in this context."""
+    for profile in _profiles.get():
+        execute = partial(profile, execute)
+    return execute(sql, params, many, context)
+
+
+def install_profiling(connection):
+    if profile_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(profile_query)
+
+
+# Connections are per thread; those opened by worker threads get the wrapper
+# as they connect.
+@receiver(connection_created)
+def profile_new_connection(sender, connection, **kwargs):
+    install_profiling(connection)
+
+
+class QueryProfilerMiddleware:
+    """Profiles the SQL each request runs; configured by ``settings.QUERY_PROFILER``.
+
+    Emits ``Server-Timing: db;dur=..;desc="N queries", app;dur=..`` and one
+    ``django.profiler`` record per request with the numbers as ``extra``
+    fields. Fingerprints repeated ``N_PLUS_ONE_THRESHOLD`` times are logged as
+    warnings, or raised as ``NPlusOneError`` when ``STRICT`` is on.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        config = settings.QUERY_PROFILER
+        if not config["ENABLED"]:
+            return self.get_response(request)
+        start = time.perf_counter()
+        with QueryProfile().capture() as profile:
+            response = self.get_response(request)
+        return self.report(request, response, profile, start, config)
+
+    async def __acall__(self, request):
+        config = settings.QUERY_PROFILER
+        if not config["ENABLED"]:
+            return await self.get_response(request)
+        start = time.perf_counter()
+        with QueryProfile().capture() as profile:
+            response = await self.get_response(request)
+        return self.report(request, response, profile, start, config)
+
+    def report(self, request, response, profile, start, config):
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = profile.duration * 1000
+        repeated = profile.repeated(config["N_PLUS_ONE_THRESHOLD"])
+
+        if config["SERVER_TIMING"]:
+            timing = f'db;dur={db_ms:.2f};desc="{profile.count} queries", app;dur={total_ms:.2f}'
+            existing = response.get("Server-Timing")
+            response["Server-Timing"] = f"{existing}, {timing}" if existing else timing
+
+        fields = {
+            "method": request.method,
+            "path": request.path,
+            "status_code": response.status_code,
+            "sql_queries": profile.count,
+            "sql_time_ms": round(db_ms, 2),
+            "duration_ms": round(total_ms, 2),
+            "sql_repeated": len(repeated),
+            # The read/write split when read replicas are configured.
+            "sql_queries_by_alias": dict(profile.aliases),
+        }
+        logger.info(
+            "%s %s: %d queries, %.2f ms in the database, %.2f ms total",
+            request.method,
+            request.path,
+            profile.count,
+            db_ms,
+            total_ms,
+            extra=fields,
+        )
+        for sql, count in repeated:
+            n_plus_one_logger.warning(
+                "Possible N+1 on %s %s: %d executions of %s",
+                request.method,
+                request.path,
+                count,
+                sql,
+                extra={**fields, "sql_fingerprint": sql, "sql_executions": count},
+            )
+        if repeated and config["STRICT"]:
+            sql, count = repeated[0]
+            raise NPlusOneError(
+                f"{request.method} {request.path} ran {count} executions of: {sql}"
+            )
+        return response
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.6 on 2026-10-18 00:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0004_alter_projectmember_user"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["created_at", "id"], name="projects_created_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-18 00:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0005_project_created_id_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["project", "created_at", "id"],
+                name="comments_project_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,119 @@
+from django.db import migrations
+
+# SQLite: external-content FTS5 tables keyed by the source row id, kept in
+# sync by triggers.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE projects_fts USING fts5(
+        name, description, content='projects', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER projects_fts_ai AFTER INSERT ON projects BEGIN
+        INSERT INTO projects_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER projects_fts_ad AFTER DELETE ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER projects_fts_au AFTER UPDATE OF name, description ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO projects_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO projects_fts(projects_fts) VALUES ('rebuild')",
+    """
+    CREATE VIRTUAL TABLE comments_fts USING fts5(
+        text, content='comments', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER comments_fts_ai AFTER INSERT ON comments BEGIN
+        INSERT INTO comments_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER comments_fts_ad AFTER DELETE ON comments BEGIN
+        INSERT INTO comments_fts(comments_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER comments_fts_au AFTER UPDATE OF text ON comments BEGIN
+        INSERT INTO comments_fts(comments_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO comments_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    "INSERT INTO comments_fts(comments_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS comments_fts_au",
+    "DROP TRIGGER IF EXISTS comments_fts_ad",
+    "DROP TRIGGER IF EXISTS comments_fts_ai",
+    "DROP TABLE IF EXISTS comments_fts",
+    "DROP TRIGGER IF EXISTS projects_fts_au",
+    "DROP TRIGGER IF EXISTS projects_fts_ad",
+    "DROP TRIGGER IF EXISTS projects_fts_ai",
+    "DROP TABLE IF EXISTS projects_fts",
+]
+
+# PostgreSQL: stored generated tsvector columns (maintained by the database on
+# every write) with GIN indexes.
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE projects ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX projects_search_idx ON projects USING GIN (search_vector)",
+    """
+    ALTER TABLE comments ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        to_tsvector('english', coalesce(text, ''))
+    ) STORED
+    """,
+    "CREATE INDEX comments_search_idx ON comments USING GIN (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS comments_search_idx",
+    "ALTER TABLE comments DROP COLUMN IF EXISTS search_vector",
+    "DROP INDEX IF EXISTS projects_search_idx",
+    "ALTER TABLE projects DROP COLUMN IF EXISTS search_vector",
+]
+
+STATEMENTS = {
+    "sqlite": (SQLITE_FORWARD, SQLITE_BACKWARD),
+    "postgresql": (POSTGRES_FORWARD, POSTGRES_BACKWARD),
+}
+
+
+def run(direction):
+    def apply(apps, schema_editor):
+        statements = STATEMENTS.get(schema_editor.connection.vendor)
+        if statements is None:
+            return
+        for sql in statements[direction]:
+            schema_editor.execute(sql)
+
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0007_project_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(run(0), run(1)),
+    ]
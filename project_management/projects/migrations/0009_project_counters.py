@@ -0,0 +1,67 @@
+# Generated by Django 5.1.6 on 2026-10-18 00:59
+
+from importlib import import_module
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+search_index = import_module("projects.migrations.0008_search_index")
+
+
+def restore_search_triggers(apps, schema_editor):
+    # Adding NOT NULL columns makes SQLite rebuild the projects table, which
+    # drops the FTS triggers created in 0008.
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in search_index.SQLITE_FORWARD:
+        if "TRIGGER projects_fts_" in sql:
+            name = sql.split("TRIGGER", 1)[1].split()[0]
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            schema_editor.execute(sql)
+
+
+def backfill_counters(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    ProjectMember = apps.get_model("projects", "ProjectMember")
+    Comment = apps.get_model("projects", "Comment")
+
+    def per_project(model, aggregate):
+        return Subquery(
+            model.objects.filter(project=OuterRef("pk"))
+            .values("project")
+            .annotate(value=aggregate)
+            .values("value")
+        )
+
+    Project.objects.update(
+        member_count=Coalesce(per_project(ProjectMember, Count("id")), 0),
+        comment_count=Coalesce(per_project(Comment, Count("id")), 0),
+        last_activity_at=per_project(Comment, Max("updated_at")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0008_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="comment_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="last_activity_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="member_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
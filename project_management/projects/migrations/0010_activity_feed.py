@@ -0,0 +1,79 @@
+# Generated by Django 5.1.6 on 2026-10-18 01:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_comments(apps, schema_editor):
+    # Seeds feeds with existing comments, oldest first so ids follow time.
+    # Past membership changes have no timestamps and are not backfilled.
+    schema_editor.execute(
+        "INSERT INTO activities (project_id, user_id, verb, target_id, detail, created_at) "
+        "SELECT project_id, user_id, 'comment_created', id, SUBSTR(text, 1, 255), created_at "
+        "FROM comments ORDER BY created_at, id"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0009_project_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Activity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "verb",
+                    models.CharField(
+                        choices=[
+                            ("comment_created", "Comment created"),
+                            ("member_added", "Member added"),
+                            ("member_removed", "Member removed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("target_id", models.PositiveBigIntegerField()),
+                ("detail", models.CharField(blank=True, max_length=255)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="activities",
+                        to="projects.project",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "activities",
+                "indexes": [
+                    models.Index(
+                        fields=["project", "id"], name="activities_project_id_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_comments, migrations.RunPython.noop),
+    ]
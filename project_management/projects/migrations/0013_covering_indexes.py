@@ -0,0 +1,59 @@
+# Generated by Django 5.1.6 on 2026-10-18 01:47
+
+from importlib import import_module
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+search_index = import_module("projects.migrations.0008_search_index")
+
+
+def restore_search_triggers(apps, schema_editor):
+    # Dropping the project_id index makes SQLite rebuild the comments table,
+    # which drops the FTS triggers created in 0008.
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in search_index.SQLITE_FORWARD:
+        if "TRIGGER comments_fts_" in sql:
+            name = sql.split("TRIGGER", 1)[1].split()[0]
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0012_import_runs"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Also rebuilt when unapplying.
+        migrations.RunPython(migrations.RunPython.noop, restore_search_triggers),
+        migrations.AlterField(
+            model_name="comment",
+            name="project",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="comments",
+                to="projects.project",
+            ),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="projectmember",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="projectmember",
+            index=models.Index(
+                fields=["user", "project", "role"], name="members_user_project_role_idx"
+            ),
+        ),
+    ]
@@ -3,16 +3,44 @@ from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
+class LiveProjectManager(models.Manager):
+    """Default manager: hides soft-deleted projects (``all_objects`` sees them)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Project(models.Model):
     """Represents a project in the system."""
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name="owned_projects")
     created_at = models.DateTimeField(auto_now_add=True)
-    # updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True)  # Also bumped on comment and member changes
+    # Denormalized from project_members/comments by projects.signals; rebuilt
+    # by the repair_project_counters command.
+    member_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    last_activity_at = models.DateTimeField(null=True, blank=True)  # Latest comment write
+    # Set by projects.signals.soft_delete_projects; the purge_deleted worker
+    # removes the project and its children later.
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveProjectManager()
+    all_objects = models.Manager()
 
     class Meta:
         db_table = 'projects'
+        indexes = [
+            # Keyset pagination order for the project list.
+            models.Index(fields=["created_at", "id"], name="projects_created_id_idx"),
+            # The purge worker's queue; live projects are left out of the index.
+            models.Index(
+                fields=["deleted_at"],
+                name="projects_deleted_idx",
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -26,13 +54,21 @@ class ProjectMember(models.Model):
         ('reader', 'Reader'),
     ]
 
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Led by the (user, project) unique index and the index below; a
+    # single-column index would only compete with them.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="members")
     role = models.CharField(max_length=10, choices=ROLE_CHOICES)
 
     class Meta:
         unique_together = ('user', 'project')
         db_table = "project_members"
+        indexes = [
+            # Covers lookups of a user's memberships with their roles (project
+            # list, feed and search joins, role checks), so they need not
+            # read the table itself.
+            models.Index(fields=["user", "project", "role"], name="members_user_project_role_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.role} in {self.project.name}"
@@ -41,7 +77,10 @@ class ProjectMember(models.Model):
 class Comment(models.Model):
     """Allows project members (Owner & Editor) to leave comments."""
     
-    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="comments")
+    # Indexed by the timeline index below, which leads with the project.
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name="comments", db_index=False
+    )
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
@@ -49,6 +88,71 @@ class Comment(models.Model):
 
     class Meta:
         db_table = 'comments'
+        indexes = [
+            # Serves the per-project timeline and its before/after windows.
+            models.Index(
+                fields=["project", "created_at", "id"],
+                name="comments_project_created_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Comment by {self.user.username} on {self.project.name}"
+
+class Activity(models.Model):
+    """Append-only record of a comment or membership change, for activity feeds.
+
+    Rows are written by ``projects.signals`` alongside the change itself and
+    never updated. Ids increase with time, so feeds page on ``id`` alone.
+    """
+
+    COMMENT_CREATED = "comment_created"
+    MEMBER_ADDED = "member_added"
+    MEMBER_REMOVED = "member_removed"
+    VERB_CHOICES = [
+        (COMMENT_CREATED, "Comment created"),
+        (MEMBER_ADDED, "Member added"),
+        (MEMBER_REMOVED, "Member removed"),
+    ]
+
+    # Indexed by the (project, id) index below; a single-column index would
+    # only compete with it.
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name="activities", db_index=False
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE)  # Comment author or member
+    verb = models.CharField(max_length=20, choices=VERB_CHOICES)
+    target_id = models.PositiveBigIntegerField()  # Comment id, or the member's user id
+    detail = models.CharField(max_length=255, blank=True)  # Comment excerpt or role
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "activities"
+        indexes = [
+            # Each project's stream in id order; a feed reads its projects'
+            # streams through this index.
+            models.Index(fields=["project", "id"], name="activities_project_id_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_verb_display()} on project {self.project_id}"
+
+
+class ImportRun(models.Model):
+    """Progress of a resumable ``import_projects`` run.
+
+    Saved in the same transaction as each imported batch, so after a failure
+    the run resumes right after the last committed record.
+    """
+
+    source = models.CharField(max_length=255, unique=True)
+    position = models.PositiveBigIntegerField(default=0)  # Last committed record
+    state = models.JSONField(default=dict)  # The open project and its user map
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "import_runs"
 
     def __str__(self):
-        return f"Comment by {self.user.username} on {self.project.name}"
\ No newline at end of file
+        return f"Import of {self.source} at record {self.position}"
@@ -0,0 +1,254 @@
+import base64
+from datetime import datetime
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def encode_cursor(created_at, pk):
+    """Builds an opaque cursor from a row's (created_at, id) key."""
+    raw = f"{created_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Parses a cursor back into its (created_at, id) key."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise NotFound("Invalid cursor.")
+
+
+# The outer bound on created_at alone lets the planner seek into the
+# (created_at, id) index instead of evaluating the OR row by row.
+def older_than(cursor):
+    """Filter for rows strictly before the cursor key."""
+    created_at, pk = decode_cursor(cursor)
+    return Q(created_at__lte=created_at) & (
+        Q(created_at__lt=created_at) | Q(id__lt=pk)
+    )
+
+
+def newer_than(cursor):
+    """Filter for rows strictly after the cursor key."""
+    created_at, pk = decode_cursor(cursor)
+    return Q(created_at__gte=created_at) & (
+        Q(created_at__gt=created_at) | Q(id__gt=pk)
+    )
+
+
+class PageSizeMixin:
+    """Reads ``?page_size=``, bounded by the ``PROJECTS_*PAGE_SIZE`` settings."""
+
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request):
+        default = settings.PROJECTS_PAGE_SIZE
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return default
+        if size <= 0:
+            return default
+        return min(size, settings.PROJECTS_MAX_PAGE_SIZE)
+
+
+class KeysetPagination(PageSizeMixin, BasePagination):
+    """Cursor pagination keyed on (created_at, id), newest first.
+
+    Each page is a range scan starting right after the cursor key, so deep
+    pages cost the same as the first one (no OFFSET).
+
+    ``get_window`` builds the sliced queryset and ``get_page`` turns its rows
+    into a page, so async views can fetch the rows with ``async for``.
+    """
+
+    cursor_query_param = "cursor"
+
+    def get_window(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by("-created_at", "-id")
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(older_than(cursor))
+
+        # Fetch one extra row to know whether another page exists.
+        return queryset[: self.page_size + 1]
+
+    def get_page(self, rows):
+        page = rows[: self.page_size]
+        self.next_cursor = None
+        if len(rows) > self.page_size:
+            last = page[-1]
+            self.next_cursor = encode_cursor(last.created_at, last.pk)
+        return page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.get_page(list(self.get_window(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        window = self.get_window(queryset, request)
+        return self.get_page([row async for row in window])
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.next_cursor
+        )
+
+    def get_paginated_data(self, data):
+        return {"next": self.get_next_link(), "results": data}
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+
+class TimelinePagination(KeysetPagination):
+    """Reverse-chronological window over (created_at, id).
+
+    ``?before=<cursor>`` walks towards older rows and ``?after=<cursor>``
+    towards newer ones. Pages are always returned newest first; ``next``
+    links to older rows and ``previous`` to newer rows.
+    """
+
+    before_query_param = "before"
+    after_query_param = "after"
+
+    def get_window(self, queryset, request):
+        self.request = request
+        self.base_url = remove_query_param(
+            remove_query_param(request.build_absolute_uri(), self.before_query_param),
+            self.after_query_param,
+        )
+        self.page_size = self.get_page_size(request)
+        self.before = request.query_params.get(self.before_query_param)
+        self.after = request.query_params.get(self.after_query_param)
+        self.forward = bool(self.after and not self.before)
+
+        if self.forward:
+            # Scan forward from the cursor, then flip back to newest first.
+            queryset = queryset.filter(newer_than(self.after)).order_by("created_at", "id")
+        else:
+            queryset = queryset.order_by("-created_at", "-id")
+            if self.before:
+                queryset = queryset.filter(older_than(self.before))
+        return queryset[: self.page_size + 1]
+
+    def get_page(self, rows):
+        has_more = len(rows) > self.page_size
+        page = rows[: self.page_size]
+        if self.forward:
+            page = page[::-1]
+            has_older, has_newer = True, has_more
+        else:
+            has_older, has_newer = has_more, bool(self.before)
+
+        self.next_cursor = self.previous_cursor = None
+        if page and has_older:
+            self.next_cursor = encode_cursor(page[-1].created_at, page[-1].pk)
+        if page and has_newer:
+            self.previous_cursor = encode_cursor(page[0].created_at, page[0].pk)
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.base_url, self.before_query_param, self.next_cursor
+        )
+
+    def get_previous_link(self):
+        if self.previous_cursor is None:
+            return None
+        return replace_query_param(
+            self.base_url, self.after_query_param, self.previous_cursor
+        )
+
+    def get_paginated_data(self, data):
+        return {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+
+
+class FeedPagination(KeysetPagination):
+    """Cursor pagination keyed on ``id`` alone, newest first.
+
+    For append-only tables, where ids already follow insertion time. The
+    cursor is the last id of the page, encoded opaquely.
+    """
+
+    def get_window(self, queryset, request):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by("-id")
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(id__lt=self.decode_id(cursor))
+        return queryset[: self.page_size + 1]
+
+    def get_page(self, rows):
+        page = rows[: self.page_size]
+        self.next_cursor = None
+        if len(rows) > self.page_size:
+            self.next_cursor = self.encode_id(page[-1].pk)
+        return page
+
+    @staticmethod
+    def encode_id(pk):
+        return base64.urlsafe_b64encode(str(pk).encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_id(cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            return int(base64.urlsafe_b64decode(padded).decode())
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound("Invalid cursor.")
+
+
+class RankedPagination(PageSizeMixin, BasePagination):
+    """Page-number pagination for ranked search hits.
+
+    Ranking has to score every match before it can sort them, so unlike the
+    timelines a keyset cursor would not avoid that work; a plain OFFSET over
+    the ranked hits is used instead.
+    """
+
+    page_query_param = "page"
+
+    def paginate_search(self, request, run_search):
+        """Calls ``run_search(limit, offset)`` for the requested page."""
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        try:
+            self.page = max(int(request.query_params.get(self.page_query_param, 1)), 1)
+        except ValueError:
+            raise NotFound("Invalid page.")
+
+        rows = run_search(limit=page_size + 1, offset=(self.page - 1) * page_size)
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(self.base_url, self.page_query_param, self.page + 1)
+
+    def get_paginated_data(self, data):
+        return {"next": self.get_next_link(), "results": data}
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
@@ -1,28 +1,20 @@
 from rest_framework import permissions
-from .models import ProjectMember
+from .access import get_project_access, get_project_role, EDITOR_ROLES, READER_ROLES
 
 class IsProjectOwner(permissions.BasePermission):
     """Only project owners can manage user roles and delete projects."""
-    
+
     def has_object_permission(self, request, view, obj):
-        return obj.owner == request.user
+        return get_project_access(request, obj.pk).owner_id == request.user.id
 
 class IsProjectEditor(permissions.BasePermission):
     """Editors can edit project details but not delete or manage roles."""
 
     def has_object_permission(self, request, view, obj):
-        try:
-            member = ProjectMember.objects.get(user=request.user, project=obj)
-            return member.role in ['owner', 'editor']
-        except ProjectMember.DoesNotExist:
-            return False
+        return get_project_role(request, obj.pk) in EDITOR_ROLES
 
 class IsProjectReader(permissions.BasePermission):
     """Readers can only view the project but not modify it."""
 
     def has_object_permission(self, request, view, obj):
-        try:
-            member = ProjectMember.objects.get(user=request.user, project=obj)
-            return member.role in ['owner', 'editor', 'reader']
-        except ProjectMember.DoesNotExist:
-            return False
+        return get_project_role(request, obj.pk) in READER_ROLES
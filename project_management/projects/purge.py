@@ -0,0 +1,103 @@
+"""
+Background removal of soft-deleted projects and users.
+
+Deleting a project or user only hides it (``soft_delete_projects``,
+``CustomUser.soft_delete``). ``Purger`` removes the hidden rows afterwards,
+children first, in batches of bounded size, each batch in its own short
+transaction, so no delete holds locks for long.
+"""
+
+import time
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Activity, Project, ProjectMember, Comment
+from .signals import forget_comments, invalidate_roles
+
+User = get_user_model()
+
+
+class Purger:
+    """Removes soft-deleted projects and users ``batch_size`` rows at a time.
+
+    ``progress(label, done, total, rate)`` is called after every batch, with
+    ``rate`` in rows per second. ``pause`` seconds are slept between batches
+    to leave room for foreground writes.
+    """
+
+    def __init__(self, batch_size=1_000, pause=0.0, progress=None):
+        self.batch_size = batch_size
+        self.pause = pause
+        self.progress = progress or (lambda label, done, total, rate: None)
+
+    def pending(self):
+        """Ids of the soft-deleted ``(projects, users)`` waiting to be purged."""
+        return (
+            list(Project.all_objects.filter(deleted_at__isnull=False).values_list("pk", flat=True)),
+            list(User.all_objects.filter(deleted_at__isnull=False).values_list("pk", flat=True)),
+        )
+
+    def purge_project(self, project_id):
+        label = f"project {project_id}"
+        self.delete_in_batches(f"{label} comments", Comment.objects.filter(project_id=project_id))
+        self.delete_in_batches(f"{label} activities", Activity.objects.filter(project_id=project_id))
+        self.delete_in_batches(f"{label} members", ProjectMember.objects.filter(project_id=project_id))
+        # Nothing is left for the collector to cascade over.
+        Project.all_objects.filter(pk=project_id).delete()
+
+    def purge_user(self, user_id):
+        # The user's own projects were soft-deleted along with them.
+        owned = Project.all_objects.filter(owner_id=user_id).values_list("pk", flat=True)
+        for project_id in list(owned):
+            self.purge_project(project_id)
+
+        label = f"user {user_id}"
+        self.delete_in_batches(
+            f"{label} comments",
+            Comment.objects.filter(user_id=user_id),
+            before=lambda ids: forget_comments(Comment.objects.filter(pk__in=ids)),
+        )
+        self.delete_in_batches(
+            f"{label} memberships",
+            ProjectMember.objects.filter(user_id=user_id),
+            before=self.forget_memberships,
+        )
+        self.delete_in_batches(f"{label} activities", Activity.objects.filter(user_id=user_id))
+        User.all_objects.filter(pk=user_id).delete()
+
+    def forget_memberships(self, ids):
+        """Takes memberships about to be deleted off caches and member counts.
+
+        Each belongs to a different project, so every project loses one member.
+        """
+        keys = list(ProjectMember.objects.filter(pk__in=ids).values_list("user_id", "project_id"))
+        invalidate_roles(keys)
+        Project.all_objects.filter(pk__in=[project_id for _, project_id in keys]).update(
+            member_count=F("member_count") - 1, updated_at=timezone.now()
+        )
+
+    def delete_in_batches(self, label, queryset, before=None):
+        """Deletes ``queryset``'s rows in batches; ``before(ids)`` runs in each
+        batch's transaction ahead of the delete."""
+        model = queryset.model
+        total = queryset.count()
+        done = 0
+        start = time.perf_counter()
+        while True:
+            ids = list(queryset.order_by("pk").values_list("pk", flat=True)[: self.batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                if before is not None:
+                    before(ids)
+                # A raw delete skips the collector and the per-row signals,
+                # which would record activity and bump counters for rows that
+                # are going away with their project or user.
+                batch = model._base_manager.filter(pk__in=ids)
+                batch._raw_delete(batch.db)
+            done += len(ids)
+            self.progress(label, done, total, done / (time.perf_counter() - start))
+            if self.pause:
+                time.sleep(self.pause)
+        return done
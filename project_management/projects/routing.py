@@ -0,0 +1,122 @@
+"""
+Read-replica routing for the projects API.
+
+Views with ``ReplicaReadsMixin`` send the reads of GET/HEAD/OPTIONS requests
+to one of ``settings.REPLICA_ROUTING["REPLICAS"]``, picked per request.
+Everything else (unsafe methods, management commands, code outside those
+views) keeps using the primary.
+
+Replicas lag behind the primary, so users read their own writes from it: the
+first write in a request sends the rest of the request's reads to the primary
+and pins the user there for ``STICKY_SECONDS``, which should cover the
+replication lag.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_route = ContextVar("projects_route", default=None)
+
+
+class Route:
+    """Where the reads of the current request go."""
+
+    def __init__(self, user_id, replica):
+        self.user_id = user_id
+        self.replica = replica
+        self.wrote = False
+
+
+def pin_key(user_id):
+    return f"projects:routing:pinned:{user_id}"
+
+
+def is_pinned(user_id):
+    config = settings.REPLICA_ROUTING
+    return caches[config["CACHE_ALIAS"]].get(pin_key(user_id)) is not None
+
+
+def pin(user_id):
+    """Keeps ``user_id`` reading from the primary for ``STICKY_SECONDS``."""
+    config = settings.REPLICA_ROUTING
+    caches[config["CACHE_ALIAS"]].set(pin_key(user_id), True, config["STICKY_SECONDS"])
+
+
+def current_replica():
+    """The replica alias the current request reads from, or ``None``."""
+    route = _route.get()
+    return route.replica if route is not None else None
+
+
+def choose_replica(method, user):
+    """A replica alias for the reads of a ``method`` request by ``user``, or
+    ``None`` for the primary."""
+    replicas = settings.REPLICA_ROUTING["REPLICAS"]
+    if not replicas or method not in SAFE_METHODS:
+        return None
+    if user.is_authenticated and is_pinned(user.id):
+        return None
+    return random.choice(replicas)
+
+
+@contextmanager
+def routed(method, user):
+    """Routes the reads inside the block as for a ``method`` request by ``user``.
+
+    For the native async views; ``ReplicaReadsMixin`` does the same for DRF.
+    """
+    token = _route.set(Route(user.id, choose_replica(method, user)))
+    try:
+        yield
+    finally:
+        _route.reset(token)
+
+
+class ReplicaReadsMixin:
+    """APIView mixin routing the reads of safe-method requests to a replica."""
+
+    def dispatch(self, request, *args, **kwargs):
+        token = _route.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _route.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        # The user is needed to tell whether they are pinned to the primary.
+        # Permission checks, which run next, already read from the replica.
+        self.perform_authentication(request)
+        _route.set(Route(request.user.id, choose_replica(request.method, request.user)))
+        super().initial(request, *args, **kwargs)
+
+
+class ReplicaRouter:
+    """Database router following the route of the current request."""
+
+    def db_for_read(self, model, **hints):
+        route = _route.get()
+        if route is None:
+            return None
+        return route.replica or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        route = _route.get()
+        if route is not None and not route.wrote:
+            route.wrote = True
+            route.replica = None
+            if route.user_id is not None:
+                pin(route.user_id)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_ROUTING["REPLICAS"]}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
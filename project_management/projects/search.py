@@ -0,0 +1,108 @@
+"""
+Full-text search over project names/descriptions and comments.
+
+Backed by the inverted indexes created in migration 0008: FTS5 tables on
+SQLite and GIN-indexed ``tsvector`` columns on PostgreSQL.
+"""
+
+import re
+from django.db import DEFAULT_DB_ALIAS, NotSupportedError, connections, router
+from django.db.models.expressions import RawSQL
+from .models import Project, Comment
+
+# Per-vendor SQL. Each arm yields (kind, id, score) rows, lower scores ranking
+# higher, restricted to the caller's projects.
+SEARCH_SQL = {
+    "sqlite": """
+        SELECT 'project' AS kind, projects_fts.rowid AS id, bm25(projects_fts) AS score
+        FROM projects_fts
+        WHERE projects_fts MATCH %(query)s AND projects_fts.rowid IN (
+            SELECT project_id FROM project_members m JOIN projects mp ON mp.id = m.project_id
+            WHERE m.user_id = %(user_id)s AND mp.deleted_at IS NULL
+        )
+        UNION ALL
+        SELECT 'comment', c.id, bm25(comments_fts)
+        FROM comments_fts JOIN comments c ON c.id = comments_fts.rowid
+        WHERE comments_fts MATCH %(query)s AND c.project_id IN (
+            SELECT project_id FROM project_members m JOIN projects mp ON mp.id = m.project_id
+            WHERE m.user_id = %(user_id)s AND mp.deleted_at IS NULL
+        )
+        ORDER BY score, kind, id
+        LIMIT %(limit)s OFFSET %(offset)s
+    """,
+    "postgresql": """
+        SELECT 'project' AS kind, p.id, -ts_rank(p.search_vector, q) AS score
+        FROM projects p, websearch_to_tsquery('english', %(query)s) q
+        WHERE p.search_vector @@ q AND p.id IN (
+            SELECT project_id FROM project_members m JOIN projects mp ON mp.id = m.project_id
+            WHERE m.user_id = %(user_id)s AND mp.deleted_at IS NULL
+        )
+        UNION ALL
+        SELECT 'comment', c.id, -ts_rank(c.search_vector, q)
+        FROM comments c, websearch_to_tsquery('english', %(query)s) q
+        WHERE c.search_vector @@ q AND c.project_id IN (
+            SELECT project_id FROM project_members m JOIN projects mp ON mp.id = m.project_id
+            WHERE m.user_id = %(user_id)s AND mp.deleted_at IS NULL
+        )
+        ORDER BY score, kind, id
+        LIMIT %(limit)s OFFSET %(offset)s
+    """,
+}
+
+MATCH_SQL = {
+    "sqlite": {
+        Project: "SELECT rowid FROM projects_fts WHERE projects_fts MATCH %s",
+        Comment: "SELECT rowid FROM comments_fts WHERE comments_fts MATCH %s",
+    },
+    "postgresql": {
+        Project: "SELECT id FROM projects WHERE search_vector @@ websearch_to_tsquery('english', %s)",
+        Comment: "SELECT id FROM comments WHERE search_vector @@ websearch_to_tsquery('english', %s)",
+    },
+}
+
+
+def get_vendor_sql(table, using=DEFAULT_DB_ALIAS):
+    vendor = connections[using].vendor
+    try:
+        return table[vendor]
+    except KeyError:
+        raise NotSupportedError(f"Full-text search is not available on {vendor}.")
+
+
+def to_match_query(text, using=DEFAULT_DB_ALIAS):
+    """Turns free text into an index query.
+
+    FTS5 treats quotes, dashes and keywords as syntax, so on SQLite every word
+    is quoted and the words are ANDed. PostgreSQL parses free text itself via
+    ``websearch_to_tsquery``.
+    """
+    if connections[using].vendor != "sqlite":
+        return text
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", text))
+
+
+def matching_ids(model, text):
+    """Subquery of ``model`` ids matching ``text``, for use in ``id__in``.
+
+    Returns ``None`` when ``text`` has nothing to search for.
+    """
+    query = to_match_query(text)
+    if not query.strip():
+        return None
+    return RawSQL(get_vendor_sql(MATCH_SQL)[model], [query])
+
+
+def search(user, text, limit, offset=0):
+    """Ranked ``(kind, id, score)`` hits in the projects ``user`` belongs to.
+
+    Runs on the database the router picks for reads, like the ``in_bulk``
+    that fetches the hits afterwards.
+    """
+    using = router.db_for_read(Project)
+    query = to_match_query(text, using)
+    if not query.strip():
+        return []
+    params = {"query": query, "user_id": user.id, "limit": limit, "offset": offset}
+    with connections[using].cursor() as cursor:
+        cursor.execute(get_vendor_sql(SEARCH_SQL, using), params)
+        return cursor.fetchall()
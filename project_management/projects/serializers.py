@@ -1,14 +1,68 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
 from rest_framework import serializers
-from .models import Project, ProjectMember, Comment
+from .models import Activity, Project, ProjectMember, Comment
+from .signals import member_activity, touch_project
 
+User = get_user_model()
 
-class ProjectSerializer(serializers.ModelSerializer):
+
+class SparseFieldsMixin:
+    """Lets a serializer be narrowed to a subset of its fields.
+
+    ``list_fields`` is the compact representation used by list endpoints when
+    the caller does not ask for specific fields; ``None`` means all fields.
+    """
+
+    list_fields = None
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def get_requested_fields(cls, request, default=None):
+        """Field names picked with ``?fields=a,b``, or ``default`` if absent.
+
+        Unknown names are rejected with a 400 rather than silently ignored.
+        """
+        raw = request.query_params.get("fields")
+        if not raw:
+            return default
+        names = list(dict.fromkeys(name.strip() for name in raw.split(",") if name.strip()))
+        unknown = [name for name in names if name not in cls().fields]
+        if unknown:
+            raise serializers.ValidationError(
+                {"fields": [f"Unknown field(s): {', '.join(unknown)}."]}
+            )
+        return names
+
+
+class ProjectSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Handles project creation and details."""
 
+    list_fields = (
+        "id",
+        "name",
+        "owner",
+        "member_count",
+        "comment_count",
+        "last_activity_at",
+    )
+
     class Meta:
         model = Project
-        fields = "__all__"
-        read_only_fields = ["owner", "created_at"]
+        exclude = ["deleted_at"]
+        read_only_fields = [
+            "owner",
+            "created_at",
+            "member_count",
+            "comment_count",
+            "last_activity_at",
+        ]
 
     def create(self, validated_data):
         """Ensure the creator is the project owner."""
@@ -19,6 +73,19 @@ class ProjectSerializer(serializers.ModelSerializer):
 
         return project
 
+    def update(self, instance, validated_data):
+        """Writes only the submitted columns.
+
+        The counters and ``last_activity_at`` move with every member and
+        comment write; saving the whole row would put back the values loaded
+        at the start of the request. The same goes for ``deleted_at``: a
+        project soft-deleted meanwhile must stay deleted.
+        """
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.save(update_fields=[*validated_data, "updated_at"])
+        return instance
+
 
 class ProjectMemberSerializer(serializers.ModelSerializer):
     """Handles adding users to projects with roles."""
@@ -28,10 +95,98 @@ class ProjectMemberSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class BulkMemberEntrySerializer(serializers.Serializer):
+    """One ``{user, role}`` row of a bulk member assignment."""
+
+    user = serializers.IntegerField()
+    role = serializers.ChoiceField(choices=ProjectMember.ROLE_CHOICES)
+
+
+class ProjectMemberBulkSerializer(serializers.Serializer):
+    """Adds many users to a project at once.
+
+    All users are resolved in one query and new memberships are inserted with
+    a single ``bulk_create``. Users who are already members are skipped.
+    """
+
+    members = BulkMemberEntrySerializer(many=True, allow_empty=False)
+
+    def validate_members(self, members):
+        if len(members) > settings.PROJECTS_BULK_MEMBERS_MAX:
+            raise serializers.ValidationError(
+                f"At most {settings.PROJECTS_BULK_MEMBERS_MAX} members per request."
+            )
+        user_ids = {entry["user"] for entry in members}
+        known = set(User.objects.filter(id__in=user_ids).values_list("id", flat=True))
+
+        errors, seen = [], set()
+        for entry in members:
+            if entry["user"] not in known:
+                errors.append(
+                    {"user": [f'Invalid pk "{entry["user"]}" - object does not exist.']}
+                )
+            elif entry["user"] in seen:
+                errors.append({"user": ["Duplicate user in request."]})
+            else:
+                errors.append({})
+            seen.add(entry["user"])
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return members
+
+    def create(self, validated_data):
+        project = validated_data["project"]
+        members = validated_data["members"]
+        with transaction.atomic():
+            existing = set(
+                ProjectMember.objects.filter(
+                    project=project, user_id__in=[entry["user"] for entry in members]
+                ).values_list("user_id", flat=True)
+            )
+            created = [entry for entry in members if entry["user"] not in existing]
+            # ignore_conflicts covers memberships added concurrently since the
+            # lookup above. New members have no cached role, so bypassing the
+            # post_save signal leaves nothing stale in the role cache.
+            memberships = ProjectMember.objects.bulk_create(
+                [
+                    ProjectMember(project=project, user_id=entry["user"], role=entry["role"])
+                    for entry in created
+                ],
+                ignore_conflicts=True,
+            )
+            if created:
+                # bulk_create skips post_save, so bump the project and record
+                # the activity by hand. Rows lost to a concurrent insert are
+                # over-counted here; repair_project_counters corrects that.
+                touch_project(project.pk, member_count=len(created))
+                Activity.objects.bulk_create(
+                    member_activity(member, Activity.MEMBER_ADDED) for member in memberships
+                )
+        return {
+            "created": created,
+            "skipped": [entry["user"] for entry in members if entry["user"] in existing],
+        }
+
+    def to_representation(self, instance):
+        return {
+            "created": [dict(entry) for entry in instance["created"]],
+            "skipped": instance["skipped"],
+        }
+
+
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Handles commenting on projects."""
 
     class Meta:
         model = Comment
         fields = "__all__"
-        read_only_fields = ["user", "created_at"]
+        read_only_fields = ["user", "project", "created_at"]
+
+
+class ActivitySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """One entry of a user's activity feed."""
+
+    class Meta:
+        model = Activity
+        fields = "__all__"
+        read_only_fields = ["project", "user", "verb", "target_id", "detail", "created_at"]
@@ -0,0 +1,136 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from users.models import user_soft_deleted
+from .cache import get_role_cache
+from .models import Activity, Project, ProjectMember, Comment
+
+User = get_user_model()
+
+
+def invalidate_roles(keys):
+    """Drops cached roles now and again once the surrounding transaction commits,
+    so a concurrent reader cannot re-cache the pre-commit role."""
+    keys = list(keys)
+    get_role_cache().delete_many(keys)
+    transaction.on_commit(lambda: get_role_cache().delete_many(keys))
+
+
+@receiver(post_save, sender=ProjectMember)
+@receiver(post_delete, sender=ProjectMember)
+def invalidate_member_role(sender, instance, **kwargs):
+    invalidate_roles([(instance.user_id, instance.project_id)])
+
+
+@receiver(pre_delete, sender=Project)
+def invalidate_project_roles(sender, instance, **kwargs):
+    user_ids = instance.members.values_list("user_id", flat=True)
+    invalidate_roles((user_id, instance.pk) for user_id in user_ids)
+
+
+def soft_delete_projects(projects):
+    """Hides ``projects`` (a queryset) at once; ``purge_deleted`` removes them later.
+
+    Their members' cached roles are dropped so that role-cache hits cannot
+    reach a hidden project.
+    """
+    memberships = ProjectMember.objects.filter(project__in=projects)
+    invalidate_roles(memberships.values_list("user_id", "project_id"))
+    projects.update(deleted_at=timezone.now())
+
+
+@receiver(user_soft_deleted)
+def soft_delete_owned_projects(sender, instance, **kwargs):
+    # Deleting a user deletes the projects they own.
+    soft_delete_projects(Project.objects.filter(owner=instance))
+
+
+def touch_project(project_id, last_activity_at=None, **deltas):
+    """Bumps ``Project.updated_at`` so conditional GETs see the change.
+
+    ``deltas`` adjust the denormalized counters in the same UPDATE, e.g.
+    ``comment_count=1``; F-expressions keep concurrent writers from losing
+    increments.
+    """
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if last_activity_at is not None:
+        changes["last_activity_at"] = last_activity_at
+    Project.objects.filter(pk=project_id).update(updated_at=timezone.now(), **changes)
+
+
+def forget_comments(comments):
+    """Takes ``comments`` (a queryset about to be deleted) off their projects' counters."""
+    per_project = comments.values("project_id").annotate(count=Count("id")).order_by()
+    for row in per_project:
+        touch_project(row["project_id"], comment_count=-row["count"])
+
+
+# Comment deletes are deliberately not hooked: a post_delete receiver would
+# stop the collector from fast-deleting a project's comments. Code that deletes
+# comments calls forget_comments (or touch_project) itself.
+@receiver(post_save, sender=Comment)
+def touch_project_on_comment(sender, instance, created, **kwargs):
+    touch_project(
+        instance.project_id,
+        last_activity_at=instance.updated_at,
+        comment_count=1 if created else 0,
+    )
+
+
+def deleted_with(origin, model):
+    """Whether a delete cascades from ``origin``, a ``model`` instance or queryset."""
+    return isinstance(origin, model) or getattr(origin, "model", None) is model
+
+
+def member_activity(member, verb):
+    return Activity(
+        project_id=member.project_id,
+        user_id=member.user_id,
+        verb=verb,
+        target_id=member.user_id,
+        detail=member.role,
+    )
+
+
+@receiver(post_save, sender=Comment)
+def record_comment_activity(sender, instance, created, **kwargs):
+    if created:
+        Activity.objects.create(
+            project_id=instance.project_id,
+            user_id=instance.user_id,
+            verb=Activity.COMMENT_CREATED,
+            target_id=instance.pk,
+            detail=instance.text[:255],
+        )
+
+
+@receiver(post_save, sender=ProjectMember)
+@receiver(post_delete, sender=ProjectMember)
+def record_member_activity(sender, instance, origin=None, created=False, **kwargs):
+    # Members cascading from a project or user delete get no activity: its
+    # rows are being deleted along with them.
+    if deleted_with(origin, Project) or deleted_with(origin, User):
+        return
+    if created:
+        member_activity(instance, Activity.MEMBER_ADDED).save()
+    elif kwargs["signal"] is post_delete:
+        member_activity(instance, Activity.MEMBER_REMOVED).save()
+
+
+@receiver(post_save, sender=ProjectMember)
+@receiver(post_delete, sender=ProjectMember)
+def touch_project_on_member(sender, instance, origin=None, created=False, **kwargs):
+    # Skip members cascading from a project delete; the project is going away.
+    if deleted_with(origin, Project):
+        return
+    delta = 1 if created else -1 if kwargs["signal"] is post_delete else 0
+    touch_project(instance.project_id, member_count=delta)
+
+
+@receiver(pre_delete, sender=User)
+def forget_user_comments(sender, instance, **kwargs):
+    # A user's comments are fast-deleted with them, without signals.
+    forget_comments(Comment.objects.filter(user=instance))
@@ -1,13 +1,45 @@
+import asyncio
+import gzip
+import unittest
+import json
+import os
+import sys
+import tempfile
+from io import StringIO
+import logging
+import threading
+import time
+from django.conf import settings
+from django.contrib import admin
+from django.http import HttpResponse
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
-from .models import Project, ProjectMember, Comment
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.cache import cache
+from django.db import connection, connections
+from django.core.handlers.asgi import ASGIHandler
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from django.test.utils import CaptureQueriesContext
+from .cache import LocalRoleCache, get_role_cache
+from .explain import VENDORS, capture_queries, sequential_scans
+from .logs import BoundedQueueHandler, JsonFormatter
+from .middleware import NPlusOneError, QueryProfilerMiddleware, fingerprint
+from .models import Activity, Project, ProjectMember, Comment
+from .rows import RowSerializer
+from .serializers import ProjectSerializer, CommentSerializer
+from .signals import soft_delete_projects
+from users.tokens import issue_token
 
 User = get_user_model()
 
 
 class ProjectListCreateViewTests(APITestCase):
     def setUp(self):
+        get_role_cache().clear()
         self.client = APIClient()
         self.user = User.objects.create_user(
             email="test@example.com", password="testpass123", username="TestUser"
@@ -22,8 +54,75 @@ class ProjectListCreateViewTests(APITestCase):
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["name"], "Test Project")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["name"], "Test Project")
+        self.assertIsNone(response.data["next"])
+
+    def test_list_projects_cursor_pagination(self):
+        """Test walking the project list page by page with the next cursor."""
+        for i in range(5):
+            project = Project.objects.create(name=f"Project {i}", owner=self.user)
+            ProjectMember.objects.create(user=self.user, project=project, role="owner")
+
+        names = []
+        url = f"{self.url}?page_size=2"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            names.extend(project["name"] for project in response.data["results"])
+            url = response.data["next"]
+
+        self.assertEqual(names, [f"Project {i}" for i in reversed(range(5))])
+
+    def test_list_projects_compact_by_default(self):
+        """Test that the list returns the compact representation unless asked."""
+        project = Project.objects.create(
+            name="Test Project", description="Long text", owner=self.user
+        )
+        ProjectMember.objects.create(user=self.user, project=project, role="owner")
+
+        response = self.client.get(self.url)
+        self.assertEqual(
+            response.data["results"],
+            [
+                {
+                    "id": project.id,
+                    "name": "Test Project",
+                    "owner": self.user.id,
+                    "member_count": 1,
+                    "comment_count": 0,
+                    "last_activity_at": None,
+                }
+            ],
+        )
+
+    def test_list_projects_sparse_fields(self):
+        """Test that ?fields= picks the returned fields and the selected columns."""
+        project = Project.objects.create(
+            name="Test Project", description="Long text", owner=self.user
+        )
+        ProjectMember.objects.create(user=self.user, project=project, role="owner")
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f"{self.url}?fields=id,description")
+        self.assertEqual(
+            response.data["results"], [{"id": project.id, "description": "Long text"}]
+        )
+        sql = ctx.captured_queries[-1]["sql"]
+        self.assertNotIn('"projects"."name"', sql)
+        self.assertIn('"projects"."description"', sql)
+
+    def test_list_projects_unknown_field(self):
+        """Test that asking for a field that does not exist is a 400."""
+        response = self.client.get(f"{self.url}?fields=id,secret")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("secret", str(response.data["fields"]))
+
+    def test_list_projects_invalid_cursor(self):
+        """Test that a malformed cursor is rejected."""
+        response = self.client.get(f"{self.url}?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_create_project(self):
         """Test creating a new project."""
@@ -39,6 +138,7 @@ class ProjectListCreateViewTests(APITestCase):
 
 class ProjectDetailViewTests(APITestCase):
     def setUp(self):
+        get_role_cache().clear()
         self.client = APIClient()
         self.user = User.objects.create_user(
             email="test1@example.com", password="testpass123", username="TestUser1"
@@ -69,9 +169,58 @@ class ProjectDetailViewTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Project.objects.filter(id=self.project.id).exists())
 
+    def test_retrieve_project_single_query(self):
+        """Test that the project and the caller's role are fetched together."""
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_retrieve_project_not_modified(self):
+        """Test conditional GETs on a project with ETag and Last-Modified."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        other = User.objects.create_user(
+            email="member@example.com", password="testpass123", username="Member"
+        )
+        ProjectMember.objects.create(user=other, project=self.project, role="reader")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_retrieve_project_non_member(self):
+        """Test that non-members are denied access."""
+        outsider = User.objects.create_user(
+            email="outsider@example.com", password="testpass123", username="Outsider"
+        )
+        self.client.force_authenticate(user=outsider)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_update_project_reader(self):
+        """Test that readers cannot update a project."""
+        reader = User.objects.create_user(
+            email="reader@example.com", password="testpass123", username="Reader"
+        )
+        ProjectMember.objects.create(user=reader, project=self.project, role="reader")
+        self.client.force_authenticate(user=reader)
+        response = self.client.put(self.url, {"name": "Renamed"})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_retrieve_missing_project(self):
+        """Test that an unknown project ID returns 404."""
+        response = self.client.get("/api/projects/999999/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
 
 class ProjectMemberViewTests(APITestCase):
     def setUp(self):
+        get_role_cache().clear()
         self.client = APIClient()
         self.owner = User.objects.create_user(
             username="owner",
@@ -89,10 +238,75 @@ class ProjectMemberViewTests(APITestCase):
         )
         self.client.force_authenticate(user=self.owner)
         self.url = f"/api/projects/{self.project.id}/members/"
+        self.bulk_url = f"/api/projects/{self.project.id}/members/bulk/"
+
+    def test_bulk_add_members(self):
+        """Test adding many members in one request with a fixed query count."""
+        users = [
+            User.objects.create_user(
+                username=f"bulk{i}", email=f"bulk{i}@example.com", password="testpass123"
+            )
+            for i in range(20)
+        ]
+        payload = {"members": [{"user": u.id, "role": "editor"} for u in users]}
+        # project access, user lookup, savepoint, existing members, insert,
+        # updated_at bump, activity insert, release
+        with self.assertNumQueries(8):
+            response = self.client.post(self.bulk_url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data["created"]), 20)
+        self.assertEqual(
+            ProjectMember.objects.filter(project=self.project, role="editor").count(), 20
+        )
+
+    def test_bulk_add_skips_existing_members(self):
+        """Test that users who already belong to the project are skipped."""
+        ProjectMember.objects.create(user=self.user, project=self.project, role="reader")
+        payload = {
+            "members": [
+                {"user": self.user.id, "role": "editor"},
+                {"user": self.owner.id, "role": "reader"},
+            ]
+        }
+        response = self.client.post(self.bulk_url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], [])
+        self.assertEqual(response.data["skipped"], [self.user.id, self.owner.id])
+        self.assertEqual(
+            ProjectMember.objects.get(user=self.user, project=self.project).role,
+            "reader",
+        )
+
+    def test_bulk_add_reports_row_errors(self):
+        """Test that invalid rows are reported by position and nothing is saved."""
+        payload = {
+            "members": [
+                {"user": self.user.id, "role": "editor"},
+                {"user": 999999, "role": "editor"},
+                {"user": self.user.id, "role": "admin"},
+            ]
+        }
+        response = self.client.post(self.bulk_url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = response.data["members"]
+        self.assertEqual(errors[0], {})
+        self.assertIn("role", errors[2])
+        self.assertFalse(
+            ProjectMember.objects.filter(user=self.user, project=self.project).exists()
+        )
+
+    def test_bulk_add_requires_owner(self):
+        """Test that only the project owner can bulk add members."""
+        ProjectMember.objects.create(user=self.user, project=self.project, role="editor")
+        self.client.force_authenticate(user=self.user)
+        payload = {"members": [{"user": self.user.id, "role": "owner"}]}
+        response = self.client.post(self.bulk_url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
 class CommentListCreateViewTests(APITestCase):
     def setUp(self):
+        get_role_cache().clear()
         self.client = APIClient()
         self.user = User.objects.create_user(
             username="testuser",
@@ -116,3 +330,1214 @@ class CommentListCreateViewTests(APITestCase):
 
         # Clean up the created comment
         Comment.objects.filter(text="This is a test comment.").delete()
+
+    def test_list_comments_timeline(self):
+        """Test the newest-first comment timeline and its before/after windows."""
+        for i in range(5):
+            Comment.objects.create(project=self.project, user=self.user, text=f"c{i}")
+
+        response = self.client.get(f"{self.url}?page_size=2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([c["text"] for c in response.data["results"]], ["c4", "c3"])
+        self.assertIsNone(response.data["previous"])
+
+        older = self.client.get(response.data["next"])
+        self.assertEqual([c["text"] for c in older.data["results"]], ["c2", "c1"])
+
+        newer = self.client.get(older.data["previous"])
+        self.assertEqual([c["text"] for c in newer.data["results"]], ["c4", "c3"])
+        self.assertIsNone(newer.data["previous"])
+
+    def test_list_comments_sparse_fields_paginate(self):
+        """Test that cursors still work when ?fields= leaves out created_at."""
+        for i in range(3):
+            Comment.objects.create(project=self.project, user=self.user, text=f"c{i}")
+
+        response = self.client.get(f"{self.url}?fields=text&page_size=2")
+        self.assertEqual(response.data["results"], [{"text": "c2"}, {"text": "c1"}])
+        older = self.client.get(response.data["next"])
+        self.assertEqual(older.data["results"], [{"text": "c0"}])
+
+    def test_create_comment_uses_role_cache(self):
+        """Test that a warm role cache skips the membership lookup."""
+        self.client.get(self.url)
+        # comment insert, project updated_at bump and activity insert only
+        with self.assertNumQueries(3):
+            response = self.client.post(self.url, {"text": "Cached"})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_list_comments_not_modified(self):
+        """Test that an unchanged timeline answers 304 without loading comments."""
+        Comment.objects.create(project=self.project, user=self.user, text="First")
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        self.client.post(self.url, {"text": "Second"})
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_role_change_invalidates_cache(self):
+        """Test that demoting a member takes effect despite a warm cache."""
+        self.client.get(self.url)
+        member = ProjectMember.objects.get(user=self.user, project=self.project)
+        member.role = "reader"
+        member.save()
+        response = self.client.post(self.url, {"text": "Denied"})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_member_removal_invalidates_cache(self):
+        """Test that removed members lose access despite a warm cache."""
+        self.client.get(self.url)
+        ProjectMember.objects.get(user=self.user, project=self.project).delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(
+        PROJECT_ROLE_CACHE={
+            "BACKEND": "django",
+            "CACHE_ALIAS": "roles",
+            "MAX_ENTRIES": 100,
+            "TTL": 60,
+        },
+        # A cache of its own, so the test starts empty without a flush.
+        CACHES={
+            **settings.CACHES,
+            "roles": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "role-cache-tests",
+            },
+        },
+    )
+    def test_django_cache_backend_invalidated_on_project_delete(self):
+        """Test that deleting a project drops its roles from the Django cache."""
+        project_id = self.project.id
+        self.client.get(self.url)
+        self.assertEqual(get_role_cache().get(self.user.id, project_id), "owner")
+        self.project.delete()
+        self.assertIsNone(get_role_cache().get(self.user.id, project_id))
+
+
+
+class LocalRoleCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        """Test that the cache stays within its size bound."""
+        cache = LocalRoleCache(max_entries=2, ttl=60)
+        cache.set(1, 1, "owner")
+        cache.set(1, 2, "editor")
+        cache.get(1, 1)
+        cache.set(1, 3, "reader")
+        self.assertEqual(cache.get(1, 1), "owner")
+        self.assertIsNone(cache.get(1, 2))
+        self.assertEqual(cache.get(1, 3), "reader")
+
+    def test_expires_after_ttl(self):
+        """Test that entries are dropped once their TTL has passed."""
+        cache = LocalRoleCache(max_entries=2, ttl=0)
+        cache.set(1, 1, "owner")
+        self.assertIsNone(cache.get(1, 1))
+
+
+@override_settings(ROOT_URLCONF="projects.async_urls")
+class AsyncReadViewTests(APITestCase):
+    def setUp(self):
+        get_role_cache().clear()
+        self.user = User.objects.create_user(
+            username="asyncuser", email="async@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(name="Async Project", owner=self.user)
+        ProjectMember.objects.create(user=self.user, project=self.project, role="owner")
+        self.client.force_login(self.user)
+
+    def test_async_views_match_sync_views(self):
+        """Test that the async read endpoints return the same JSON as the sync ones."""
+        Comment.objects.create(project=self.project, user=self.user, text="Hello")
+        urls = [
+            "/api/projects/",
+            "/api/projects/?fields=id,description,created_at",
+            f"/api/projects/{self.project.id}/",
+            f"/api/projects/{self.project.id}/?fields=name",
+            f"/api/projects/{self.project.id}/comments/",
+            f"/api/projects/{self.project.id}/comments/?fields=id,text",
+        ]
+        for url in urls:
+            async_response = self.client.get(url)
+            with override_settings(ROOT_URLCONF="project_management.urls"):
+                sync_response = self.client.get(url)
+            self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+            self.assertEqual(async_response.json(), sync_response.json())
+
+    def test_async_errors_match_sync_views(self):
+        """Test that the async read endpoints return the same error bodies as the sync ones."""
+        urls = [
+            "/api/projects/?fields=id,secret",
+            f"/api/projects/{self.project.id}/?fields=secret",
+            f"/api/projects/{self.project.id}/comments/?fields=secret",
+            "/api/projects/999999/",
+        ]
+        for url in urls:
+            async_response = self.client.get(url)
+            with override_settings(ROOT_URLCONF="project_management.urls"):
+                sync_response = self.client.get(url)
+            self.assertEqual(async_response.status_code, sync_response.status_code)
+            self.assertEqual(async_response.json(), sync_response.json())
+
+    def test_async_detail_not_modified(self):
+        """Test conditional GETs against the async project detail view."""
+        url = f"/api/projects/{self.project.id}/"
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_async_views_deny_outsiders(self):
+        """Test access control on the async views."""
+        outsider = User.objects.create_user(
+            username="asyncoutsider", email="outsider@example.com", password="x"
+        )
+        self.client.force_login(outsider)
+        response = self.client.get(f"/api/projects/{self.project.id}/comments/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get("/api/projects/999999/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.logout()
+        response = self.client.get("/api/projects/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_async_views_accept_bearer_tokens(self):
+        """Test that the async reads authenticate signed bearer tokens too."""
+        self.client.logout()
+        token = issue_token(self.user)
+        response = self.client.get("/api/projects/", HTTP_AUTHORIZATION=f"Bearer {token}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get("/api/projects/", HTTP_AUTHORIZATION="Bearer nope")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_async_dispatch_keeps_sync_writes(self):
+        """Test that non-GET methods still reach the DRF views."""
+        response = self.client.post(
+            f"/api/projects/{self.project.id}/comments/", {"text": "Written"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+
+class SearchViewTests(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="searcher", email="search@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(
+            name="Apollo", description="Lunar landing telemetry", owner=self.user
+        )
+        ProjectMember.objects.create(user=self.user, project=self.project, role="owner")
+        self.client.force_authenticate(user=self.user)
+        self.url = "/api/search/"
+
+    def test_search_ranks_projects_and_comments(self):
+        """Test that projects and comments are found through the index."""
+        comment = Comment.objects.create(
+            project=self.project, user=self.user, text="Telemetry dropout at T+42"
+        )
+        Comment.objects.create(project=self.project, user=self.user, text="Unrelated")
+
+        response = self.client.get(self.url, {"q": "telemetry"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        hits = {(hit["type"], hit["object"]["id"]) for hit in response.data["results"]}
+        self.assertEqual(hits, {("project", self.project.id), ("comment", comment.id)})
+
+    def test_search_follows_edits_and_deletes(self):
+        """Test that the triggers keep the index in sync with the tables."""
+        comment = Comment.objects.create(project=self.project, user=self.user, text="alpha")
+        comment.text = "beta"
+        comment.save()
+        self.assertEqual(self.client.get(self.url, {"q": "alpha"}).data["results"], [])
+        self.assertEqual(len(self.client.get(self.url, {"q": "beta"}).data["results"]), 1)
+
+        comment.delete()
+        self.assertEqual(self.client.get(self.url, {"q": "beta"}).data["results"], [])
+
+    def test_search_is_limited_to_member_projects(self):
+        """Test that hits from other users' projects are not returned."""
+        other = User.objects.create_user(
+            username="other", email="other@example.com", password="testpass123"
+        )
+        hidden = Project.objects.create(name="Telemetry secrets", owner=other)
+        ProjectMember.objects.create(user=other, project=hidden, role="owner")
+
+        response = self.client.get(self.url, {"q": "telemetry"})
+        ids = [hit["object"]["id"] for hit in response.data["results"]]
+        self.assertEqual(ids, [self.project.id])
+
+    def test_search_paginates(self):
+        """Test that hits are paginated with a next link."""
+        for i in range(3):
+            Comment.objects.create(project=self.project, user=self.user, text=f"orbit {i}")
+
+        response = self.client.get(self.url, {"q": "orbit", "page_size": 2})
+        self.assertEqual(len(response.data["results"]), 2)
+        response = self.client.get(response.data["next"])
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertIsNone(response.data["next"])
+
+    def test_search_handles_query_syntax(self):
+        """Test that punctuation in the query is not treated as index syntax."""
+        response = self.client.get(self.url, {"q": 'lunar" -(landing'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        response = self.client.get(self.url, {"q": "-"})
+        self.assertEqual(response.data["results"], [])
+
+    def test_admin_search_uses_index(self):
+        """Test that the comment admin search is answered from the index."""
+        comment = Comment.objects.create(
+            project=self.project, user=self.user, text="Telemetry review"
+        )
+        model_admin = admin.site._registry[Comment]
+        results, _ = model_admin.get_search_results(
+            None, Comment.objects.all(), "telemetry"
+        )
+        self.assertEqual(list(results), [comment])
+
+
+class RowSerializerParityTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="rowuser", email="row@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(
+            name='Ünïcode "quoted" \\ name', description="", owner=self.user
+        )
+        Project.objects.create(name="Second", description="Line\nbreak", owner=self.user)
+        Comment.objects.create(project=self.project, user=self.user, text="Hello 👋")
+        Comment.objects.create(project=self.project, user=self.user, text="<b>&</b>")
+        # A timestamp with no microseconds takes a different isoformat() path.
+        Comment.objects.filter(text="Hello 👋").update(
+            created_at=timezone.now().replace(microsecond=0)
+        )
+
+    def assertSameJSON(self, serializer_class, queryset, fields=None):
+        rows = RowSerializer(serializer_class, fields)
+        fast = JSONRenderer().render(rows.serialize(rows.rows(queryset.order_by("id"))))
+        slow = JSONRenderer().render(
+            serializer_class(queryset.order_by("id"), many=True, fields=fields).data
+        )
+        self.assertEqual(fast, slow)
+
+    def test_matches_model_serializers(self):
+        """Test that the row path renders byte-for-byte what the serializers do."""
+        for fields in (None, ProjectSerializer.list_fields, ("description", "id")):
+            self.assertSameJSON(ProjectSerializer, Project.objects.all(), fields)
+        for fields in (None, ("text",), ("created_at", "user")):
+            self.assertSameJSON(CommentSerializer, Comment.objects.all(), fields)
+
+    def test_matches_in_other_timezone(self):
+        """Test that datetimes follow the active timezone like DRF does."""
+        with timezone.override("Asia/Kolkata"):
+            self.assertSameJSON(ProjectSerializer, Project.objects.all())
+            self.assertSameJSON(CommentSerializer, Comment.objects.all())
+
+
+class QueryProfilerMiddlewareTests(APITestCase):
+    def setUp(self):
+        get_role_cache().clear()
+        self.user = User.objects.create_user(
+            username="profiled", email="profiled@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(name="Profiled", owner=self.user)
+        ProjectMember.objects.create(user=self.user, project=self.project, role="owner")
+        for i in range(5):
+            author = User.objects.create_user(username=f"author{i}", email=f"a{i}@example.com")
+            Comment.objects.create(project=self.project, user=author, text=f"c{i}")
+
+    def test_reports_queries_in_header_and_log(self):
+        """Test the Server-Timing header and the structured log record."""
+        self.client.force_login(self.user)
+        with self.assertLogs("django.profiler", "INFO") as logs:
+            response = self.client.get("/api/projects/")
+        self.assertRegex(
+            response["Server-Timing"], r'^db;dur=[\d.]+;desc="2 queries", app;dur=[\d.]+$'
+        )
+        record = logs.records[0]
+        self.assertEqual(record.path, "/api/projects/")
+        self.assertEqual(record.sql_queries, 2)
+        self.assertEqual(record.status_code, 200)
+
+    @override_settings(ROOT_URLCONF="projects.async_urls")
+    def test_profiles_async_views(self):
+        """Test that queries run by the async views are counted too."""
+        self.client.force_login(self.user)
+        response = self.client.get(f"/api/projects/{self.project.id}/comments/")
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+
+    def test_detects_n_plus_one(self):
+        """Test that Comment.__str__ in a loop is flagged, and raised in strict mode."""
+
+        def view(request):
+            for comment in Comment.objects.all():
+                str(comment)
+            return HttpResponse()
+
+        middleware = QueryProfilerMiddleware(view)
+        request = RequestFactory().get("/comments/")
+        with self.assertRaises(NPlusOneError):
+            middleware(request)
+
+        profiler = {**settings.QUERY_PROFILER, "STRICT": False}
+        with override_settings(QUERY_PROFILER=profiler):
+            with self.assertLogs("django.profiler.n_plus_one", "WARNING") as logs:
+                middleware(request)
+        self.assertEqual(len(logs.records), 2)  # one per user, one per project lookup
+        self.assertEqual(logs.records[0].sql_executions, 5)
+
+    def test_admin_changelists_avoid_n_plus_one(self):
+        """Test that the admin lists load related rows up front (strict mode is on)."""
+        admin_user = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="testpass123"
+        )
+        self.client.force_login(admin_user)
+        for url in (
+            "/admin/projects/comment/",
+            "/admin/projects/projectmember/",
+            "/admin/projects/project/",
+        ):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_fingerprint_ignores_values(self):
+        """Test that statements differing only in values share a fingerprint."""
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s) LIMIT 21"),
+            fingerprint("SELECT *  FROM t WHERE id IN (%s) LIMIT 5"),
+        )
+
+
+def asgi_get(path, headers=()):
+    """Serves a GET through the ASGI handler the way an ASGI server would.
+
+    Unlike the test client, nothing wraps the call in ``async_to_sync``, so
+    sync code (the ORM included) runs in asgiref's worker thread.
+    """
+    messages = []
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), *headers],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+    async def receive():
+        if not messages:
+            messages.append(None)
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()  # the client never disconnects
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(ASGIHandler()(scope, receive, send))
+    start = messages[1]
+    body = b"".join(message.get("body", b"") for message in messages[2:])
+    headers = {name.lower(): value for name, value in start["headers"]}
+    return start["status"], headers, body
+
+
+class ASGIQueryProfilerTests(TransactionTestCase):
+    def setUp(self):
+        get_role_cache().clear()
+        self.user = User.objects.create_user(
+            username="asgi", email="asgi@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(name="Served", owner=self.user)
+        ProjectMember.objects.create(user=self.user, project=self.project, role="owner")
+        self.auth = (b"authorization", f"Bearer {issue_token(self.user)}".encode())
+
+    def test_profiles_queries_run_in_worker_threads(self):
+        """Test that queries are counted when the ORM runs off the event loop thread."""
+        paths = [
+            "/api/projects/",
+            f"/api/projects/{self.project.id}/",
+            f"/api/projects/{self.project.id}/comments/",
+        ]
+        for urlconf in ("project_management.urls", "projects.async_urls"):
+            with override_settings(ROOT_URLCONF=urlconf):
+                for path in paths:
+                    status_code, headers, _ = asgi_get(path, [self.auth])
+                    self.assertEqual(status_code, status.HTTP_200_OK)
+                    self.assertNotIn(b'desc="0 queries"', headers[b"server-timing"])
+
+
+
+class RecordingHandler(logging.Handler):
+    """Collects records and the thread that handled them; can be held shut."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.threads = set()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def emit(self, record):
+        self.gate.wait()
+        self.records.append(record)
+        self.threads.add(threading.get_ident())
+
+
+class LoggingPipelineTests(SimpleTestCase):
+    def make_logger(self, handler):
+        logger = logging.getLogger(f"projects.tests.pipeline.{id(handler)}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        return logger
+
+    def test_json_formatter_includes_extra_fields(self):
+        """Test that JSON lines carry the message, extra fields and tracebacks."""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.getLogger("projects").makeRecord(
+                "projects", logging.ERROR, __file__, 1, "Failed for %s", ("alice",),
+                exc_info=sys.exc_info(), extra={"sql_queries": 3},
+            )
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertEqual(entry["message"], "Failed for alice")
+        self.assertEqual(entry["sql_queries"], 3)
+        self.assertIn("ValueError: boom", entry["exc_info"])
+
+    def test_handlers_run_on_listener_thread(self):
+        """Test that records are formatted and written off the logging thread."""
+        target = RecordingHandler()
+        handler = BoundedQueueHandler([target])
+        self.make_logger(handler).info("Hello %s", "world")
+        handler.close()
+        self.assertEqual([r.getMessage() for r in target.records], ["Hello world"])
+        self.assertNotIn(threading.get_ident(), target.threads)
+
+    def test_prepare_leaves_record_alone(self):
+        """Test that queueing a record does not change it for other handlers."""
+        handler = BoundedQueueHandler([RecordingHandler()])
+        self.addCleanup(handler.close)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.makeLogRecord(
+                {"msg": "Failed for %s", "args": ("alice",), "exc_info": sys.exc_info()}
+            )
+        prepared = handler.prepare(record)
+        self.assertEqual((prepared.msg, prepared.args), ("Failed for alice", None))
+        self.assertIsNone(prepared.exc_info)
+        self.assertEqual((record.msg, record.args), ("Failed for %s", ("alice",)))
+        self.assertIsNotNone(record.exc_info)
+
+    def hold_listener(self, handler, target, logger):
+        """Blocks the listener thread inside ``target`` on its first record."""
+        target.gate.clear()
+        self.addCleanup(target.gate.set)
+        logger.info("held")
+        while not handler.queue.empty():
+            time.sleep(0.001)
+
+    def test_full_queue_drops_and_reports(self):
+        """Test the drop policy and the dropped-records warning."""
+        target = RecordingHandler()
+        handler = BoundedQueueHandler([target], maxsize=2, policy="drop")
+        logger = self.make_logger(handler)
+        self.hold_listener(handler, target, logger)
+        for i in range(5):
+            logger.info("record %s", i)
+        self.assertEqual(handler.dropped, 3)
+
+        target.gate.set()
+        while not handler.queue.empty():
+            time.sleep(0.001)
+        logger.info("after")
+        handler.close()
+        messages = [r.getMessage() for r in target.records]
+        self.assertEqual(
+            messages,
+            [
+                "held",
+                "record 0",
+                "record 1",
+                "Dropped 3 log records: the log queue was full.",
+                "after",
+            ],
+        )
+
+    def test_block_policy_waits_for_room(self):
+        """Test that the block policy applies backpressure before dropping."""
+        target = RecordingHandler()
+        handler = BoundedQueueHandler([target], maxsize=1, policy="block", timeout=0.05)
+        logger = self.make_logger(handler)
+        self.hold_listener(handler, target, logger)
+        logger.info("queued")
+        start = time.perf_counter()
+        logger.info("dropped")
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+        self.assertEqual(handler.dropped, 1)
+
+        threading.Timer(0.02, target.gate.set).start()
+        logger.info("waits")
+        handler.close()
+        self.assertEqual(handler.dropped, 0)
+        self.assertIn("waits", [r.getMessage() for r in target.records])
+
+
+class ProjectCounterTests(APITestCase):
+    def setUp(self):
+        get_role_cache().clear()
+        self.user = User.objects.create_user(
+            username="counted", email="counted@example.com", password="testpass123"
+        )
+        self.other = User.objects.create_user(
+            username="other", email="other@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post("/api/projects/", {"name": "Counted"})
+        self.project = Project.objects.get(pk=response.data["id"])
+
+    def counters(self):
+        self.project.refresh_from_db()
+        return self.project.member_count, self.project.comment_count
+
+    def test_counters_follow_members_and_comments(self):
+        """Test that member and comment writes keep the counters in step."""
+        self.assertEqual(self.counters(), (1, 0))
+        self.client.post(
+            f"/api/projects/{self.project.id}/members/",
+            {"user": self.other.id, "project": self.project.id, "role": "editor"},
+        )
+        self.client.post(
+            f"/api/projects/{self.project.id}/comments/", {"text": "First"}
+        )
+        comment = Comment.objects.create(project=self.project, user=self.other, text="Second")
+        self.assertEqual(self.counters(), (2, 2))
+        self.assertEqual(self.project.last_activity_at, comment.updated_at)
+
+        ProjectMember.objects.get(project=self.project, user=self.other).delete()
+        self.assertEqual(self.counters(), (1, 2))
+
+        # The other user's comment goes with them.
+        self.other.delete()
+        self.assertEqual(self.counters(), (1, 1))
+
+    def test_project_update_keeps_concurrent_counters(self):
+        """Test that a project update does not write back counters loaded before a comment."""
+        serializer = ProjectSerializer(
+            Project.objects.get(pk=self.project.pk), data={"name": "Renamed"}, partial=True
+        )
+        Comment.objects.create(project=self.project, user=self.user, text="Meanwhile")
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+        self.assertEqual(self.counters(), (1, 1))
+        self.assertEqual(self.project.name, "Renamed")
+
+    def test_admin_comment_deletes_update_counter(self):
+        """Test that the admin's delete paths decrement comment_count."""
+        comments = [
+            Comment.objects.create(project=self.project, user=self.user, text=f"c{i}")
+            for i in range(3)
+        ]
+        model_admin = admin.site._registry[Comment]
+        model_admin.delete_model(None, comments[0])
+        model_admin.delete_queryset(None, Comment.objects.filter(pk__in=[c.pk for c in comments[1:]]))
+        self.assertEqual(self.counters(), (1, 0))
+
+    def test_list_returns_counters_without_extra_queries(self):
+        """Test that the counters ride along in the list query."""
+        Comment.objects.create(project=self.project, user=self.user, text="Hi")
+        with self.assertNumQueries(1):  # the project page alone
+            response = self.client.get("/api/projects/")
+        self.assertEqual(response.data["results"][0]["comment_count"], 1)
+        self.assertEqual(response.data["results"][0]["member_count"], 1)
+
+    def test_repair_command_fixes_drift(self):
+        """Test that repair_project_counters recomputes drifted counters."""
+        comment = Comment.objects.create(project=self.project, user=self.user, text="Hi")
+        Project.objects.filter(pk=self.project.pk).update(
+            member_count=7, comment_count=0, last_activity_at=None
+        )
+        out = StringIO()
+        call_command("repair_project_counters", "--chunk-size", "1", stdout=out)
+        self.assertIn("1 drifted projects repaired", out.getvalue())
+        self.assertEqual(self.counters(), (1, 1))
+        self.assertEqual(self.project.last_activity_at, comment.updated_at)
+
+
+class ActivityFeedTests(APITestCase):
+    def setUp(self):
+        get_role_cache().clear()
+        self.user = User.objects.create_user(
+            username="follower", email="follower@example.com", password="testpass123"
+        )
+        self.other = User.objects.create_user(
+            username="other", email="other@example.com", password="testpass123"
+        )
+        self.projects = [
+            Project.objects.create(name=f"Followed {i}", owner=self.other) for i in range(3)
+        ]
+        for project in self.projects:
+            ProjectMember.objects.create(user=self.user, project=project, role="reader")
+        self.hidden = Project.objects.create(name="Hidden", owner=self.other)
+        self.client.force_authenticate(user=self.user)
+        self.url = "/api/feed/"
+
+    def test_feed_merges_member_projects(self):
+        """Test that the feed interleaves activity from every project the user is in."""
+        Comment.objects.create(project=self.projects[0], user=self.other, text="First")
+        Comment.objects.create(project=self.hidden, user=self.other, text="Secret")
+        ProjectMember.objects.create(user=self.other, project=self.projects[1], role="editor")
+        Comment.objects.create(project=self.projects[2], user=self.other, text="Last")
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        entries = [
+            (entry["verb"], entry["project"], entry["detail"])
+            for entry in response.data["results"][:3]
+        ]
+        self.assertEqual(
+            entries,
+            [
+                ("comment_created", self.projects[2].id, "Last"),
+                ("member_added", self.projects[1].id, "editor"),
+                ("comment_created", self.projects[0].id, "First"),
+            ],
+        )
+        self.assertNotIn(self.hidden.id, {entry["project"] for entry in response.data["results"]})
+
+    def test_cursor_pagination(self):
+        """Test that next links walk the whole feed without gaps or repeats."""
+        for i in range(7):
+            Comment.objects.create(project=self.projects[i % 3], user=self.other, text=f"c{i}")
+        expected = list(
+            Activity.objects.filter(project__in=self.projects)
+            .order_by("-id")
+            .values_list("id", flat=True)
+        )
+
+        seen, url = [], f"{self.url}?page_size=4&fields=id"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [entry["id"] for entry in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(seen, expected)
+
+        response = self.client.get(f"{self.url}?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_member_removal_and_deletes(self):
+        """Test that removals are recorded and cascading deletes leave no activity behind."""
+        member = ProjectMember.objects.create(
+            user=self.other, project=self.projects[0], role="editor"
+        )
+        member.delete()
+        verbs = list(
+            Activity.objects.filter(project=self.projects[0]).order_by("id").values_list("verb", flat=True)
+        )
+        self.assertEqual(verbs[-2:], [Activity.MEMBER_ADDED, Activity.MEMBER_REMOVED])
+
+        self.projects[1].delete()
+        self.user.delete()
+        self.assertFalse(Activity.objects.filter(project=self.projects[1].pk).exists())
+        self.assertFalse(Activity.objects.filter(user=self.user.pk).exists())
+
+
+class SoftDeleteTests(APITestCase):
+    def setUp(self):
+        get_role_cache().clear()
+        self.owner = User.objects.create_user(
+            username="deleter", email="deleter@example.com", password="testpass123", is_verified=True
+        )
+        self.editor = User.objects.create_user(
+            username="leaver", email="leaver@example.com", password="testpass123", is_verified=True
+        )
+        self.project = Project.objects.create(name="Doomed", owner=self.owner)
+        self.kept = Project.objects.create(name="Kept", owner=self.editor)
+        for project in (self.project, self.kept):
+            ProjectMember.objects.create(user=self.owner, project=project, role="owner")
+            ProjectMember.objects.create(user=self.editor, project=project, role="editor")
+            for i in range(3):
+                Comment.objects.create(project=project, user=self.editor, text=f"doomed words {i}")
+        self.client.force_authenticate(user=self.editor)
+
+    def purge(self):
+        out = StringIO()
+        call_command("purge_deleted", "--once", "--batch-size", "2", stdout=out)
+        return out.getvalue()
+
+    def test_deleted_project_is_hidden_then_purged(self):
+        """Test that a deleted project vanishes from every read at once and is purged later."""
+        url = f"/api/projects/{self.project.id}/"
+        self.client.get(f"{url}comments/")  # warms the role cache
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertTrue(Project.all_objects.filter(pk=self.project.pk).exists())
+
+        self.client.force_authenticate(user=self.editor)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post(f"{url}comments/", {"text": "Too late"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        listed = [row["id"] for row in self.client.get("/api/projects/").data["results"]]
+        self.assertEqual(listed, [self.kept.id])
+        feed = self.client.get("/api/feed/").data["results"]
+        self.assertEqual({entry["project"] for entry in feed}, {self.kept.id})
+        hits = self.client.get("/api/search/", {"q": "doomed"}).data["results"]
+        self.assertEqual({hit["project"] for hit in hits}, {self.kept.id})
+
+        output = self.purge()
+        self.assertIn(f"project {self.project.id} comments: 2/3 rows deleted", output)
+        self.assertIn("1 projects, 0 users purged", output)
+        self.assertFalse(Project.all_objects.filter(pk=self.project.pk).exists())
+        for model in (Comment, ProjectMember, Activity):
+            self.assertFalse(model.objects.filter(project_id=self.project.pk).exists())
+        self.assertEqual(Comment.objects.filter(project=self.kept).count(), 3)
+
+    def test_update_does_not_restore_concurrently_deleted_project(self):
+        """Test that an update loaded before a soft delete leaves the project deleted."""
+        serializer = ProjectSerializer(self.project, data={"name": "Renamed"}, partial=True)
+        soft_delete_projects(Project.objects.filter(pk=self.project.pk))
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+        self.assertIsNotNone(Project.all_objects.get(pk=self.project.pk).deleted_at)
+        self.assertIn("1 projects, 0 users purged", self.purge())
+
+    def test_deleted_user_is_hidden_then_purged(self):
+        """Test that a deleted user cannot sign in, hides their projects, and is purged later."""
+        self.editor.soft_delete()
+        self.assertFalse(User.objects.filter(pk=self.editor.pk).exists())
+        self.assertFalse(Project.objects.filter(pk=self.kept.pk).exists())
+        response = self.client.post(
+            "/api/users/login/", {"username": "leaver", "password": "testpass123"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(
+            "/api/users/register/",
+            {"username": "leaver", "email": "new@example.com", "password": "bench-pass-123"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("username", response.data)
+
+        output = self.purge()
+        self.assertIn("1 projects, 1 users purged", output)
+        self.assertFalse(User.all_objects.filter(pk=self.editor.pk).exists())
+        self.assertFalse(Project.all_objects.filter(pk=self.kept.pk).exists())
+        self.project.refresh_from_db()
+        self.assertEqual((self.project.member_count, self.project.comment_count), (1, 0))
+        self.assertFalse(Comment.objects.filter(user_id=self.editor.pk).exists())
+
+
+class ProjectExportTests(APITestCase):
+    def setUp(self):
+        get_role_cache().clear()
+        self.user = User.objects.create_user(
+            username="exporter", email="exporter@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(name="Exported", owner=self.user)
+        ProjectMember.objects.create(user=self.user, project=self.project, role="owner")
+        for i in range(5):
+            Comment.objects.create(project=self.project, user=self.user, text=f"line {i}")
+        self.client.force_authenticate(user=self.user)
+        self.url = f"/api/projects/{self.project.id}/export/"
+
+    def decode(self, data):
+        return [json.loads(line) for line in gzip.decompress(data).splitlines()]
+
+    def test_export_streams_gzipped_ndjson(self):
+        """Test that the export streams the project, its members and comments."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        records = self.decode(b"".join(response.streaming_content))
+
+        self.assertEqual([record["type"] for record in records], ["project", "member"] + ["comment"] * 5)
+        self.assertEqual(records[0]["name"], "Exported")
+        self.assertEqual(records[1], {"type": "member", "user": self.user.id, "username": "exporter", "role": "owner"})
+        expected = CommentSerializer(
+            Comment.objects.filter(project=self.project).order_by("created_at", "id"), many=True
+        ).data
+        self.assertEqual([{k: v for k, v in r.items() if k != "type"} for r in records[2:]], expected)
+
+    async def test_export_streams_async_under_asgi(self):
+        """Test that under ASGI the export is an async stream, sent chunk by chunk."""
+        await Comment.objects.abulk_create(
+            Comment(project=self.project, user=self.user, text=os.urandom(96).hex())
+            for _ in range(1000)
+        )
+        await self.async_client.aforce_login(self.user)
+        with self.assertLogs("projects.views", "INFO") as logs:
+            response = await self.async_client.get(self.url)
+            self.assertTrue(response.is_async)
+            chunks = aiter(response.streaming_content)
+            first = await anext(chunks)
+            # Only the start of the stream has been read so far.
+            self.assertFalse(any("Exported project" in line for line in logs.output))
+            rest = [chunk async for chunk in chunks]
+        self.assertTrue(rest)
+        records = self.decode(first + b"".join(rest))
+        self.assertEqual(len(records), 2 + 1005)
+        self.assertTrue(any("Exported project" in line for line in logs.output))
+
+    def test_export_denies_outsiders(self):
+        """Test that only members can export a project."""
+        outsider = User.objects.create_user(
+            username="nosy", email="nosy@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=outsider)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_command_writes_file(self):
+        """Test that export_project writes the same stream and reports rows/s."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "export.ndjson.gz")
+            err = StringIO()
+            call_command(
+                "export_project", self.project.id, "--output", path, "--chunk-size", "2", stderr=err
+            )
+            with open(path, "rb") as f:
+                records = self.decode(f.read())
+        self.assertEqual(len(records), 7)
+        self.assertRegex(err.getvalue(), r"7 rows, \d+ bytes in [\d.]+s \(\d+ rows/s\)")
+
+
+class ProjectImportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="importer", email="importer@example.com", password="testpass123"
+        )
+        self.other = User.objects.create_user(
+            username="helper", email="helper@example.com", password="testpass123"
+        )
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def ndjson(self, records):
+        return "".join(json.dumps(record) + "\n" for record in records)
+
+    def records(self, comments=5):
+        return [
+            {"type": "project", "id": 90, "name": "Imported", "description": "d", "owner": 7},
+            {"type": "member", "user": 7, "username": "importer", "role": "owner"},
+            {"type": "member", "user": 8, "username": "helper", "role": "reader"},
+        ] + [
+            {"type": "comment", "user": 7 + i % 2, "text": f"line {i}",
+             "created_at": f"2024-01-0{i + 1}T10:00:00Z"}
+            for i in range(comments)
+        ]
+
+    def test_export_roundtrip(self):
+        """Test that an export imports back with members, comments and timestamps."""
+        project = Project.objects.create(name="Source", owner=self.user)
+        ProjectMember.objects.create(user=self.user, project=project, role="owner")
+        ProjectMember.objects.create(user=self.other, project=project, role="editor")
+        for i in range(3):
+            Comment.objects.create(project=project, user=self.other, text=f"note {i}")
+        path = os.path.join(self.tmp.name, "export.ndjson.gz")
+        call_command("export_project", project.id, "--output", path, stderr=StringIO())
+
+        out = StringIO()
+        call_command("import_projects", path, "--batch-size", "2", stdout=out, stderr=StringIO())
+
+        imported = Project.objects.exclude(pk=project.pk).get()
+        self.assertEqual((imported.name, imported.owner), ("Source", self.user))
+        self.assertEqual(
+            set(imported.members.values_list("user__username", "role")),
+            {("importer", "owner"), ("helper", "editor")},
+        )
+        source = list(project.comments.order_by("id").values_list("user", "text", "created_at"))
+        copied = list(imported.comments.order_by("id").values_list("user", "text", "created_at"))
+        self.assertEqual(copied, source)
+        self.assertEqual((imported.member_count, imported.comment_count), (2, 3))
+        self.assertIsNotNone(imported.last_activity_at)
+        self.assertRegex(out.getvalue(), r"\(\d+ rows/s\)")
+        # Imports do not write to the activity feed.
+        self.assertFalse(Activity.objects.filter(project=imported).exists())
+
+    def test_csv_skips_unknown_users(self):
+        """Test that CSV rows import and rows naming unknown users are reported."""
+        path = self.write("data.csv", (
+            "type,id,name,owner,user,username,role,text,created_at\n"
+            "project,1,From CSV,7,,,,,\n"
+            "member,,,,7,importer,owner,,\n"
+            "member,,,,9,ghost,editor,,\n"
+            "comment,,,,7,,,hello,2024-02-01T09:00:00Z\n"
+            "comment,,,,9,,,lost,\n"
+        ))
+        err = StringIO()
+        call_command("import_projects", path, stdout=StringIO(), stderr=err)
+
+        project = Project.objects.get(name="From CSV")
+        self.assertEqual(list(project.comments.values_list("text", flat=True)), ["hello"])
+        self.assertEqual(project.member_count, 1)
+        self.assertIn("record 3 skipped: Unknown user 'ghost'.", err.getvalue())
+        self.assertIn("record 5 skipped: Unknown user '9'.", err.getvalue())
+
+    def test_resumes_after_last_committed_batch(self):
+        """Test that a failed import resumes without duplicating rows."""
+        lines = self.ndjson(self.records()).splitlines(keepends=True)
+        broken = self.write("data.ndjson", "".join(lines[:6] + ["{oops\n"] + lines[6:]))
+        with self.assertRaisesMessage(CommandError, "Record 7 is not valid JSON"):
+            call_command("import_projects", broken, "--batch-size", "2", "--name", "run",
+                         stdout=StringIO())
+        self.assertEqual(Comment.objects.count(), 2)
+
+        fixed = self.write("data.ndjson", "".join(lines[:6] + ['{"type": "note"}\n'] + lines[6:]))
+        out = StringIO()
+        call_command("import_projects", fixed, "--batch-size", "2", "--name", "run",
+                     stdout=out, stderr=StringIO())
+        self.assertIn("Resuming run after record 5.", out.getvalue())
+
+        project = Project.objects.get()
+        self.assertEqual(
+            list(project.comments.order_by("id").values_list("text", flat=True)),
+            [f"line {i}" for i in range(5)],
+        )
+        self.assertEqual(project.comment_count, 5)
+
+        out = StringIO()
+        call_command("import_projects", fixed, "--name", "run", stdout=out)
+        self.assertIn("already imported", out.getvalue())
+        self.assertEqual(Project.objects.count(), 1)
+
+
+@override_settings(
+    REPLICA_ROUTING={"REPLICAS": ["replica"], "STICKY_SECONDS": 5, "CACHE_ALIAS": "default"}
+)
+class ReplicaRoutingTests(APITestCase):
+    # "replica" is a separate test database that never receives the primary's
+    # rows, so reads that reach it behave like reads from a lagging replica.
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        get_role_cache().clear()
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="router", email="router@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(name="Primary only", owner=self.user)
+        ProjectMember.objects.create(user=self.user, project=self.project, role="owner")
+        self.client.force_authenticate(user=self.user)
+
+    def test_safe_requests_read_from_replica(self):
+        """Test that GETs are served from the replica, writes from the primary."""
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            response = self.client.get("/api/projects/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"], [])
+        self.assertGreater(len(replica), 0)
+        self.assertEqual(
+            self.client.get(f"/api/projects/{self.project.id}/").status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            response = self.client.put(
+                f"/api/projects/{self.project.id}/", {"name": "Renamed"}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(replica), 0)
+
+    def test_reads_after_write_stick_to_primary(self):
+        """Test that a user who wrote reads their write, and others do not pin."""
+        response = self.client.post(
+            f"/api/projects/{self.project.id}/comments/", {"text": "fresh"}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.get(f"/api/projects/{self.project.id}/comments/")
+        self.assertEqual([c["text"] for c in response.data["results"]], ["fresh"])
+
+        other = User.objects.create_user(
+            username="bystander", email="bystander@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=other)
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            self.client.get("/api/projects/")
+        self.assertGreater(len(replica), 0)
+
+        # Once the pin expires, the writer reads from the replica again.
+        cache.clear()
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get("/api/projects/").data["results"], [])
+
+    def test_replica_reads_do_not_warm_role_cache(self):
+        """Test that roles read from a replica are not cached."""
+        User.objects.db_manager("replica").create_user(
+            id=self.user.id, username="router", email="router@example.com"
+        )
+        Project.objects.using("replica").create(id=self.project.id, name="Replicated", owner=self.user)
+        ProjectMember.objects.using("replica").create(
+            user_id=self.user.id, project_id=self.project.id, role="owner"
+        )
+        response = self.client.get(f"/api/projects/{self.project.id}/")
+        self.assertEqual(response.data["name"], "Replicated")
+        self.assertIsNone(get_role_cache().get(self.user.id, self.project.id))
+
+    def test_search_reads_from_replica(self):
+        """Test that search hits come from the same database as the fetched rows."""
+        User.objects.db_manager("replica").create_user(
+            id=self.user.id, username="router", email="router@example.com"
+        )
+        Project.objects.using("replica").create(id=self.project.id, name="Replicated", owner=self.user)
+        ProjectMember.objects.using("replica").create(
+            user_id=self.user.id, project_id=self.project.id, role="owner"
+        )
+        response = self.client.get("/api/search/", {"q": "replicated"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([hit["object"]["name"] for hit in response.data["results"]], ["Replicated"])
+
+    def test_export_streams_from_replica(self):
+        """Test that the export body is read from the request's replica."""
+        User.objects.db_manager("replica").create_user(
+            id=self.user.id, username="router", email="router@example.com"
+        )
+        Project.objects.using("replica").create(id=self.project.id, name="Replicated", owner=self.user)
+        ProjectMember.objects.using("replica").create(
+            user_id=self.user.id, project_id=self.project.id, role="owner"
+        )
+        Comment.objects.using("replica").create(
+            project_id=self.project.id, user_id=self.user.id, text="replicated"
+        )
+        response = self.client.get(f"/api/projects/{self.project.id}/export/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = gzip.decompress(b"".join(response.streaming_content))
+        records = [json.loads(line) for line in data.splitlines()]
+        self.assertEqual([r["type"] for r in records], ["project", "member", "comment"])
+        self.assertEqual(records[2]["text"], "replicated")
+
+    @override_settings(ROOT_URLCONF="projects.async_urls")
+    def test_async_views_read_from_replica(self):
+        """Test that the async read views route like the DRF ones."""
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            response = self.client.get("/api/projects/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["results"], [])
+        self.assertGreater(len(replica), 0)
+
+        User.objects.db_manager("replica").create_user(
+            id=self.user.id, username="router", email="router@example.com"
+        )
+        Project.objects.using("replica").create(id=self.project.id, name="Replicated", owner=self.user)
+        ProjectMember.objects.using("replica").create(
+            user_id=self.user.id, project_id=self.project.id, role="owner"
+        )
+        response = self.client.get(f"/api/projects/{self.project.id}/")
+        self.assertEqual(response.json()["name"], "Replicated")
+        self.assertIsNone(get_role_cache().get(self.user.id, self.project.id))
+
+    def test_profiler_reports_queries_per_alias(self):
+        """Test that the profiler log shows the read/write split."""
+        with self.assertLogs("django.profiler", "INFO") as logs:
+            self.client.get("/api/projects/")
+            self.client.post("/api/projects/", {"name": "Written"}, format="json")
+        read, write = (record.sql_queries_by_alias for record in logs.records)
+        self.assertEqual(set(read), {"replica"})
+        self.assertEqual(set(write), {"default"})
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "SQLite only")
+class SQLiteProductionProfileTests(SimpleTestCase):
+    def test_profile_configures_each_connection(self):
+        """Test that the production profile's pragmas and BEGIN IMMEDIATE apply."""
+        from django.db.backends.sqlite3.base import DatabaseWrapper
+
+        with tempfile.TemporaryDirectory() as tmp:
+            wrapper = DatabaseWrapper(
+                {
+                    **connection.settings_dict,
+                    "NAME": os.path.join(tmp, "profile.sqlite3"),
+                    "OPTIONS": settings.SQLITE_PRODUCTION_OPTIONS,
+                },
+                alias="sqlite_profile",
+            )
+            try:
+                with wrapper.cursor() as cursor:
+                    pragmas = {
+                        name: cursor.execute(f"PRAGMA {name}").fetchone()[0]
+                        for name in ("journal_mode", "synchronous", "busy_timeout", "mmap_size", "cache_size")
+                    }
+            finally:
+                wrapper.close()
+        self.assertEqual(pragmas["journal_mode"], "wal")
+        self.assertEqual(pragmas["synchronous"], 1)  # NORMAL
+        self.assertGreater(pragmas["busy_timeout"], 0)
+        self.assertGreater(pragmas["mmap_size"], 0)
+        self.assertLess(pragmas["cache_size"], 0)
+        self.assertEqual(wrapper.transaction_mode, "IMMEDIATE")
+
+
+@unittest.skipUnless(connection.vendor in VENDORS, "No plan check for this database")
+class QueryPlanTests(APITestCase):
+    def setUp(self):
+        get_role_cache().clear()
+        self.user = User.objects.create_user(
+            username="planner", email="planner@example.com", password="testpass123"
+        )
+        self.member = User.objects.create_user(username="joiner", email="joiner@example.com")
+        self.project = Project.objects.create(name="Planned", owner=self.user)
+        ProjectMember.objects.create(user=self.user, project=self.project, role="owner")
+        for i in range(5):
+            Comment.objects.create(project=self.project, user=self.user, text=f"planned {i}")
+        self.client.force_authenticate(user=self.user)
+
+    def scans(self, send):
+        with capture_queries() as queries:
+            response = send()
+            if response.streaming:
+                b"".join(response.streaming_content)
+        self.assertLess(response.status_code, 400)
+        self.assertTrue(queries)
+        return {str(query): tables for query in queries if (tables := sequential_scans(query))}
+
+    def test_hot_endpoints_avoid_sequential_scans(self):
+        """Test that no endpoint query reads a large table in full."""
+        url = f"/api/projects/{self.project.id}/"
+        cursor = self.client.get(f"{url}comments/?page_size=2").data["next"]
+        requests = [
+            lambda: self.client.get("/api/projects/"),
+            lambda: self.client.get(url),
+            lambda: self.client.put(url, {"name": "Replanned"}, format="json"),
+            lambda: self.client.get(f"{url}comments/"),
+            lambda: self.client.get(cursor),
+            lambda: self.client.post(f"{url}comments/", {"text": "new"}, format="json"),
+            lambda: self.client.post(
+                f"{url}members/", {"user": self.member.id, "project": self.project.id, "role": "reader"},
+                format="json",
+            ),
+            lambda: self.client.get(f"{url}export/"),
+            lambda: self.client.get("/api/feed/"),
+            lambda: self.client.get("/api/search/?q=planned"),
+            lambda: self.client.delete(url),
+        ]
+        for send in requests:
+            self.assertEqual(self.scans(send), {})
+
+    def test_reports_sequential_scan(self):
+        """Test that a filter no index serves is reported."""
+        with capture_queries() as queries:
+            list(Comment.objects.filter(text="planned 1"))
+        self.assertEqual(sequential_scans(queries[0]), ["comments"])
@@ -1,10 +1,31 @@
+from django.conf import settings
 from django.urls import path
-from .views import ProjectListCreateView, ProjectDetailView, get_csrf_token, ProjectMemberView, CommentListCreateView
-
-urlpatterns = [
-    path('projects/', ProjectListCreateView.as_view(), name='project-list-create'),
-    path('projects/<int:project_id>/', ProjectDetailView.as_view(), name='project-detail'),
-    path('csrf/', get_csrf_token, name='csrf_token'),
-    path('projects/<int:project_id>/members/', ProjectMemberView.as_view(), name='project-member-add'),
-    path('projects/<int:project_id>/comments/', CommentListCreateView.as_view(), name='comment-list-create'),
-]
+from .views import ProjectListCreateView, ProjectDetailView, get_csrf_token, ProjectMemberView, ProjectMemberBulkView, CommentListCreateView, ProjectExportView, ActivityFeedView, SearchView
+
+
+def build_urlpatterns(async_reads):
+    """Routes for the project API; ``async_reads`` serves GETs with native async views."""
+    project_list_create = ProjectListCreateView.as_view()
+    project_detail = ProjectDetailView.as_view()
+    comment_list_create = CommentListCreateView.as_view()
+    if async_reads:
+        from . import async_views
+
+        project_list_create = async_views.with_async_reads(ProjectListCreateView, async_views.project_list)
+        project_detail = async_views.with_async_reads(ProjectDetailView, async_views.project_detail)
+        comment_list_create = async_views.with_async_reads(CommentListCreateView, async_views.comment_list)
+
+    return [
+        path('projects/', project_list_create, name='project-list-create'),
+        path('projects/<int:project_id>/', project_detail, name='project-detail'),
+        path('csrf/', get_csrf_token, name='csrf_token'),
+        path('projects/<int:project_id>/members/', ProjectMemberView.as_view(), name='project-member-add'),
+        path('projects/<int:project_id>/members/bulk/', ProjectMemberBulkView.as_view(), name='project-member-bulk-add'),
+        path('projects/<int:project_id>/comments/', comment_list_create, name='comment-list-create'),
+        path('projects/<int:project_id>/export/', ProjectExportView.as_view(), name='project-export'),
+        path('feed/', ActivityFeedView.as_view(), name='activity-feed'),
+        path('search/', SearchView.as_view(), name='search'),
+    ]
+
+
+urlpatterns = build_urlpatterns(async_reads=settings.PROJECTS_ASYNC_READS)
@@ -1,82 +1,119 @@
 import logging
+import time
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.db import router
+from django.http import JsonResponse, StreamingHttpResponse
 from django.middleware.csrf import get_token
 from rest_framework import status, permissions
-from django.shortcuts import get_object_or_404
-from .models import Project, ProjectMember, Comment
-from .serializers import ProjectSerializer, ProjectMemberSerializer, CommentSerializer
+from .models import Activity, Project, Comment
+from .access import get_project_access, get_project_role, EDITOR_ROLES
+from .serializers import (
+    ProjectSerializer,
+    ProjectMemberSerializer,
+    ProjectMemberBulkSerializer,
+    CommentSerializer,
+    ActivitySerializer,
+)
+from .rows import RowSerializer
+from .pagination import FeedPagination, KeysetPagination, TimelinePagination, RankedPagination
+from .search import search
+from .signals import soft_delete_projects
+from .conditional import conditional_response
+from .routing import ReplicaReadsMixin
+from .export import (
+    CONTENT_TYPE,
+    ExportCounter,
+    aiterate,
+    export_filename,
+    export_records,
+    gzip_ndjson,
+)
 
 logger = logging.getLogger(__name__)
 
 
-class ProjectListCreateView(APIView):
+class ProjectListCreateView(ReplicaReadsMixin, APIView):
     """Handles listing and creating projects."""
 
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        """List projects where the user is a member."""
-        logger.info(f"User {request.user.email} requested their project list.")
-        projects = Project.objects.filter(members__user=request.user)
-        serializer = ProjectSerializer(projects, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        """List projects where the user is a member, one keyset page at a time."""
+        logger.info("User %s requested their project list.", request.user.email)
+        fields = ProjectSerializer.get_requested_fields(
+            request, default=ProjectSerializer.list_fields
+        )
+        rows = RowSerializer(ProjectSerializer, fields)
+        projects = rows.rows(Project.objects.filter(members__user=request.user))
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(projects, request, view=self)
+        return paginator.get_paginated_response(rows.serialize(page))
 
     def post(self, request):
         """Create a new project."""
-        logger.info(f"User {request.user.email} is attempting to create a new project.")
+        logger.info("User %s is attempting to create a new project.", request.user.email)
         serializer = ProjectSerializer(data=request.data, context={"request": request})
         if serializer.is_valid():
             serializer.save(owner=request.user)
             logger.info(
-                f"Project '{serializer.data['name']}' created by {request.user.email}."
+                "Project '%s' created by %s.",
+                serializer.data["name"],
+                request.user.email,
             )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        logger.warning(f"Project creation failed: {serializer.errors}")
+        logger.warning("Project creation failed: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ProjectDetailView(APIView):
+class ProjectDetailView(ReplicaReadsMixin, APIView):
     """Handles retrieving, updating, and deleting a project."""
 
-    def get_object(self, project_id, user):
-        """Helper method to get the project if user has access."""
-        project = get_object_or_404(Project, id=project_id)
-        if not ProjectMember.objects.filter(user=user, project=project).exists():
+    def get_object(self, request, project_id):
+        """Helper method to get the project (with the caller's role) if user has access."""
+        project = get_project_access(request, project_id)
+        if project.caller_role is None:
             logger.warning(
-                f"Unauthorized access attempt by {user.email} on project ID {project_id}."
+                "Unauthorized access attempt by %s on project ID %s.",
+                request.user.email,
+                project_id,
             )
             return None  # User has no role in this project
         return project
 
     def get(self, request, project_id):
         """Retrieve a specific project."""
-        project = self.get_object(project_id, request.user)
+        project = self.get_object(request, project_id)
         if not project:
             return Response(
                 {"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN
             )
 
-        logger.info(f"User {request.user.email} retrieved project ID {project_id}.")
-        serializer = ProjectSerializer(project)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        logger.info("User %s retrieved project ID %s.", request.user.email, project_id)
+        fields = ProjectSerializer.get_requested_fields(request)
+        return conditional_response(
+            request,
+            project,
+            lambda: Response(
+                ProjectSerializer(project, fields=fields).data, status=status.HTTP_200_OK
+            ),
+        )
 
     def put(self, request, project_id):
         """Update a project (only Editors and Owners)."""
-        project = self.get_object(project_id, request.user)
+        project = self.get_object(request, project_id)
         if not project:
             return Response(
                 {"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN
             )
 
-        member = ProjectMember.objects.filter(
-            user=request.user, project=project
-        ).first()
-        if member.role not in ["owner", "editor"]:
+        if project.caller_role not in EDITOR_ROLES:
             logger.warning(
-                f"Permission denied: {request.user.email} attempted to update project ID {project_id}."
+                "Permission denied: %s attempted to update project ID %s.",
+                request.user.email,
+                project_id,
             )
             return Response(
                 {"error": "You do not have permission to update this project."},
@@ -86,46 +123,51 @@ class ProjectDetailView(APIView):
         serializer = ProjectSerializer(project, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
-            logger.info(f"Project ID {project_id} updated by {request.user.email}.")
+            logger.info("Project ID %s updated by %s.", project_id, request.user.email)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, project_id):
         """Delete a project (only Owners)."""
-        project = self.get_object(project_id, request.user)
+        project = self.get_object(request, project_id)
         if not project:
             return Response(
                 {"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN
             )
 
-        if project.owner != request.user:
+        if project.owner_id != request.user.id:
             logger.warning(
-                f"Unauthorized delete attempt on project ID {project_id} by {request.user.email}."
+                "Unauthorized delete attempt on project ID %s by %s.",
+                project_id,
+                request.user.email,
             )
             return Response(
                 {"error": "Only the owner can delete this project."},
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        project.delete()
-        logger.info(f"Project ID {project_id} deleted by {request.user.email}.")
+        # Hidden at once; the purge_deleted worker removes it and its comments.
+        soft_delete_projects(Project.objects.filter(pk=project.pk))
+        logger.info("Project ID %s deleted by %s.", project_id, request.user.email)
         return Response(
             {"message": "Project deleted successfully."},
             status=status.HTTP_204_NO_CONTENT,
         )
 
 
-class ProjectMemberView(APIView):
+class ProjectMemberView(ReplicaReadsMixin, APIView):
     """Allows project owners to add members."""
 
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, project_id):
         """Assign a role to a user (Only Owners)."""
-        project = get_object_or_404(Project, id=project_id)
-        if project.owner != request.user:
+        project = get_project_access(request, project_id)
+        if project.owner_id != request.user.id:
             logger.warning(
-                f"Unauthorized role assignment attempt by {request.user.email} on project ID {project_id}."
+                "Unauthorized role assignment attempt by %s on project ID %s.",
+                request.user.email,
+                project_id,
             )
             return Response(
                 {"error": "Only owners can assign roles."},
@@ -136,29 +178,63 @@ class ProjectMemberView(APIView):
         if serializer.is_valid():
             serializer.save(project=project)
             logger.info(
-                f"User {serializer.validated_data['user']} added to project ID {project_id} by {request.user.email}."
+                "User %s added to project ID %s by %s.",
+                serializer.validated_data["user"],
+                project_id,
+                request.user.email,
+            )
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+        logger.warning("Failed to add project member: %s", serializer.errors)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ProjectMemberBulkView(ReplicaReadsMixin, APIView):
+    """Allows project owners to add many members in one request."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, project_id):
+        """Assign roles to a list of users (Only Owners)."""
+        project = get_project_access(request, project_id)
+        if project.owner_id != request.user.id:
+            logger.warning(
+                "Unauthorized bulk role assignment attempt by %s on project ID %s.",
+                request.user.email,
+                project_id,
+            )
+            return Response(
+                {"error": "Only owners can assign roles."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        serializer = ProjectMemberBulkSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save(project=project)
+            logger.info(
+                "%s users added to project ID %s by %s.",
+                len(serializer.data["created"]),
+                project_id,
+                request.user.email,
             )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        logger.warning(f"Failed to add project member: {serializer.errors}")
+        logger.warning("Failed to bulk add project members: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class CommentListCreateView(APIView):
+class CommentListCreateView(ReplicaReadsMixin, APIView):
     """Allows Owners & Editors to comment."""
 
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, project_id):
         """Create a comment on a project."""
-        project = get_object_or_404(Project, id=project_id)
-        member = ProjectMember.objects.filter(
-            user=request.user, project=project
-        ).first()
-
-        if not member or member.role not in ["owner", "editor"]:
+        if get_project_role(request, project_id) not in EDITOR_ROLES:
             logger.warning(
-                f"Unauthorized comment attempt by {request.user.email} on project ID {project_id}."
+                "Unauthorized comment attempt by %s on project ID %s.",
+                request.user.email,
+                project_id,
             )
             return Response(
                 {"error": "You do not have permission to comment."}, status=403
@@ -166,17 +242,145 @@ class CommentListCreateView(APIView):
 
         serializer = CommentSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user=request.user, project=project)
+            serializer.save(user=request.user, project_id=project_id)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        logger.warning(f"Comment creation failed: {serializer.errors}")
+        logger.warning("Comment creation failed: %s", serializer.errors)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def get(self, request, project_id):
-        """List all comments for a project."""
-        comments = Comment.objects.filter(project_id=project_id)
-        serializer = CommentSerializer(comments, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        """List a project's comments newest first, windowed by before/after cursors."""
+        project = get_project_access(request, project_id)
+        if project.caller_role is None:
+            logger.warning(
+                "Unauthorized comment list attempt by %s on project ID %s.",
+                request.user.email,
+                project_id,
+            )
+            return Response(
+                {"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN
+            )
+
+        fields = CommentSerializer.get_requested_fields(request)
+
+        def build_response():
+            rows = RowSerializer(CommentSerializer, fields)
+            comments = rows.rows(Comment.objects.filter(project_id=project.id))
+            paginator = TimelinePagination()
+            page = paginator.paginate_queryset(comments, request, view=self)
+            return paginator.get_paginated_response(rows.serialize(page))
+
+        return conditional_response(request, project, build_response)
+
+
+class ProjectExportView(ReplicaReadsMixin, APIView):
+    """Streams a project with its members and comments as gzipped NDJSON."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, project_id):
+        """Download the project export (any member)."""
+        project = get_project_access(request, project_id)
+        if project.caller_role is None:
+            logger.warning(
+                "Unauthorized export attempt by %s on project ID %s.",
+                request.user.email,
+                project_id,
+            )
+            return Response(
+                {"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN
+            )
+
+        logger.info("User %s is exporting project ID %s.", request.user.email, project_id)
+        # The body is read after dispatch has reset the request's route, so the
+        # database it should come from is settled here.
+        using = router.db_for_read(Comment)
+        stream = self.stream(project, request.user, using)
+        if isinstance(request._request, ASGIRequest):
+            stream = aiterate(stream)
+        response = StreamingHttpResponse(stream, content_type=CONTENT_TYPE)
+        response["Content-Disposition"] = f'attachment; filename="{export_filename(project)}"'
+        return response
+
+    def stream(self, project, user, using=None):
+        counter = ExportCounter()
+        start = time.perf_counter()
+        yield from gzip_ndjson(export_records(project, using=using), counter)
+        elapsed = time.perf_counter() - start
+        logger.info(
+            "Exported project ID %s for %s: %d rows, %d bytes, %.0f rows/s.",
+            project.pk,
+            user.email,
+            counter.rows,
+            counter.bytes,
+            counter.rows / elapsed if elapsed else 0,
+        )
+
+
+class ActivityFeedView(ReplicaReadsMixin, APIView):
+    """The caller's activity feed across every project they belong to."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        """List comment and membership activity newest first, one cursor page at a time.
+
+        All of the caller's projects are read in one query over the
+        ``(project_id, id)`` index rather than one timeline request per project.
+        """
+        fields = ActivitySerializer.get_requested_fields(request)
+        rows = RowSerializer(ActivitySerializer, fields)
+        project_ids = Project.objects.filter(members__user=request.user).values("pk")
+        activities = rows.rows(Activity.objects.filter(project_id__in=project_ids))
+        paginator = FeedPagination()
+        page = paginator.paginate_queryset(activities, request, view=self)
+        return paginator.get_paginated_response(rows.serialize(page))
+
+
+class SearchView(ReplicaReadsMixin, APIView):
+    """Full-text search over the caller's projects and their comments."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        """Return ranked project and comment hits for ``?q=``."""
+        text = request.query_params.get("q", "").strip()
+        if not text:
+            return Response(
+                {"error": "The q parameter is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        logger.info("User %s searched for %r.", request.user.email, text)
+        paginator = RankedPagination()
+        hits = paginator.paginate_search(
+            request, lambda limit, offset: search(request.user, text, limit, offset)
+        )
+
+        ids = {"project": [], "comment": []}
+        for kind, object_id, _ in hits:
+            ids[kind].append(object_id)
+        objects = {
+            "project": Project.objects.in_bulk(ids["project"]),
+            "comment": Comment.objects.in_bulk(ids["comment"]),
+        }
+        serializer_classes = {"project": ProjectSerializer, "comment": CommentSerializer}
+
+        results = []
+        for kind, object_id, score in hits:
+            obj = objects[kind].get(object_id)
+            if obj is None:
+                # Deleted between the search and the fetch above.
+                continue
+            results.append(
+                {
+                    "type": kind,
+                    "score": score,
+                    "project": obj.pk if kind == "project" else obj.project_id,
+                    "object": serializer_classes[kind](obj).data,
+                }
+            )
+        return paginator.get_paginated_response(results)
 
 
 def get_csrf_token(request):
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser
+from .models import CustomUser, EmailOutbox
 
 
 class CustomUserAdmin(UserAdmin):
@@ -36,5 +36,25 @@ class CustomUserAdmin(UserAdmin):
         ),
     )
 
+    # Deletes only hide users; the purge_deleted worker removes them.
+    def delete_model(self, request, obj):
+        obj.soft_delete()
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            user.soft_delete()
+
 
 admin.site.register(CustomUser, CustomUserAdmin)
+
+
+class EmailOutboxAdmin(admin.ModelAdmin):
+    """Admin panel for inspecting queued verification emails."""
+
+    list_display = ("id", "to_email", "subject", "status", "attempts", "next_attempt_at")
+    search_fields = ("to_email",)
+    list_filter = ("status",)
+    ordering = ("-id",)
+
+
+admin.site.register(EmailOutbox, EmailOutboxAdmin)
@@ -0,0 +1,88 @@
+from django.core.cache import cache
+from django.db import connection
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from projects.benchmark import isolated_database
+from users.models import CustomUser
+from users.tokens import issue_token
+
+# Engines are compared on a fresh cache each, so the benchmark runs against a
+# private local-memory cache rather than clearing the configured one.
+BENCH_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "bench_sessions",
+    }
+}
+
+ENGINES = [
+    "django.contrib.sessions.backends.db",
+    "django.contrib.sessions.backends.cached_db",
+    "users.sessions",
+]
+
+
+class SessionQueryCounter:
+    """Database execute wrapper that tallies django_session reads and writes,
+    and all queries."""
+
+    def __init__(self):
+        self.reads = self.writes = self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        statement = sql.lstrip().upper()
+        if "DJANGO_SESSION" in statement:
+            if statement.startswith(("INSERT", "UPDATE", "DELETE")):
+                self.writes += 1
+            else:
+                self.reads += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Counts django_session writes and all queries per N authenticated "
+        "requests for each session engine, and for signed bearer tokens. Runs "
+        "against a throwaway test database and a private local-memory cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--path", default="/api/users/profile/")
+
+    def handle(self, *args, **options):
+        with isolated_database(), override_settings(CACHES=BENCH_CACHES):
+            user = CustomUser.objects.create_user(
+                username="bench",
+                email="bench@example.com",
+                password="bench",
+                is_verified=True,
+            )
+            self.stdout.write(f"{'engine':<45} {'writes':>8} {'reads':>8} {'queries':>8}")
+            for engine in ENGINES:
+                cache.clear()
+                with override_settings(SESSION_ENGINE=engine):
+                    client = Client()
+                    client.login(username="bench", password="bench")
+                    counter = self.run(client, engine, options)
+                self.row(engine, counter)
+            cache.clear()
+            headers = {"HTTP_AUTHORIZATION": f"Bearer {issue_token(user)}"}
+            self.row("bearer token (users.tokens)", self.run(Client(), "tokens", options, headers))
+
+    def run(self, client, label, options, headers=None):
+        counter = SessionQueryCounter()
+        with connection.execute_wrapper(counter):
+            for _ in range(options["requests"]):
+                response = client.get(options["path"], **(headers or {}))
+                if response.status_code != 200:
+                    raise CommandError(
+                        f"{options['path']} returned {response.status_code} with {label}."
+                    )
+        return counter
+
+    def row(self, label, counter):
+        self.stdout.write(
+            f"{label:<45} {counter.writes:>8} {counter.reads:>8} {counter.queries:>8}"
+        )
@@ -0,0 +1,40 @@
+import logging
+import time
+from django.core.management.base import BaseCommand
+from users.utils import deliver_outbox
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Delivers queued emails from the outbox in batches over one SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Messages per batch (defaults to EMAIL_OUTBOX_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the currently due messages and exit instead of polling.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to sleep between polls when the outbox is empty.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = deliver_outbox(batch_size=options["batch_size"])
+            if sent or failed:
+                logger.info("Outbox batch delivered: %s sent, %s failed.", sent, failed)
+                self.stdout.write(f"{sent} sent, {failed} failed")
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
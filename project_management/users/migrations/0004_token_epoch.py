@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 01:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_email_outbox"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="token_epoch",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -1,17 +1,92 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
+from django.dispatch import Signal
+from django.utils import timezone
 import uuid
 
 
+class LiveUserManager(UserManager):
+    """Default manager: hides soft-deleted users (``all_objects`` sees them)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+# Sent by CustomUser.soft_delete(), so other apps can hide what the user owns.
+user_soft_deleted = Signal()
+
+
 class CustomUser(AbstractUser):
     email = models.EmailField(unique=True)  # Enforce unique email
     is_verified = models.BooleanField(default=False)  # Track email verification status
     verification_code = models.UUIDField(
         default=uuid.uuid4, editable=False, unique=True
     )
+    # Bearer tokens carry the epoch they were issued under; bumping it
+    # revokes them all (see users.tokens).
+    token_epoch = models.PositiveIntegerField(default=0, editable=False)
+    # Set by soft_delete(); the purge_deleted worker removes the row later.
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = LiveUserManager()
+    all_objects = UserManager()
 
     class Meta:
         db_table = "users"
+        indexes = [
+            # The purge worker's queue; live users are left out of the index.
+            models.Index(
+                fields=["deleted_at"],
+                name="users_deleted_idx",
+                condition=models.Q(deleted_at__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return self.username
+
+    def soft_delete(self):
+        """Hides the user and blocks sign-in at once.
+
+        The row and everything the user owns are removed in batches by the
+        ``purge_deleted`` worker instead of one long cascading transaction.
+        """
+        self.deleted_at = timezone.now()
+        self.is_active = False
+        self.save(update_fields=["deleted_at", "is_active"])
+        user_soft_deleted.send(sender=type(self), instance=self)
+
+
+class EmailOutbox(models.Model):
+    """Outgoing email queued for delivery by the ``send_outbox`` worker."""
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "email_outbox"
+        indexes = [
+            # The worker polls for due pending messages.
+            models.Index(
+                fields=["status", "next_attempt_at"], name="email_outbox_due_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {self.to_email} ({self.status})"
@@ -1,9 +1,9 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 from django.contrib.auth import authenticate
 from .models import CustomUser
-from django.core.mail import send_mail
-from django.conf import settings
-from .utils import send_verification_email
+from django.db import transaction
+from .utils import queue_verification_email
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -13,14 +13,23 @@ class RegisterSerializer(serializers.ModelSerializer):
         fields = ('username', 'email', 'password')
         extra_kwargs = {'password': {'write_only': True}}
 
+    def get_fields(self):
+        fields = super().get_fields()
+        # Soft-deleted users keep their username and email until purged, so
+        # check uniqueness against them too rather than fail on insert.
+        for field in fields.values():
+            for validator in field.validators:
+                if isinstance(validator, UniqueValidator):
+                    validator.queryset = CustomUser.all_objects.all()
+        return fields
+
     def create(self, validated_data):
-        """Creates a user and sends an email verification."""
-        user = CustomUser.objects.create_user(**validated_data)
-        user.is_active = False  # User cannot log in until verified
-        user.save()
+        """Creates a user and queues an email verification."""
+        with transaction.atomic():
+            user = CustomUser.objects.create_user(**validated_data, is_active=False)  # User cannot log in until verified
 
-        # Send verification email
-        send_verification_email(email=user.email, verification_code=user.verification_code)
+            # Delivered by the `send_outbox` worker, off the request path
+            queue_verification_email(email=user.email, verification_code=user.verification_code)
         return user
 
 class VerifyEmailSerializer(serializers.Serializer):
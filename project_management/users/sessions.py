@@ -0,0 +1,77 @@
+"""
+Cached, database-backed sessions that only write when something changed.
+"""
+
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.utils import timezone
+
+
+class SessionStore(CachedDBStore):
+    """Write-coalescing variant of the ``cached_db`` session backend.
+
+    Reads come from the cache (falling back to the database), and writes go
+    through to both. With ``SESSION_SAVE_EVERY_REQUEST`` enabled the middleware
+    calls ``save()`` on every request; this store turns that into a no-op unless
+    the session data changed or its stored expiry is within
+    ``SESSION_REFRESH_WINDOW`` seconds.
+    """
+
+    # Cache entries hold the stored expiry next to the data, so they use their
+    # own prefix instead of cached_db's.
+    cache_key_prefix = "users.sessions"
+
+    def _fingerprint(self, data):
+        return self.serializer().dumps(data)
+
+    def _remember(self, data, expire_date):
+        self._stored = (self._fingerprint(data), expire_date)
+        return {"data": data, "expire_date": expire_date}
+
+    def load(self):
+        try:
+            entry = self._cache.get(self.cache_key)
+        except Exception:
+            # Mirror cached_db: invalid cache keys reset the session.
+            entry = None
+
+        if entry is None:
+            self._stored = None
+            s = self._get_session_from_db()
+            if not s:
+                return {}
+            entry = self._remember(self.decode(s.session_data), s.expire_date)
+            self._cache.set(
+                self.cache_key, entry, self.get_expiry_age(expiry=s.expire_date)
+            )
+        else:
+            self._remember(entry["data"], entry["expire_date"])
+        return entry["data"]
+
+    def needs_write(self):
+        """True if the data changed or the stored expiry needs extending."""
+        data = self._get_session()
+        stored = getattr(self, "_stored", None)
+        if stored is None:
+            return True
+        fingerprint, expire_date = stored
+        if self._fingerprint(data) != fingerprint:
+            return True
+        window = timedelta(seconds=settings.SESSION_REFRESH_WINDOW)
+        return expire_date - timezone.now() <= window
+
+    def save(self, must_create=False):
+        if self.session_key is not None and not must_create and not self.needs_write():
+            return
+        DBStore.save(self, must_create)
+        entry = self._remember(self._session, self.get_expiry_date())
+        self._cache.set(self.cache_key, entry, self.get_expiry_age())
+
+    async def aload(self):
+        return await sync_to_async(self.load)()
+
+    async def asave(self, must_create=False):
+        await sync_to_async(self.save)(must_create)
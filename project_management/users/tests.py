@@ -0,0 +1,258 @@
+import smtplib
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+from rest_framework import status
+from .models import CustomUser, EmailOutbox
+from .sessions import SessionStore
+from .tokens import cache_key, issue_token, user_for_token
+from .utils import deliver_outbox, queue_verification_email
+
+
+class FakeSMTP:
+    """Stands in for an SMTP connection and records what was sent."""
+
+    def __init__(self, fail_for=(), disconnect_for=()):
+        self.fail_for = set(fail_for)
+        self.disconnect_for = set(disconnect_for)
+        self.sent = []
+        self.closed = False
+
+    def send_message(self, msg):
+        if msg["To"] in self.fail_for:
+            raise smtplib.SMTPRecipientsRefused({msg["To"]: (550, b"rejected")})
+        if msg["To"] in self.disconnect_for:
+            raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+        self.sent.append(msg)
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+class RegisterViewTests(APITestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = "/api/users/register/"
+
+    def test_register_queues_verification_email(self):
+        """Test that registering queues the email instead of sending it inline."""
+        payload = {
+            "username": "newuser",
+            "email": "new@example.com",
+            "password": "testpass123",
+        }
+        response = self.client.post(self.url, payload)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        user = CustomUser.objects.get(username="newuser")
+        self.assertFalse(user.is_active)
+        entry = EmailOutbox.objects.get(to_email="new@example.com")
+        self.assertEqual(entry.status, EmailOutbox.PENDING)
+        self.assertIn(str(user.verification_code), entry.body)
+
+
+@override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2, EMAIL_OUTBOX_BACKOFF=30)
+class DeliverOutboxTests(APITestCase):
+    def test_delivers_batch_over_one_connection(self):
+        """Test that a batch is sent over a single reused connection."""
+        for i in range(3):
+            queue_verification_email(f"user{i}@example.com", f"code-{i}")
+        connections = []
+
+        def connect():
+            connections.append(FakeSMTP())
+            return connections[-1]
+
+        self.assertEqual(deliver_outbox(connect=connect), (3, 0))
+        self.assertEqual(len(connections), 1)
+        self.assertEqual(len(connections[0].sent), 3)
+        self.assertTrue(connections[0].closed)
+        self.assertFalse(EmailOutbox.objects.exclude(status=EmailOutbox.SENT).exists())
+
+    def test_failed_message_is_retried_with_backoff(self):
+        """Test that failures are rescheduled and eventually given up on."""
+        entry = queue_verification_email("bad@example.com", "code")
+        smtp = FakeSMTP(fail_for={"bad@example.com"})
+
+        self.assertEqual(deliver_outbox(connect=lambda: smtp), (0, 1))
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, EmailOutbox.PENDING)
+        self.assertEqual(entry.attempts, 1)
+        self.assertGreater(entry.next_attempt_at, timezone.now())
+
+        # Not due yet, so the next run skips it.
+        self.assertEqual(deliver_outbox(connect=lambda: smtp), (0, 0))
+
+        EmailOutbox.objects.filter(id=entry.id).update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_outbox(connect=lambda: smtp), (0, 1))
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, EmailOutbox.FAILED)
+        self.assertEqual(entry.attempts, 2)
+
+    def test_dropped_connection_is_closed_and_reopened(self):
+        """Test that a disconnected server is closed before reconnecting."""
+        for i in range(3):
+            queue_verification_email(f"user{i}@example.com", f"code-{i}")
+        dropped, fresh = FakeSMTP(disconnect_for={"user1@example.com"}), FakeSMTP()
+        servers = iter([dropped, fresh])
+        self.assertEqual(deliver_outbox(connect=lambda: next(servers)), (2, 1))
+        self.assertTrue(dropped.closed)
+        self.assertEqual([msg["To"] for msg in fresh.sent], ["user2@example.com"])
+        self.assertEqual(EmailOutbox.objects.get(to_email="user1@example.com").attempts, 1)
+
+    def test_unreachable_server_releases_batch(self):
+        """Test that a failed connect hands the batch back without spending attempts."""
+        for i in range(2):
+            queue_verification_email(f"user{i}@example.com", f"code-{i}")
+
+        def connect():
+            raise ConnectionRefusedError("Connection refused")
+
+        self.assertEqual(deliver_outbox(connect=connect), (0, 0))
+        self.assertFalse(EmailOutbox.objects.exclude(attempts=0).exists())
+        self.assertFalse(EmailOutbox.objects.filter(next_attempt_at__gt=timezone.now()).exists())
+
+
+def session_writes(ctx):
+    return [
+        q for q in ctx.captured_queries
+        if "django_session" in q["sql"] and q["sql"].startswith(("INSERT", "UPDATE"))
+    ]
+
+
+@override_settings(SESSION_REFRESH_WINDOW=60)
+class SessionStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.session = SessionStore()
+        self.session["user"] = 1
+        self.session.save()
+
+    def test_unchanged_session_is_not_written(self):
+        """Test that saving an unmodified session skips the database."""
+        session = SessionStore(self.session.session_key)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(session["user"], 1)
+            session.save()
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_changed_session_is_written(self):
+        """Test that modified data goes through to the database."""
+        session = SessionStore(self.session.session_key)
+        session["user"] = 2
+        with CaptureQueriesContext(connection) as ctx:
+            session.save()
+        self.assertEqual(len(session_writes(ctx)), 1)
+
+        cache.clear()
+        self.assertEqual(SessionStore(self.session.session_key)["user"], 2)
+
+    def test_session_near_expiry_is_refreshed(self):
+        """Test that a session inside the refresh window is re-saved."""
+        session = SessionStore(self.session.session_key)
+        self.assertEqual(session["user"], 1)
+        with override_settings(SESSION_REFRESH_WINDOW=session.get_expiry_age() + 60):
+            with CaptureQueriesContext(connection) as ctx:
+                session.save()
+        self.assertEqual(len(session_writes(ctx)), 1)
+
+
+class LoginSessionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        CustomUser.objects.create_user(
+            username="sessionuser",
+            email="session@example.com",
+            password="testpass123",
+            is_verified=True,
+        )
+
+    def test_authenticated_requests_do_not_write_session(self):
+        """Test that repeated authenticated calls leave django_session alone."""
+        self.client.login(username="sessionuser", password="testpass123")
+        with CaptureQueriesContext(connection) as ctx:
+            for _ in range(5):
+                response = self.client.get("/api/users/profile/")
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(session_writes(ctx), [])
+
+
+class SignedTokenAuthenticationTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            username="machine",
+            email="machine@example.com",
+            password="testpass123",
+            is_verified=True,
+        )
+        self.client = APIClient(enforce_csrf_checks=True)
+
+    def login(self):
+        response = self.client.post(
+            "/api/users/login/", {"username": "machine", "password": "testpass123"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.cookies.clear()  # machine clients keep only the token
+        return response.data["token"]
+
+    def test_token_authenticates_without_session_or_user_queries(self):
+        """Test that a bearer token from login is verified statelessly, with the user cached."""
+        token = self.login()
+        auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        self.client.get("/api/users/profile/", **auth)
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/users/profile/", **auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["username"], "machine")
+
+    def test_cached_user_leaves_out_secrets(self):
+        """Test that the token user cache holds no password hash, and saving still keeps it."""
+        token = issue_token(self.user)
+        user_for_token(token)
+        cached = cache.get(cache_key(self.user.pk))
+        self.assertEqual(cached["username"], "machine")
+        self.assertNotIn("password", cached)
+        self.assertNotIn("verification_code", cached)
+
+        user = user_for_token(token)
+        user.first_name = "Machine"
+        user.save()
+        self.assertTrue(CustomUser.objects.get(pk=self.user.pk).check_password("testpass123"))
+
+    def test_invalid_and_expired_tokens_are_rejected(self):
+        """Test that tampered or expired tokens do not authenticate."""
+        token = issue_token(self.user)
+        tampered = token[:-1] + ("A" if token[-1] != "A" else "B")
+        response = self.client.get(
+            "/api/users/profile/", HTTP_AUTHORIZATION=f"Bearer {tampered}"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        with self.settings(TOKEN_AUTH={**settings.TOKEN_AUTH, "MAX_AGE": -1}):
+            response = self.client.get(
+                "/api/users/profile/", HTTP_AUTHORIZATION=f"Bearer {token}"
+            )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.data["detail"], "Token expired.")
+
+    def test_logout_revokes_tokens(self):
+        """Test that logging out with a token bumps the epoch and revokes every token."""
+        token = self.login()
+        other = issue_token(self.user)
+        auth = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        # Token requests need no CSRF token.
+        response = self.client.post("/api/users/logout/", **auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for revoked in (token, other):
+            response = self.client.get(
+                "/api/users/profile/", HTTP_AUTHORIZATION=f"Bearer {revoked}"
+            )
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+            self.assertEqual(response.data["detail"], "Token revoked.")
@@ -0,0 +1,132 @@
+"""
+Stateless, signed bearer tokens for machine-to-machine clients.
+
+A token is the user id and the user's ``token_epoch``, signed with HMAC-SHA256
+(``django.core.signing``, keyed on ``SECRET_KEY``) and stamped with its issue
+time. Verifying one needs neither a session nor a token table; the user row,
+less its secrets, is cached for ``TOKEN_AUTH["USER_CACHE_TTL"]`` seconds.
+Tokens expire after ``TOKEN_AUTH["MAX_AGE"]`` seconds, and ``revoke_tokens``
+bumps the epoch to invalidate every token a user holds.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import caches
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from rest_framework.exceptions import AuthenticationFailed
+
+User = get_user_model()
+
+KEYWORD = "Bearer"
+SALT = "users.tokens"
+
+# The cache may be shared, so secrets stay out of it; the user comes back with
+# them deferred, loaded from the database only if something reads them.
+SECRET_FIELDS = {"password", "verification_code"}
+CACHED_FIELDS = [
+    field.attname for field in User._meta.concrete_fields if field.name not in SECRET_FIELDS
+]
+
+
+def get_signer():
+    return signing.TimestampSigner(salt=SALT, algorithm="sha256")
+
+
+def issue_token(user):
+    """A signed token for ``user``, valid until it expires or is revoked."""
+    return get_signer().sign_object({"u": user.pk, "e": user.token_epoch}, compress=False)
+
+
+def read_token(token):
+    """``(user_id, epoch)`` from ``token``; raises ``AuthenticationFailed`` if
+    the signature is wrong or the token is too old."""
+    try:
+        payload = get_signer().unsign_object(token, max_age=settings.TOKEN_AUTH["MAX_AGE"])
+    except signing.SignatureExpired:
+        raise AuthenticationFailed("Token expired.")
+    except signing.BadSignature:
+        raise AuthenticationFailed("Invalid token.")
+    try:
+        return int(payload["u"]), int(payload["e"])
+    except (KeyError, TypeError, ValueError):
+        raise AuthenticationFailed("Invalid token.")
+
+
+def get_cache():
+    return caches[settings.TOKEN_AUTH["CACHE_ALIAS"]]
+
+
+def cache_key(user_id):
+    return f"{SALT}:user:{user_id}"
+
+
+def get_user(user_id):
+    """The user with ``user_id``, from the cache when possible."""
+    cache = get_cache()
+    values = cache.get(cache_key(user_id))
+    if values is None:
+        values = User.objects.filter(pk=user_id).values(*CACHED_FIELDS).first()
+        if values is None:
+            return None
+        cache.set(cache_key(user_id), values, settings.TOKEN_AUTH["USER_CACHE_TTL"])
+    return User.from_db(User.objects.db, list(values), list(values.values()))
+
+
+def user_for_token(token):
+    """The active user ``token`` was issued to, if it has not been revoked."""
+    user_id, epoch = read_token(token)
+    user = get_user(user_id)
+    if user is None or not user.is_active:
+        raise AuthenticationFailed("User inactive or deleted.")
+    if user.token_epoch != epoch:
+        raise AuthenticationFailed("Token revoked.")
+    return user
+
+
+def revoke_tokens(user):
+    """Invalidates every token issued to ``user`` so far."""
+    User.objects.filter(pk=user.pk).update(token_epoch=F("token_epoch") + 1)
+    user.refresh_from_db(fields=["token_epoch"])
+    get_cache().delete(cache_key(user.pk))
+
+
+# Other processes may keep serving a cached user until USER_CACHE_TTL runs out;
+# the local cache is dropped at once.
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    get_cache().delete(cache_key(instance.pk))
+
+
+def get_bearer_token(request):
+    """The token from an ``Authorization: Bearer <token>`` header, or ``None``."""
+    auth = get_authorization_header(request).split()
+    if not auth or auth[0].lower() != KEYWORD.lower().encode():
+        return None
+    if len(auth) != 2:
+        raise AuthenticationFailed("Invalid token header.")
+    try:
+        return auth[1].decode()
+    except UnicodeError:
+        raise AuthenticationFailed("Invalid token header.")
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """Authenticates ``Authorization: Bearer <token>`` requests.
+
+    ``request.auth`` is the token itself. Requests without the header are
+    left to the other authentication classes.
+    """
+
+    def authenticate(self, request):
+        token = get_bearer_token(request)
+        if token is None:
+            return None
+        return user_for_token(token), token
+
+    def authenticate_header(self, request):
+        return f'{KEYWORD} realm="api"'
@@ -1,27 +1,146 @@
+import logging
 import smtplib
+from datetime import timedelta
 from email.message import EmailMessage
 from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import EmailOutbox
 
-def send_verification_email(email, verification_code):
-    """Sends an email with a verification code using smtplib."""
-    
-    # Email message details
-    subject = "Verify Your Email"
-    body = f"Your verification code: {verification_code}"
-    
-    # Create email
+logger = logging.getLogger(__name__)
+
+
+def queue_verification_email(email, verification_code):
+    """Queues an email with a verification code for the outbox worker."""
+    return EmailOutbox.objects.create(
+        to_email=email,
+        subject="Verify Your Email",
+        body=f"Your verification code: {verification_code}",
+    )
+
+
+def build_email_message(outbox_entry):
+    """Builds the MIME message for an outbox row."""
     msg = EmailMessage()
-    msg.set_content(body)
-    msg["Subject"] = subject
+    msg.set_content(outbox_entry.body)
+    msg["Subject"] = outbox_entry.subject
     msg["From"] = settings.EMAIL_HOST_USER
-    msg["To"] = email
+    msg["To"] = outbox_entry.to_email
+    return msg
+
+
+def open_smtp_connection():
+    """Opens an SMTP connection as configured by the ``EMAIL_*`` settings.
+
+    Authentication is skipped when no password is configured, which is what a
+    local debugging SMTP server expects.
+    """
+    smtp_class = smtplib.SMTP_SSL if settings.EMAIL_USE_SSL else smtplib.SMTP
+    server = smtp_class(
+        settings.EMAIL_HOST, settings.EMAIL_PORT, timeout=settings.EMAIL_TIMEOUT
+    )
+    if settings.EMAIL_HOST_PASSWORD:
+        server.login(settings.EMAIL_HOST_USER, settings.EMAIL_HOST_PASSWORD)
+    return server
+
+
+def claim_outbox_batch(batch_size):
+    """Leases a batch of due messages so concurrent workers skip them.
+
+    A leased message becomes due again once the lease expires, so messages
+    claimed by a worker that crashes are retried by the next one.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=EmailOutbox.PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        EmailOutbox.objects.filter(id__in=ids).update(
+            next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+        )
+    return list(EmailOutbox.objects.filter(id__in=ids).order_by("id"))
+
+
+def release_outbox_batch(entries):
+    """Hands leased messages back as due now, without spending an attempt."""
+    EmailOutbox.objects.filter(id__in=[entry.id for entry in entries]).update(
+        next_attempt_at=timezone.now()
+    )
+
+
+def record_failure(outbox_entry, error):
+    """Schedules a retry with exponential backoff, or gives up after the limit."""
+    outbox_entry.attempts += 1
+    outbox_entry.last_error = str(error)
+    if outbox_entry.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        outbox_entry.status = EmailOutbox.FAILED
+        logger.error(
+            "Giving up on email %s to %s after %s attempts: %s",
+            outbox_entry.id,
+            outbox_entry.to_email,
+            outbox_entry.attempts,
+            error,
+        )
+    else:
+        delay = settings.EMAIL_OUTBOX_BACKOFF * 2 ** (outbox_entry.attempts - 1)
+        outbox_entry.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+        logger.warning(
+            "Email %s to %s failed (attempt %s), retrying in %ss: %s",
+            outbox_entry.id,
+            outbox_entry.to_email,
+            outbox_entry.attempts,
+            delay,
+            error,
+        )
+    outbox_entry.save(
+        update_fields=["attempts", "last_error", "status", "next_attempt_at"]
+    )
+
+
+def deliver_outbox(batch_size=None, connect=open_smtp_connection):
+    """Sends one batch of due outbox messages over a single SMTP connection.
 
+    Returns ``(sent, failed)`` counts for the batch. A dropped connection is
+    reopened for the remaining messages of the batch. If the server cannot be
+    reached, the rest of the batch is released for a later run; the messages
+    are not at fault, so no attempt is counted against them.
+    """
+    batch = claim_outbox_batch(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    sent = failed = 0
+    server = None
     try:
-        # Connect to Gmail SMTP server
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(settings.EMAIL_HOST_USER, settings.EMAIL_HOST_PASSWORD)
-            server.send_message(msg)
-        return True  # Email sent successfully
-    except Exception as e:
-        print(f"Email sending failed: {e}")
-        return False
+        for index, outbox_entry in enumerate(batch):
+            if server is None:
+                try:
+                    server = connect()
+                except (smtplib.SMTPException, OSError) as exc:
+                    logger.warning("Could not connect to the SMTP server: %s", exc)
+                    release_outbox_batch(batch[index:])
+                    break
+            try:
+                server.send_message(build_email_message(outbox_entry))
+            except (smtplib.SMTPException, OSError) as exc:
+                failed += 1
+                record_failure(outbox_entry, exc)
+                # SMTPException subclasses OSError; only drop the connection
+                # on disconnects and socket errors, not per-recipient refusals.
+                if isinstance(exc, smtplib.SMTPServerDisconnected) or not isinstance(
+                    exc, smtplib.SMTPException
+                ):
+                    server.close()
+                    server = None
+                continue
+            outbox_entry.status = EmailOutbox.SENT
+            outbox_entry.sent_at = timezone.now()
+            outbox_entry.save(update_fields=["status", "sent_at"])
+            sent += 1
+    finally:
+        if server is not None:
+            try:
+                server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+    return sent, failed
@@ -1,4 +1,5 @@
 import logging
+from django.conf import settings
 from django.contrib.auth import login, logout
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -9,13 +10,14 @@ from .serializers import (
     LoginSerializer,
     UserProfileSerializer,
 )
+from .tokens import issue_token, revoke_tokens
 from icecream import ic
 
 logger = logging.getLogger(__name__)
 
 
 class RegisterView(APIView):
-    """Registers a user and sends an email verification."""
+    """Registers a user and queues an email verification for the outbox worker."""
 
     permission_classes = [permissions.AllowAny]
 
@@ -24,7 +26,7 @@ class RegisterView(APIView):
         serializer = RegisterSerializer(data=request.data)
         if serializer.is_valid():
             serializer.save()
-            logger.info("User registered successfully. Verification email sent.")
+            logger.info("User registered successfully. Verification email queued.")
             return Response(
                 {"message": "User registered. Check email for verification."},
                 status=status.HTTP_201_CREATED,
@@ -52,7 +54,7 @@ class VerifyEmailView(APIView):
 
 
 class LoginView(APIView):
-    """Logs in a user and starts a session."""
+    """Logs in a user, starting a session and issuing a signed bearer token."""
 
     permission_classes = [permissions.AllowAny]
 
@@ -62,9 +64,14 @@ class LoginView(APIView):
         if serializer.is_valid():
             user = serializer.validated_data
             login(request, user)
-            logger.info(f"User {user.email} logged in successfully.")
+            logger.info("User %s logged in successfully.", user.email)
             response = Response(
-                {"message": "Login successful"}, status=status.HTTP_200_OK
+                {
+                    "message": "Login successful",
+                    "token": issue_token(user),
+                    "expires_in": settings.TOKEN_AUTH["MAX_AGE"],
+                },
+                status=status.HTTP_200_OK,
             )
             response.set_cookie(
                 key="sessionid", value=request.session.session_key, httponly=True
@@ -75,12 +82,15 @@ class LoginView(APIView):
 
 
 class LogoutView(APIView):
-    """Logs out user and destroys session."""
+    """Logs out user and destroys session; a bearer-token logout revokes all
+    of the user's tokens."""
 
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
-        logger.info(f"User {request.user.email} logged out.")
+        logger.info("User %s logged out.", request.user.email)
+        if isinstance(request.auth, str):
+            revoke_tokens(request.user)
         logout(request)
         return Response(
             {"message": "Logged out successfully"}, status=status.HTTP_200_OK
@@ -93,6 +103,6 @@ class UserProfileView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        logger.info(f"User {request.user.email} fetched profile details.")
+        logger.info("User %s fetched profile details.", request.user.email)
         serializer = UserProfileSerializer(request.user)
         return Response(serializer.data, status=status.HTTP_200_OK)